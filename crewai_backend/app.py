@@ -1,12 +1,11 @@
-import json
+import hashlib
 import os
-import queue
 import threading
 import time
 import uuid
-from dataclasses import dataclass, field
+from contextlib import contextmanager
 from typing import Any, Iterator
-from urllib.parse import urlparse
+from urllib.parse import urlencode, urlparse
 
 try:
     from dotenv import load_dotenv
@@ -15,7 +14,20 @@ except Exception:  # noqa: BLE001
 from flask import Flask, Response, jsonify, request, stream_with_context
 from flask_cors import CORS
 
-from crew import CrewService
+from checkpoints import CHECKPOINT_HEARTBEAT_SECONDS, checkpoint_job, checkpoint_stats, get_checkpoint_store
+from crew import SPARKY_MODE, SPARKY_MODES, CrewService
+from deadline import DeadlineExceeded, deadline_scope
+from health import CachedProbe, run_checks
+import json_codec
+from json_extract import IncrementalJSONParser
+from jobs import STREAM_STATS, JobEvent, TestJob, apply_backpressure
+from llm_cache import cache_bypass, cache_stats
+from llm_limiter import LLM_LIMITER, tenant_context
+from model_router import ROUTE_STATS
+from prompt_registry import get_prompt_registry
+from report_store import ReportStore
+from scheduler import AUDIT_KINDS, AuditScheduler, ScheduledSite
+from tools.bulk_seo import BulkSEOAnalyzer
 
 if load_dotenv is not None:
     load_dotenv()
@@ -23,21 +35,6 @@ if load_dotenv is not None:
 app = Flask(__name__)
 CORS(app)
 
-
-@dataclass
-class TestJob:
-    id: str
-    url: str
-    status: str = "pending"
-    progress: float = 0.0
-    result: dict[str, Any] | None = None
-    error: str | None = None
-    created_at: float = field(default_factory=time.time)
-    updated_at: float = field(default_factory=time.time)
-    events: list[dict[str, Any]] = field(default_factory=list)
-    subscribers: set["queue.Queue[dict[str, Any]]"] = field(default_factory=set)
-
-
 JOBS: dict[str, TestJob] = {}
 JOBS_LOCK = threading.Lock()
 CREW = CrewService(model=os.environ.get("CREW_MODEL", "anthropic/claude-opus-4-6"))
@@ -45,6 +42,28 @@ JOB_TTL_SECONDS = int(os.environ.get("TEST_JOB_TTL_SECONDS", "1800"))
 HEARTBEAT_INTERVAL_SECONDS = int(os.environ.get("TEST_SSE_HEARTBEAT_SECONDS", "10"))
 TERMINAL_JOB_STATUSES = {"completed", "failed", "error"}
 TERMINAL_STATUS_EVENTS = {"completed", "errors_found"}
+BULK_SEO_MAX_CONCURRENCY = int(os.environ.get("BULK_SEO_MAX_CONCURRENCY", "32"))
+BULK_SEO_PER_HOST = int(os.environ.get("BULK_SEO_PER_HOST", "4"))
+_REPORT_STORE: ReportStore | None = None
+_REPORT_STORE_LOCK = threading.Lock()
+SCHEDULER_ENABLED = os.environ.get("SCHEDULER_ENABLED", "false").lower() in {"1", "true", "yes"}
+SCHEDULER_MAX_CONCURRENCY = int(os.environ.get("SCHEDULER_MAX_CONCURRENCY", "4"))
+SCHEDULER_MAX_FULL_AUDITS = int(os.environ.get("SCHEDULER_MAX_FULL_AUDITS", "1"))
+SCHEDULER_CATCH_UP = os.environ.get("SCHEDULER_CATCH_UP", "once")
+_SCHEDULER: AuditScheduler | None = None
+_SCHEDULER_LOCK = threading.Lock()
+SELF_TEST_URL = os.environ.get("SELF_TEST_URL", "https://example.com")
+SELF_TEST_INTERVAL_SECONDS = float(os.environ.get("SELF_TEST_INTERVAL_SECONDS", "300"))
+SELF_TEST_FAILURE_INTERVAL_SECONDS = float(os.environ.get("SELF_TEST_FAILURE_INTERVAL_SECONDS", "60"))
+READY_MAX_LLM_QUEUE = int(os.environ.get("READY_MAX_LLM_QUEUE", "100"))
+READY_MAX_ACTIVE_JOBS = int(os.environ.get("READY_MAX_ACTIVE_JOBS", "64"))
+# Wall-clock budget per Sparky test (clients may ask for less) and per full audit.
+TEST_JOB_DEADLINE_SECONDS = float(os.environ.get("TEST_JOB_DEADLINE_SECONDS", "180"))
+ANALYZE_DEADLINE_SECONDS = float(os.environ.get("ANALYZE_DEADLINE_SECONDS", "900"))
+# "tenant-a=<api key>,tenant-b=<api key>": callers presenting a listed key get that tenant's
+# share of the LLM queue; everyone else is keyed by client address.
+TENANT_API_KEYS = os.environ.get("TENANT_API_KEYS", "")
+RESUME_JOBS_ON_START = os.environ.get("RESUME_JOBS_ON_START", "false").lower() in {"1", "true", "yes"}
 
 
 def now_ts() -> float:
@@ -61,7 +80,7 @@ def save_job(job: TestJob) -> None:
         JOBS[job.id] = job
 
 
-def is_terminal_event(event: dict[str, Any]) -> bool:
+def is_terminal_event(event: JobEvent | dict[str, Any]) -> bool:
     return event.get("type") == "error" or (
         event.get("type") == "status" and event.get("state") in TERMINAL_STATUS_EVENTS
     )
@@ -89,6 +108,140 @@ def purge_expired_jobs() -> int:
     return len(expired_ids)
 
 
+def get_report_store() -> ReportStore:
+    global _REPORT_STORE
+    with _REPORT_STORE_LOCK:
+        if _REPORT_STORE is None:
+            _REPORT_STORE = ReportStore()
+        return _REPORT_STORE
+
+
+def _key_digest(value: str) -> str:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+
+def parse_tenant_keys(spec: str) -> dict[str, str]:
+    """API key digest -> tenant, from ``TENANT_API_KEYS``."""
+    tenants: dict[str, str] = {}
+    for item in spec.split(","):
+        name, _, key = item.partition("=")
+        if name.strip() and key.strip():
+            tenants[_key_digest(key.strip())] = name.strip()
+    return tenants
+
+
+_TENANT_KEYS = parse_tenant_keys(TENANT_API_KEYS)
+
+
+def request_tenant() -> str:
+    """
+    Fairness key for the LLM limiter: the tenant owning a configured API key, else the client address.
+
+    Only identities the client cannot mint freely count; a self-chosen header or an
+    unknown key would let a caller take a fresh queue share per request.
+    """
+    api_key = request.headers.get("X-API-Key") or request.headers.get("Authorization", "").removeprefix("Bearer ")
+    tenant = _TENANT_KEYS.get(_key_digest(api_key.strip())) if api_key else None
+    if tenant:
+        return tenant
+    return "ip:" + _key_digest(request.remote_addr or "anonymous")[:12]
+
+
+def request_cache_bypass() -> bool:
+    """
+    ``X-LLM-Cache: bypass`` header or ``llm_cache=bypass`` query arg forces fresh LLM answers.
+
+    ``Cache-Control: no-cache`` is deliberately ignored: EventSource sends it on every request.
+    """
+    flag = request.headers.get("X-LLM-Cache") or request.args.get("llm_cache") or ""
+    return flag.strip().lower() in {"bypass", "refresh", "off"}
+
+
+@contextmanager
+def llm_scope(tenant: str | None, bypass: bool = False, deadline_seconds: float | None = None) -> Iterator[None]:
+    """Tenant attribution, cache bypass and deadline for the LLM calls made in this block."""
+    with tenant_context(tenant), cache_bypass(bypass), deadline_scope(deadline_seconds):
+        yield
+
+
+def requested_cursor(length: int) -> int:
+    """
+    Resume point of an event stream: ``Last-Event-ID`` header or ``cursor`` query arg, else 0.
+
+    A cursor past the end of the log was issued by a process before a restart; the
+    resumed job's log starts over, so it is replayed from the beginning.
+    """
+    value = request.headers.get("Last-Event-ID") or request.args.get("cursor") or "0"
+    try:
+        cursor = int(value)
+    except ValueError:
+        return 0
+    return cursor if 0 <= cursor <= length else 0
+
+
+def requested_deadline(data: Any, default: float) -> float:
+    """``deadline_seconds`` from a JSON body, capped at the server default."""
+    value = data.get("deadline_seconds") if isinstance(data, dict) else None
+    if isinstance(value, (int, float)) and not isinstance(value, bool) and value > 0:
+        return min(float(value), default)
+    return default
+
+
+def requested_sparky_mode(data: Any) -> str | None:
+    """``sparky_mode`` from a JSON body or query arg; ``None`` leaves the SPARKY_MODE default."""
+    value = data.get("sparky_mode") if isinstance(data, dict) else None
+    value = value or request.args.get("sparky_mode")
+    if value is None:
+        return None
+    if value not in SPARKY_MODES:
+        raise ValueError(f"sparky_mode must be one of {list(SPARKY_MODES)}")
+    return value
+
+
+def run_scheduled_audit(site: ScheduledSite) -> None:
+    deadline = ANALYZE_DEADLINE_SECONDS if site.kind == "full" else TEST_JOB_DEADLINE_SECONDS
+    with llm_scope("scheduler", deadline_seconds=deadline):
+        _run_scheduled_audit(site)
+
+
+def run_full_audit_job(job_id: str, params: dict[str, Any]) -> dict[str, Any]:
+    """
+    Full audit checkpointed under ``job_id``; resumed on restart if the process dies mid-run.
+
+    ``params`` holds everything a resume needs: url, modules, tenant, cache_bypass and
+    deadline_seconds. The audit saves itself to the report store.
+    """
+    with checkpoint_job(job_id, "full", params), llm_scope(
+        params.get("tenant"), params.get("cache_bypass", False), params.get("deadline_seconds")
+    ):
+        return CREW.run_full_audit(params["url"], modules=params.get("modules"))
+
+
+def _run_scheduled_audit(site: ScheduledSite) -> None:
+    if site.kind == "full":
+        # Full audits save themselves to the report store.
+        CREW.run_full_audit(site.url, modules=list(site.modules) or None)
+        return
+    result = CREW.run_sparky_pipeline(site.url)
+    get_report_store().save(site.url, CREW.model, result.get("summary") or "", {"sparky": json_codec.dumps(result)})
+
+
+def get_scheduler() -> AuditScheduler:
+    """Schedules are always editable; runs only happen when SCHEDULER_ENABLED is set."""
+    global _SCHEDULER
+    with _SCHEDULER_LOCK:
+        if _SCHEDULER is None:
+            _SCHEDULER = AuditScheduler(
+                run_scheduled_audit,
+                max_concurrency=SCHEDULER_MAX_CONCURRENCY,
+                kind_limits={"full": SCHEDULER_MAX_FULL_AUDITS},
+                catch_up=SCHEDULER_CATCH_UP,
+            )
+            if SCHEDULER_ENABLED:
+                _SCHEDULER.start()
+        return _SCHEDULER
+
+
 def validate_url(url: str) -> str:
     parsed = urlparse(url)
     if parsed.scheme not in {"http", "https"} or not parsed.netloc:
@@ -96,8 +249,9 @@ def validate_url(url: str) -> str:
     return url
 
 
-def to_sse(event: str, payload: dict[str, Any]) -> str:
-    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+def to_sse(event: str, payload: dict[str, Any], event_id: int | None = None) -> bytes:
+    frame = b"event: " + event.encode("utf-8") + b"\ndata: " + json_codec.dumps_bytes(payload) + b"\n\n"
+    return frame if event_id is None else b"id: %d\n" % event_id + frame
 
 
 def chunk_text(text: str, chunk_size: int = 80) -> list[str]:
@@ -107,35 +261,66 @@ def chunk_text(text: str, chunk_size: int = 80) -> list[str]:
     return [cleaned[i:i + chunk_size] for i in range(0, len(cleaned), chunk_size)]
 
 
-def stream_sparky_analysis(url: str) -> Iterator[str]:
+def _category_events(category: dict[str, Any]) -> Iterator[bytes]:
+    cat_id = category.get("id")
+    if not cat_id:
+        return
+    yield to_sse("category", {
+        "category": cat_id,
+        "issues": category.get("issues", []),
+        "severity": category.get("severity", "medium"),
+    })
+    yield to_sse("message", {"text": f"Analyzing {cat_id}..."})
+
+
+def stream_sparky_analysis(url: str, sparky_mode: str | None = None) -> Iterator[bytes]:
     """
     Direct-streaming pipeline (single SSE hop):
     request -> /agent/stream -> browser.
     No job IDs, replay, heartbeats, or event bus state.
+
+    ``sparky_mode`` defaults to SPARKY_MODE (``two_call`` unless configured). The opt-in
+    ``single_call`` streams the combined response instead: categories are emitted from it
+    as they close and the summary is read from the same object.
     """
+    single_call = (sparky_mode or SPARKY_MODE) == "single_call"
     yield to_sse("message", {"text": "Fetching HTML..."})
-    snapshot_raw = CREW.site_snapshot_task(url)
 
-    # Detect platform early so the frontend can render the WordPress card.
+    # Parse the snapshot while it is generated so each category card is emitted
+    # as soon as its array element closes, not after the whole response.
+    parser = IncrementalJSONParser(stream_arrays=("categories",))
+    raw_chunks: list[str] = []
+    platform: str | None = None
+    streamed_categories = 0
+    task_key = "sparky_combined" if single_call else "site_snapshot_task"
+    for chunk in CREW.stream_site_snapshot(url, task_key=task_key):
+        raw_chunks.append(chunk)
+        for kind, key, value in parser.feed(chunk):
+            if kind == "member" and key == "platform" and platform is None:
+                # Detect platform early so the frontend can render the WordPress card.
+                platform = value if isinstance(value, str) and value else "generic"
+                yield to_sse("platform", {"platform": platform})
+            elif kind == "item" and key == "categories":
+                for category in CREW._normalize_categories([value]):
+                    streamed_categories += 1
+                    yield from _category_events(category)
+
+    snapshot_raw = "".join(raw_chunks)
     snapshot_json = CREW._extract_best_json(snapshot_raw)
-    platform = snapshot_json.get("platform", "generic")
-    yield to_sse("platform", {"platform": platform})
-
-    # Stream categories one by one so cards animate in progressively.
-    categories = CREW._normalize_categories(snapshot_json.get("categories", []))
-    for category in categories:
-        cat_id = category.get("id")
-        if not cat_id:
-            continue
-        yield to_sse("category", {
-            "category": cat_id,
-            "issues": category.get("issues", []),
-            "severity": category.get("severity", "medium"),
-        })
-        yield to_sse("message", {"text": f"Analyzing {cat_id}..."})
+    if platform is None:
+        yield to_sse("platform", {"platform": snapshot_json.get("platform", "generic")})
+
+    # Output that the incremental parser could not follow (e.g. categories nested
+    # below a wrapper object) still gets its cards once the full text is known.
+    if not streamed_categories:
+        for category in CREW._normalize_categories(snapshot_json.get("categories", [])):
+            yield from _category_events(category)
 
-    summary_raw = CREW.sparky_summary(snapshot_raw)
-    summary_json = CREW._extract_best_json(summary_raw)
+    if single_call:
+        summary_raw, summary_json = "", snapshot_json
+    else:
+        summary_raw = CREW.sparky_summary(snapshot_raw)
+        summary_json = CREW._extract_best_json(summary_raw)
 
     greeting = (
         summary_json.get("greeting")
@@ -158,14 +343,14 @@ def stream_sparky_analysis(url: str) -> Iterator[str]:
 
 
 def emit_event(test_id: str, event_type: str, **payload: Any) -> None:
-    event = {"type": event_type, **payload}
+    event = JobEvent.create(event_type, **payload)
 
     with JOBS_LOCK:
         job = JOBS.get(test_id)
         if job is None:
             return
 
-        job.events.append(event)
+        job.events.append(event, terminal=is_terminal_event(event))
         job.updated_at = now_ts()
 
         if event_type == "progress":
@@ -190,11 +375,6 @@ def emit_event(test_id: str, event_type: str, **payload: Any) -> None:
                 job.error = message
                 job.status = "failed"
 
-        subscribers = list(job.subscribers)
-
-    for subscriber in subscribers:
-        subscriber.put(event)
-
 
 def _simulate_progress(test_id: str) -> None:
     milestones = [
@@ -219,11 +399,80 @@ def _emit_heartbeats(test_id: str, stop_event: threading.Event) -> None:
             "status",
             state="in_progress",
             message="heartbeat",
-            timestamp=time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            # Kept as epoch seconds; serialized as ISO-8601 (see jobs.JobEvent).
+            timestamp=now_ts(),
         )
 
 
 def _run_sparky_worker(test_id: str, url: str) -> None:
+    job = get_job(test_id)
+    if job is None:
+        return
+    # The deadline counts from job creation, so time spent before the worker started is included.
+    deadline = None if job.deadline_at is None else job.deadline_at - now_ts()
+    params = {
+        "url": url,
+        "tenant": job.tenant,
+        "cache_bypass": job.cache_bypass,
+        "sparky_mode": job.sparky_mode,
+        "deadline_seconds": None if job.deadline_at is None else job.deadline_at - job.created_at,
+    }
+    # _run_sparky_job reports failures as events and returns, so the checkpoint is only
+    # left behind when the process dies mid-job.
+    with checkpoint_job(test_id, "sparky", params), llm_scope(job.tenant, job.cache_bypass, deadline):
+        _run_sparky_job(test_id, url, job.sparky_mode)
+
+
+def resume_unfinished_jobs() -> int:
+    """
+    Claim and restart jobs whose process died; their completed stages are not re-run.
+
+    Sparky test jobs keep their ``test_id``, so clients reconnecting to the event stream
+    pick them up (from the start of the log: events before the restart are lost). Each
+    resumed job gets its deadline afresh. Full audits run in the background and land in
+    the report store.
+    """
+    import logging
+
+    logger = logging.getLogger(__name__)
+    try:
+        records = get_checkpoint_store().claim_orphans()
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("[RESUME] Reading checkpoints failed: %s", exc)
+        return 0
+    for record in records:
+        params = record["params"]
+        logger.info("[RESUME] Resuming %s job %s for %s", record["kind"], record["id"], params.get("url"))
+        if record["kind"] == "sparky":
+            deadline_seconds = params.get("deadline_seconds")
+            created_at = now_ts()
+            save_job(TestJob(
+                id=record["id"],
+                url=params["url"],
+                tenant=params.get("tenant"),
+                cache_bypass=bool(params.get("cache_bypass")),
+                deadline_at=None if deadline_seconds is None else created_at + deadline_seconds,
+                sparky_mode=params.get("sparky_mode"),
+                created_at=created_at,
+            ))
+            emit_event(record["id"], "status", state="in_progress", message="resumed")
+            worker = threading.Thread(target=_run_sparky_worker, args=(record["id"], params["url"]), daemon=True)
+        else:
+            worker = threading.Thread(target=_resume_full_audit, args=(record["id"], params), daemon=True)
+        worker.start()
+    return len(records)
+
+
+def _resume_full_audit(job_id: str, params: dict[str, Any]) -> None:
+    import logging
+
+    try:
+        run_full_audit_job(job_id, params)
+    except Exception as exc:  # noqa: BLE001
+        logging.getLogger(__name__).error("[RESUME] Full audit %s failed: %s", job_id, exc)
+
+
+def _run_sparky_job(test_id: str, url: str, sparky_mode: str | None = None) -> None:
     import logging
 
     logger = logging.getLogger(__name__)
@@ -239,7 +488,7 @@ def _run_sparky_worker(test_id: str, url: str) -> None:
 
         _simulate_progress(test_id)
 
-        result = CREW.run_sparky_pipeline(url)
+        result = CREW.run_sparky_pipeline(url, mode=sparky_mode)
         summary = result.get("summary") or result.get("short_summary") or "Analysis complete"
         short_summary = result.get("short_summary") or summary
         greeting = result.get("greeting") or "Hi! Here is your test report."
@@ -267,6 +516,9 @@ def _run_sparky_worker(test_id: str, url: str) -> None:
         )
         emit_event(test_id, "status", state="completed", message="done")
         logger.info("[WORKER] Completed test_id=%s", test_id)
+    except DeadlineExceeded as exc:
+        logger.warning("[WORKER] Deadline exceeded test_id=%s: %s", test_id, exc)
+        emit_event(test_id, "error", message=str(exc), code="deadline_exceeded")
     except Exception as exc:  # noqa: BLE001
         logger.error("[WORKER] Failed test_id=%s error=%s", test_id, str(exc), exc_info=True)
         emit_event(test_id, "error", message=str(exc))
@@ -288,11 +540,19 @@ def start_homepage_test() -> Response:
 
     try:
         validate_url(url)
+        sparky_mode = requested_sparky_mode(data)
     except ValueError as err:
         return jsonify({"error": str(err)}), 400
 
     test_id = uuid.uuid4().hex
-    job = TestJob(id=test_id, url=url)
+    job = TestJob(
+        id=test_id,
+        url=url,
+        tenant=request_tenant(),
+        cache_bypass=request_cache_bypass(),
+        deadline_at=now_ts() + requested_deadline(data, TEST_JOB_DEADLINE_SECONDS),
+        sparky_mode=sparky_mode,
+    )
     save_job(job)
 
     worker = threading.Thread(target=_run_sparky_worker, args=(test_id, url), daemon=True)
@@ -303,46 +563,38 @@ def start_homepage_test() -> Response:
 
 @app.route("/api/test/events/<test_id>", methods=["GET"])
 def stream_events(test_id: str):
-    with JOBS_LOCK:
-        job = JOBS.get(test_id)
-        if job is None:
-            return jsonify({"error": "stream not found"}), 404
-
-        history = list(job.events)
-        terminal_after_replay = bool(history) and is_terminal_event(history[-1])
-        subscriber_queue: "queue.Queue[dict[str, Any]] | None" = None
-
-        if not terminal_after_replay:
-            subscriber_queue = queue.Queue()
-            job.subscribers.add(subscriber_queue)
+    job = get_job(test_id)
+    if job is None:
+        return jsonify({"error": "stream not found"}), 404
+    log = job.events
+    start = requested_cursor(len(log))
 
-    def to_sse(event: dict[str, Any]) -> str:
-        return f"event: {event.get('type', 'message')}\ndata: {json.dumps(event)}\n\n"
+    def event_to_sse(index: int, event: JobEvent) -> bytes:
+        # The id is the cursor after this event; EventSource echoes it as Last-Event-ID.
+        return to_sse(event.type, event.as_dict(), event_id=index + 1)
 
     def event_stream():
-        try:
-            for historical_event in history:
-                yield to_sse(historical_event)
-
-            # Replay-only clients should receive history and then terminate immediately when
-            # the final replayed event is terminal, instead of hanging indefinitely.
-            if terminal_after_replay or subscriber_queue is None:
+        # History replay and live tail are one loop over the job's log. The stream ends
+        # at the first terminal event, so replay-only clients of a finished job do not hang.
+        cursor, replay = start, True
+        while True:
+            end = log.wait(cursor, timeout=15)
+            if end == cursor:
+                if log.closed:
+                    return
+                yield b": keepalive\n\n"
+                continue
+            backlog = list(zip(range(cursor, end), log.read(cursor, end)))
+            # The replay is sent whole; a backlog after that means the client fell behind.
+            batch = backlog if replay else apply_backpressure(backlog)
+            if batch is None:
+                yield to_sse("reconnect", {"cursor": cursor, "reason": "slow_consumer"}, event_id=cursor)
                 return
-
-            while True:
-                try:
-                    event = subscriber_queue.get(timeout=15)
-                    yield to_sse(event)
-                    if is_terminal_event(event):
-                        break
-                except queue.Empty:
-                    yield ": keepalive\n\n"
-        finally:
-            if subscriber_queue is not None:
-                with JOBS_LOCK:
-                    current = JOBS.get(test_id)
-                    if current is not None:
-                        current.subscribers.discard(subscriber_queue)
+            for index, event in batch:
+                yield event_to_sse(index, event)
+                if is_terminal_event(event):
+                    return
+            cursor, replay = end, False
 
     response = Response(
         stream_with_context(event_stream()),
@@ -373,10 +625,154 @@ def legacy_analyze():
     if not url:
         return jsonify({"error": "Missing URL"}), 400
 
-    result = CREW.run_full_audit(url)
+    params = {
+        "url": url,
+        "modules": None,
+        "tenant": request_tenant(),
+        "cache_bypass": request_cache_bypass(),
+        "deadline_seconds": requested_deadline(data, ANALYZE_DEADLINE_SECONDS),
+    }
+    try:
+        result = run_full_audit_job(uuid.uuid4().hex, params)
+    except DeadlineExceeded as exc:
+        return jsonify({"error": str(exc), "code": "deadline_exceeded"}), 504
     return jsonify(result)
 
 
+@app.route("/api/seo/bulk", methods=["POST"])
+def bulk_seo_analysis():
+    """
+    Run on-page SEO checks for many URLs and stream one NDJSON line per URL as it finishes.
+
+    Accepts either JSON ``{"urls": [...]}`` or a plain-text body with one URL per line
+    (read lazily, so large uploads start producing results immediately). Optional
+    ``concurrency`` and ``per_host`` query parameters are capped by server settings.
+    """
+    try:
+        concurrency = min(int(request.args.get("concurrency", BULK_SEO_MAX_CONCURRENCY)), BULK_SEO_MAX_CONCURRENCY)
+        per_host = min(int(request.args.get("per_host", BULK_SEO_PER_HOST)), BULK_SEO_PER_HOST)
+        analyzer = BulkSEOAnalyzer(max_concurrency=concurrency, per_host=per_host)
+    except ValueError as err:
+        return jsonify({"error": f"Invalid concurrency settings: {err}"}), 400
+
+    if request.is_json:
+        data = request.get_json(silent=True)
+        urls = data.get("urls") if isinstance(data, dict) else None
+        if not isinstance(urls, list):
+            return jsonify({"error": "urls must be a list"}), 400
+    else:
+        def iter_lines() -> Iterator[str]:
+            for raw_line in request.stream:
+                line = raw_line.decode("utf-8", errors="replace").strip()
+                if line and not line.startswith("#"):
+                    yield line
+
+        urls = iter_lines()
+
+    def ndjson_stream():
+        for record in analyzer.analyze(urls):
+            yield json_codec.dumps_bytes(record) + b"\n"
+
+    response = Response(stream_with_context(ndjson_stream()), mimetype="application/x-ndjson")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+
+@app.route("/api/reports", methods=["GET"])
+def list_reports():
+    """Run history, newest first, filterable by domain, model, module and time range (epoch seconds)."""
+    try:
+        since = request.args.get("since", type=float)
+        until = request.args.get("until", type=float)
+        limit = int(request.args.get("limit", 50))
+    except ValueError as err:
+        return jsonify({"error": f"Invalid query: {err}"}), 400
+    runs = get_report_store().list_runs(
+        domain=request.args.get("domain"),
+        model=request.args.get("model"),
+        module=request.args.get("module"),
+        since=since,
+        until=until,
+        limit=limit,
+    )
+    return jsonify({"runs": runs})
+
+
+@app.route("/api/reports/<int:run_id>", methods=["GET"])
+def get_report(run_id: int):
+    modules = request.args.get("modules")
+    run = get_report_store().get_run(run_id, modules=modules.split(",") if modules else None)
+    if run is None:
+        return jsonify({"error": "report not found"}), 404
+    return jsonify(run)
+
+
+@app.route("/api/reports/<int:old_id>/diff/<int:new_id>", methods=["GET"])
+def diff_reports(old_id: int, new_id: int):
+    diff = get_report_store().diff_runs(old_id, new_id)
+    if diff is None:
+        return jsonify({"error": "report not found"}), 404
+    return jsonify(diff)
+
+
+@app.route("/api/schedules", methods=["GET"])
+def list_schedules():
+    try:
+        limit = int(request.args.get("limit", 100))
+        offset = int(request.args.get("offset", 0))
+    except ValueError as err:
+        return jsonify({"error": f"Invalid query: {err}"}), 400
+    scheduler = get_scheduler()
+    return jsonify({"schedules": scheduler.list_sites(limit=limit, offset=offset), **scheduler.stats()})
+
+
+@app.route("/api/schedules", methods=["POST"])
+def create_schedule():
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not data.get("url"):
+        return jsonify({"error": "url required"}), 400
+    modules = data.get("modules") or []
+    if not isinstance(modules, list):
+        return jsonify({"error": "modules must be a list"}), 400
+    try:
+        schedule = get_scheduler().add_site(
+            data["url"],
+            float(data.get("interval_seconds", 7 * 24 * 3600)),
+            kind=data.get("kind", AUDIT_KINDS[0]),
+            modules=tuple(modules),
+            catch_up=data.get("catch_up"),
+        )
+    except (TypeError, ValueError) as err:
+        return jsonify({"error": str(err)}), 400
+    return jsonify(schedule), 201
+
+
+@app.route("/api/schedules/<int:schedule_id>", methods=["DELETE"])
+def delete_schedule(schedule_id: int):
+    if not get_scheduler().remove_site(schedule_id):
+        return jsonify({"error": "schedule not found"}), 404
+    return jsonify({"id": schedule_id, "status": "deleted"})
+
+
+@app.route("/api/metrics/sse", methods=["GET"])
+def sse_metrics():
+    """Backpressure policy and the events it coalesced or dropped and readers it evicted."""
+    return jsonify(STREAM_STATS.snapshot())
+
+
+@app.route("/api/metrics/llm", methods=["GET"])
+def llm_metrics():
+    """Limiter state, per-tenant queue waits, cache stats, per-task model latencies and prompt reuse."""
+    return jsonify({
+        **LLM_LIMITER.metrics(),
+        "cache": cache_stats(),
+        "routes": ROUTE_STATS.snapshot(),
+        "prompts": get_prompt_registry().stats(),
+        "checkpoints": checkpoint_stats(),
+    })
+
+
 @app.route("/api/health", methods=["GET"])
 def backend_health():
     crew_ok = CREW is not None
@@ -393,23 +789,70 @@ def backend_health():
     }), 200 if healthy else 503
 
 
+@app.route("/api/health/live", methods=["GET"])
+def liveness():
+    """In-process only: the worker is up and serving requests."""
+    return jsonify({"status": "ok"})
+
+
+def readiness_checks() -> dict[str, Any]:
+    def llm_queue() -> tuple[bool, Any]:
+        metrics = LLM_LIMITER.metrics()
+        detail = {key: metrics[key] for key in ("queued", "in_flight", "max_concurrency", "paused_for_ms")}
+        return metrics["queued"] <= READY_MAX_LLM_QUEUE, detail
+
+    def job_workers() -> tuple[bool, Any]:
+        with JOBS_LOCK:
+            active = sum(1 for job in JOBS.values() if job.status not in TERMINAL_JOB_STATUSES)
+        return active < READY_MAX_ACTIVE_JOBS, {"active_jobs": active, "max_active_jobs": READY_MAX_ACTIVE_JOBS}
+
+    return {
+        "crew_service": lambda: (CREW is not None, None),
+        "anthropic_key_present": lambda: (bool(os.environ.get("ANTHROPIC_API_KEY")), None),
+        "report_store": lambda: (get_report_store().ping(), None),
+        "llm_queue": llm_queue,
+        "job_workers": job_workers,
+    }
+
+
+@app.route("/api/health/ready", methods=["GET"])
+def readiness():
+    """Config loaded, store reachable and spare capacity; no LLM call is made."""
+    outcome = run_checks(readiness_checks())
+    return jsonify({"status": "ok" if outcome["ready"] else "error", **outcome}), 200 if outcome["ready"] else 503
+
+
+def _sparky_self_test() -> dict[str, Any]:
+    # Always a real provider round trip: a cached LLM answer would prove nothing.
+    with llm_scope("self-test", bypass=True, deadline_seconds=TEST_JOB_DEADLINE_SECONDS):
+        result = CREW.run_sparky_pipeline(SELF_TEST_URL)
+    return {key: result.get(key) for key in ("greeting", "categories", "summary", "short_summary")}
+
+
+SELF_TEST_PROBE = CachedProbe(
+    _sparky_self_test,
+    interval_seconds=SELF_TEST_INTERVAL_SECONDS,
+    failure_interval_seconds=SELF_TEST_FAILURE_INTERVAL_SECONDS,
+)
+
+
 @app.route("/api/test/self", methods=["GET"])
 def self_test_sparky_pipeline():
-    try:
-        result = CREW.run_sparky_pipeline("https://example.com")
-        return jsonify({
-            "status": "ok",
-            "greeting": result.get("greeting"),
-            "categories": result.get("categories"),
-            "summary": result.get("summary"),
-            "short_summary": result.get("short_summary"),
-            "message": "Sparky pipeline executed successfully",
-        })
-    except Exception as exc:  # noqa: BLE001
-        return jsonify({
-            "status": "error",
-            "message": str(exc),
-        }), 500
+    """
+    Deep probe: the full Sparky pipeline, run at most once per SELF_TEST_INTERVAL_SECONDS.
+
+    Calls in between get the cached outcome with its latency, age and timestamp.
+    """
+    outcome = SELF_TEST_PROBE.result()
+    meta = {key: outcome[key] for key in ("cached", "age_seconds", "latency_ms", "checked_at")}
+    if not outcome["ok"]:
+        return jsonify({"status": "error", "message": outcome["error"], **meta}), 500
+    return jsonify({
+        "status": "ok",
+        **outcome["result"],
+        "message": "Sparky pipeline executed successfully",
+        **meta,
+    })
 
 
 @app.route("/agent/start", methods=["POST"])
@@ -424,7 +867,15 @@ def start_agent():
     except ValueError as err:
         return jsonify({"error": str(err)}), 400
 
-    return jsonify({"status": "ready", "stream": f"/agent/stream?url={validated_url}"})
+    try:
+        sparky_mode = requested_sparky_mode(data)
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+
+    query = {"url": validated_url}
+    if sparky_mode:
+        query["sparky_mode"] = sparky_mode
+    return jsonify({"status": "ready", "stream": f"/agent/stream?{urlencode(query)}"})
 
 
 @app.route("/agent/stream", methods=["GET"])
@@ -435,16 +886,24 @@ def stream_agent():
 
     try:
         validated_url = validate_url(url)
+        sparky_mode = requested_sparky_mode(None)
     except ValueError as err:
         return jsonify({"error": str(err)}), 400
 
+    tenant = request_tenant()
+    bypass = request_cache_bypass()
+
     def event_stream():
-        try:
-            yield from stream_sparky_analysis(validated_url)
-            yield to_sse("done", {"ok": True})
-        except Exception as exc:  # noqa: BLE001
-            yield to_sse("error", {"message": str(exc)})
-            yield to_sse("done", {"ok": False})
+        with llm_scope(tenant, bypass, TEST_JOB_DEADLINE_SECONDS):
+            try:
+                yield from stream_sparky_analysis(validated_url, sparky_mode)
+                yield to_sse("done", {"ok": True})
+            except DeadlineExceeded as exc:
+                yield to_sse("error", {"message": str(exc), "code": "deadline_exceeded"})
+                yield to_sse("done", {"ok": False})
+            except Exception as exc:  # noqa: BLE001
+                yield to_sse("error", {"message": str(exc)})
+                yield to_sse("done", {"ok": False})
 
     response = Response(stream_with_context(event_stream()), mimetype="text/event-stream")
     response.headers["Cache-Control"] = "no-cache"
@@ -453,6 +912,29 @@ def stream_agent():
     return response
 
 
+def _resume_loop() -> None:
+    # Repeated because a dead process's jobs only become claimable once its heartbeat lapses.
+    while True:
+        resume_unfinished_jobs()
+        time.sleep(CHECKPOINT_HEARTBEAT_SECONDS)
+
+
+def start_background_services() -> None:
+    """
+    Per-process startup: the audit scheduler when SCHEDULER_ENABLED is set, and the
+    resume of interrupted jobs when RESUME_JOBS_ON_START is set.
+
+    Runs from ``__main__``; under a WSGI server call it from the worker start hook
+    (e.g. gunicorn's ``post_worker_init``). Every worker may call it: only one process
+    per schedule database dispatches, and each orphaned job is claimed by one process.
+    """
+    if SCHEDULER_ENABLED:
+        get_scheduler()
+    if RESUME_JOBS_ON_START:
+        threading.Thread(target=_resume_loop, name="job-resume", daemon=True).start()
+
+
 if __name__ == "__main__":
+    start_background_services()
     port = int(os.environ.get("PORT", 8000))
     app.run(host="0.0.0.0", port=port, threaded=True)
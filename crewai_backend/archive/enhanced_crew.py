@@ -1,7 +1,6 @@
 # latest_ai_development/src/latest_ai_development/enhanced_crew.py
 import os
 import json
-import requests
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 from urllib.parse import urlparse
@@ -9,6 +8,8 @@ from crewai import Agent, Task, Crew, Process
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
 
+from tools.fetch import fetch
+
 class URLAnalysisTool(BaseTool):
     """Tool for fetching and analyzing website content"""
     name: str = "URL Analysis Tool"
@@ -25,7 +26,7 @@ class URLAnalysisTool(BaseTool):
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
             }
-            response = requests.get(url, headers=headers, timeout=10)
+            response = fetch(url, headers=headers, timeout=10)
             response.raise_for_status()
             
             # Extract basic info
@@ -0,0 +1,100 @@
+"""
+Benchmark memory held per retained Sparky test job.
+
+Builds jobs with a typical event history (start, progress milestones, heartbeats,
+summary, completion) as the former dataclass + dict-per-event layout and as the slotted
+TestJob + JobEvent layout, and reports traced bytes per job.
+
+    python benchmarks/bench_job_memory.py --jobs 20000 --heartbeats 12
+"""
+import argparse
+import queue
+import sys
+import time
+import tracemalloc
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from jobs import JobEvent, TestJob, iso_timestamp  # noqa: E402
+
+
+@dataclass
+class LegacyTestJob:
+    id: str
+    url: str
+    status: str = "pending"
+    progress: float = 0.0
+    result: dict[str, Any] | None = None
+    error: str | None = None
+    tenant: str | None = None
+    cache_bypass: bool = False
+    deadline_at: float | None = None
+    sparky_mode: str | None = None
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+    events: list[dict[str, Any]] = field(default_factory=list)
+    subscribers: set["queue.Queue[dict[str, Any]]"] = field(default_factory=set)
+
+
+def event_history(index: int, heartbeats: int):
+    """``(type, payload)`` pairs as the worker emits them; strings that vary by job are built per job."""
+    yield "status", {"state": "in_progress", "message": "started"}
+    yield "debug", {"message": "Sparky pipeline bootstrapped"}
+    for progress, message in ((10, "Fetching HTML"), (30, "Analyzing accessibility"), (60, "Checking SEO"),
+                              (80, "Running security checks")):
+        yield "progress", {"progress": progress, "message": message}
+    for beat in range(heartbeats):
+        yield "status", {"state": "in_progress", "message": "heartbeat", "timestamp": 1.7e9 + index * 60 + beat * 10}
+    summary = f"Site {index} loads quickly; add alt text to the hero image."
+    yield "summary", {"summary": summary, "greeting": "Hi!", "short_summary": summary,
+                      "categories": [{"id": "seo", "issues": [], "severity": "medium"}], "message": "Analysis complete"}
+    yield "status", {"state": "completed", "message": "done"}
+
+
+def build_legacy(index: int, heartbeats: int) -> LegacyTestJob:
+    job = LegacyTestJob(id=uuid.uuid4().hex, url=f"https://site{index}.example")
+    # Heartbeats used to carry a preformatted ISO timestamp string.
+    job.events = [
+        {"type": event_type, **payload, **({"timestamp": iso_timestamp(payload["timestamp"])} if "timestamp" in payload else {})}
+        for event_type, payload in event_history(index, heartbeats)
+    ]
+    return job
+
+
+def build_compact(index: int, heartbeats: int) -> TestJob:
+    job = TestJob(id=uuid.uuid4().hex, url=f"https://site{index}.example")
+    for event_type, payload in event_history(index, heartbeats):
+        job.events.append(JobEvent.create(event_type, **payload), terminal=payload.get("state") == "completed")
+    return job
+
+
+def measure(build, jobs: int, heartbeats: int) -> float:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    retained = {index: build(index, heartbeats) for index in range(jobs)}
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del retained
+    return held / jobs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=20_000)
+    parser.add_argument("--heartbeats", type=int, default=12)
+    args = parser.parse_args()
+    legacy = measure(build_legacy, args.jobs, args.heartbeats)
+    compact = measure(build_compact, args.jobs, args.heartbeats)
+    events = sum(1 for _ in event_history(0, args.heartbeats))
+    print(f"{args.jobs} jobs, {events} events each")
+    print(f"dataclass + dict events : {legacy:8.0f} B/job, {legacy * args.jobs / 1e6:6.1f} MB")
+    print(f"slotted + JobEvent      : {compact:8.0f} B/job, {compact * args.jobs / 1e6:6.1f} MB "
+          f"({1 - compact / legacy:.0%} less)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark SSE frame encoding and LLM output decoding with the stdlib and orjson backends.
+
+Encodes events of increasing size the way ``to_sse`` frames them (old string framing with
+``json.dumps`` for reference) and decodes the matching JSON text.
+
+    python benchmarks/bench_json_codec.py --repeat 20000
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import json_codec  # noqa: E402
+
+
+def make_event(findings: int) -> dict:
+    return {
+        "type": "summary",
+        "test_id": "9f2c1e0b7a6d4c3b8e5f1a2d3c4b5a69",
+        "timestamp": "2026-03-01T12:00:00Z",
+        "summary": "Your homepage loads quickly but the hero image lacks alt text. " * max(1, findings // 4),
+        "categories": [
+            {"id": f"category-{i}", "severity": "medium", "issues": [f"Finding {i}: évaluer l'accessibilité"] * 3}
+            for i in range(findings)
+        ],
+    }
+
+
+def timed(repeat: int, func) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def legacy_frame(event: dict) -> bytes:
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n".encode("utf-8")
+
+
+def codec_frame(event: dict) -> bytes:
+    return b"event: " + event["type"].encode("utf-8") + b"\ndata: " + json_codec.dumps_bytes(event) + b"\n\n"
+
+
+def run(repeat: int) -> None:
+    backends = [("stdlib", False)] + ([("orjson", True)] if json_codec.orjson is not None else [])
+    print(f"{'event':>10}  {'legacy':>9}  " + "  ".join(f"{name + ' enc':>11}  {name + ' dec':>11}" for name, _ in backends))
+    for findings in (0, 5, 50, 500):
+        event = make_event(findings)
+        text = json_codec.dumps(event)
+        row = [f"{len(text):>8} B", f"{timed(repeat, lambda: legacy_frame(event)) * 1e6:7.2f}us"]
+        for _, accelerated in backends:
+            with patch.object(json_codec, "_ORJSON", accelerated):
+                row.append(f"{timed(repeat, lambda: codec_frame(event)) * 1e6:9.2f}us")
+                row.append(f"{timed(repeat, lambda: json_codec.loads(text)) * 1e6:9.2f}us")
+        print("  ".join(row))
+        repeat = max(100, repeat // 4)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20_000)
+    args = parser.parse_args()
+    run(args.repeat)
+
+
+if __name__ == "__main__":
+    main()
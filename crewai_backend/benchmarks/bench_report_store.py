@@ -0,0 +1,69 @@
+"""
+Benchmark ReportStore history queries on a large synthetic run history.
+
+Fills a temporary database with runs spread over many domains, then times the
+queries the history endpoints issue.
+
+    python benchmarks/bench_report_store.py --runs 100000
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from report_store import ReportStore  # noqa: E402
+
+MODULES = ("seo", "performance", "accessibility", "security", "content")
+MODELS = ("anthropic/claude-opus-4-6", "anthropic/claude-sonnet-4-5")
+
+
+def populate(store: ReportStore, runs: int, domains: int) -> None:
+    report = "## Prioritized repairs\n" + "- Add missing alt text to hero images.\n" * 40
+    for i in range(runs):
+        modules = {module: f"{module} findings for run {i}\n" * 20 for module in MODULES[: 1 + i % len(MODULES)]}
+        store.save(f"https://site{i % domains}.example", MODELS[i % 2], report, modules, created_at=1e9 + i)
+
+
+def timed(repeat: int, func) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(runs: int, domains: int, repeat: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ReportStore(str(Path(tmp) / "bench.sqlite3"))
+        start = time.perf_counter()
+        populate(store, runs, domains)
+        print(f"{runs} runs over {domains} domains inserted in {time.perf_counter() - start:.1f} s, "
+              f"{Path(store.path).stat().st_size / 1e6:.0f} MB on disk")
+        middle = 1e9 + runs / 2
+        queries = (
+            ("domain history (50)", lambda: store.list_runs(domain="site42.example")),
+            ("domain + model", lambda: store.list_runs(domain="site42.example", model=MODELS[0])),
+            ("domain + time range", lambda: store.list_runs(domain="site42.example", since=middle)),
+            ("module filter", lambda: store.list_runs(module="security", limit=100)),
+            ("latest run with body", lambda: store.latest("site42.example")),
+            ("diff two runs", lambda: store.diff_runs(42, 42 + domains)),
+        )
+        for name, func in queries:
+            print(f"{name:<22}: {timed(repeat, func) * 1000:7.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=100_000)
+    parser.add_argument("--domains", type=int, default=2_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    run(args.runs, args.domains, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
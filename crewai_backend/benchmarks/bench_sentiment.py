@@ -0,0 +1,76 @@
+"""
+Benchmark SERP snippet sentiment scoring throughput.
+
+Compares the previous per-call regex check with SentimentEngine.score and
+SentimentEngine.score_batch on synthetic snippets.
+
+    python benchmarks/bench_sentiment.py --snippets 200000
+"""
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from tools.sentiment import DEFAULT_LEXICON, SentimentEngine  # noqa: E402
+
+FILLER = (
+    "the company offers online services for customers with fast delivery and support "
+    "reviews about prices quality shipping team product store official website der die "
+    "und mit für kunden bewertungen"
+).split()
+
+
+def legacy_sentiment(text: str) -> str:
+    """SERPAnalyzer.simple_sentiment before the lexicon engine."""
+    neg_words = re.compile(r"\b(bad|problem|complaint|scam|fraud|negative|poor|kritik|schlecht|warnung)\b", re.I)
+    pos_words = re.compile(r"\b(good|excellent|recommended|positive|best|great|empfehlung|zufrieden)\b", re.I)
+    if neg_words.search(text):
+        return "negative"
+    elif pos_words.search(text):
+        return "positive"
+    return "neutral"
+
+
+def build_snippets(count: int, words: int, hit_rate: float) -> list:
+    rng = random.Random(360)
+    terms = [term for lexicon in DEFAULT_LEXICON.values() for term in lexicon]
+    return [
+        " ".join(rng.choice(terms) if rng.random() < hit_rate else rng.choice(FILLER) for _ in range(words)) + "."
+        for _ in range(count)
+    ]
+
+
+def timed(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def run(count: int, words: int, hit_rate: float) -> None:
+    snippets = build_snippets(count, words, hit_rate)
+    engine = SentimentEngine()
+    print(f"{count} snippets, {words} words each, {hit_rate:.1%} lexicon words")
+    for name, func in (
+        ("legacy regex per call", lambda: [legacy_sentiment(s) for s in snippets]),
+        ("engine score per call", lambda: [engine.score(s) for s in snippets]),
+        ("engine score_batch", lambda: engine.score_batch(snippets)),
+    ):
+        elapsed = timed(func)
+        print(f"{name:<22}: {elapsed * 1000:8.1f} ms  {count / elapsed:>10,.0f} snippets/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--snippets", type=int, default=200_000)
+    parser.add_argument("--words", type=int, default=25, help="words per snippet")
+    parser.add_argument("--hit-rate", type=float, default=0.03, help="share of words taken from the lexicon")
+    args = parser.parse_args()
+    run(args.snippets, args.words, args.hit_rate)
+
+
+if __name__ == "__main__":
+    main()
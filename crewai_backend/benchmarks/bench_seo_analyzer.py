@@ -0,0 +1,96 @@
+"""
+Benchmark SEOAnalyzer check time on large synthetic pages.
+
+Compares the legacy per-check find/find_all traversals with the single-pass
+PageElements walk, and times tree construction for each installed parser backend.
+
+    python benchmarks/bench_seo_analyzer.py --sections 2000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from tools.seo import SEOAnalyzer, resolve_parser  # noqa: E402
+
+
+def build_page(sections: int) -> str:
+    blocks = []
+    for i in range(sections):
+        alt = ' alt="x"' if i % 3 else ''
+        blocks.append(
+            f'<section><h2>Section {i}</h2><h3>Sub {i}</h3>'
+            f'<p>Paragraph {i} with <a href="/page-{i}">internal</a> and '
+            f'<a href="https://cdn{i % 7}.example.net/x">external</a> links.</p>'
+            f'<img src="/img-{i}.png"{alt}>'
+            f'<div><span>nested</span><ul><li>one</li><li>two</li></ul></div></section>'
+        )
+    return (
+        '<html><head><title>Benchmark page title</title>'
+        '<meta name="description" content="Synthetic page used to benchmark the analyzer checks.">'
+        '<link rel="canonical" href="https://example.com/"></head><body><header></header><main>'
+        '<h1>Benchmark</h1>' + "".join(blocks) + '</main><footer></footer></body></html>'
+    )
+
+
+def legacy_checks(soup: BeautifulSoup) -> None:
+    """The traversals run_all_checks made before the single-pass collector."""
+    soup.title
+    soup.find('meta', attrs={'name': 'description'})
+    for i in range(1, 7):
+        [t.get_text(strip=True) for t in soup.find_all(f'h{i}')]
+    soup.find_all('a', href=True)
+    soup.find_all('img')
+    for el in ('header', 'nav', 'main', 'section', 'article', 'aside', 'footer'):
+        soup.find(el)
+    soup.find('script', type='application/ld+json')
+    soup.find(attrs={'itemscope': True})
+    soup.find('link', rel='canonical')
+
+
+def best_of(repeat: int, func) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run(sections: int, repeat: int) -> None:
+    html = build_page(sections)
+    print(f"page: {sections} sections, {len(html) / 1024:.0f} KiB, best of {repeat}")
+
+    soup = BeautifulSoup(html, 'html.parser')
+    legacy = best_of(repeat, lambda: legacy_checks(soup))
+
+    def single_pass() -> None:
+        analyzer = SEOAnalyzer("https://example.com/")
+        analyzer.page_content, analyzer.soup = html, soup
+        analyzer.run_all_checks()
+
+    single = best_of(repeat, single_pass)
+    print(f"checks  legacy find_all : {legacy * 1000:8.1f} ms")
+    print(f"checks  single pass     : {single * 1000:8.1f} ms  ({legacy / single:.1f}x)")
+
+    baseline = None
+    for backend in dict.fromkeys(('html.parser', resolve_parser('fast'), resolve_parser('html5lib'))):
+        parse = best_of(repeat, lambda: BeautifulSoup(html, backend))
+        baseline = baseline or parse
+        print(f"parse   {backend:<16}: {parse * 1000:8.1f} ms  ({baseline / parse:.1f}x)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sections", type=int, default=2000, help="repeated content blocks per page")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.sections, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
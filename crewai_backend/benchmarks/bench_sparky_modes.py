@@ -0,0 +1,72 @@
+"""
+Benchmark the Sparky pipeline in two-call and single-call mode against live sites.
+
+Runs each mode alternately with the LLM response cache bypassed and reports wall-clock
+latency and the tokens each run consumed (provider-reported where available, as counted
+by the LLM limiter). Needs ANTHROPIC_API_KEY.
+
+    python benchmarks/bench_sparky_modes.py https://example.com --rounds 5
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from crew import SPARKY_MODES, CrewService  # noqa: E402
+from llm_cache import cache_bypass  # noqa: E402
+from llm_limiter import LLM_LIMITER, tenant_context  # noqa: E402
+
+
+def tenant_tokens(tenant: str) -> int:
+    return LLM_LIMITER.metrics()["tenants"].get(tenant, {}).get("tokens", 0)
+
+
+def run(urls, rounds: int, model: str) -> None:
+    service = CrewService(model=model)
+    samples = {mode: {"seconds": [], "tokens": [], "failures": 0} for mode in SPARKY_MODES}
+    for round_number in range(rounds):
+        for url in urls:
+            # Alternate the order so neither mode consistently runs on a warmer provider.
+            modes = SPARKY_MODES if round_number % 2 == 0 else tuple(reversed(SPARKY_MODES))
+            for mode in modes:
+                tenant = f"bench-{mode}"
+                before = tenant_tokens(tenant)
+                start = time.perf_counter()
+                try:
+                    with tenant_context(tenant), cache_bypass(True):
+                        service.run_sparky_pipeline(url, mode=mode)
+                except Exception as exc:  # noqa: BLE001
+                    samples[mode]["failures"] += 1
+                    print(f"{mode:<11} {url}: failed: {exc}")
+                    continue
+                seconds = time.perf_counter() - start
+                tokens = tenant_tokens(tenant) - before
+                samples[mode]["seconds"].append(seconds)
+                samples[mode]["tokens"].append(tokens)
+                print(f"{mode:<11} {url}: {seconds:6.1f} s, {tokens:6d} tokens")
+
+    print()
+    for mode, sample in samples.items():
+        seconds, tokens = sorted(sample["seconds"]), sample["tokens"]
+        if not seconds:
+            print(f"{mode:<11}: no successful runs ({sample['failures']} failed)")
+            continue
+        p95 = seconds[min(len(seconds) - 1, int(0.95 * len(seconds)))]
+        print(f"{mode:<11}: median {statistics.median(seconds):6.1f} s, p95 {p95:6.1f} s, "
+              f"mean {statistics.mean(tokens):7.0f} tokens/run, {sample['failures']} failed")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("urls", nargs="+")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--model", default="anthropic/claude-opus-4-6")
+    args = parser.parse_args()
+    run(args.urls, args.rounds, args.model)
+
+
+if __name__ == "__main__":
+    main()
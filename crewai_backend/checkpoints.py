@@ -0,0 +1,320 @@
+"""
+checkpoints.py
+CheckpointStore: running jobs and the outputs of their completed stages, kept on disk.
+
+Worker threads are daemons, so a deploy or crash mid-job loses everything still in
+memory. A job run inside ``checkpoint_job`` is recorded with the parameters needed to
+start it again, and each stage it completes (a Sparky snapshot, a summary, one audit
+module) is saved under its id. The record is deleted when the job returns or raises;
+one left behind belongs to a process that died, and is resumed with its completed
+stages read back instead of re-run.
+
+Several processes may share the store. Each one that runs jobs heartbeats under its own
+owner id. ``claim_orphans`` hands a job over only once its owner has stopped
+heartbeating, and it does so in one write transaction, so exactly one process resumes
+it. Every run of a job counts as an attempt. A job that has taken down its process
+CHECKPOINT_MAX_ATTEMPTS times is marked failed and not resumed again.
+"""
+from __future__ import annotations
+
+import contextvars
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import json_codec
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_DB_PATH = os.environ.get("CHECKPOINT_DB_PATH") or str(
+    Path(__file__).resolve().parent / "reports" / "checkpoints.sqlite3"
+)
+# Jobs interrupted longer ago than this are dropped instead of resumed.
+CHECKPOINT_TTL_SECONDS = float(os.environ.get("CHECKPOINT_TTL_SECONDS", str(6 * 3600)))
+CHECKPOINT_MAX_ATTEMPTS = int(os.environ.get("CHECKPOINT_MAX_ATTEMPTS", "3"))
+# Processes running jobs refresh their owner row this often; one silent for three
+# intervals is considered dead and its jobs may be claimed.
+CHECKPOINT_HEARTBEAT_SECONDS = float(os.environ.get("CHECKPOINT_HEARTBEAT_SECONDS", "30"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    params TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    owner TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    failed_at REAL
+);
+CREATE TABLE IF NOT EXISTS owners (
+    owner TEXT PRIMARY KEY,
+    seen_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS stages (
+    job_id TEXT NOT NULL REFERENCES jobs (id) ON DELETE CASCADE,
+    stage TEXT NOT NULL,
+    output TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (job_id, stage)
+);
+"""
+
+
+class CheckpointStore:
+    """
+    SQLite store of unfinished jobs and their stage outputs.
+
+    One connection is shared behind a lock; a job writes a handful of rows, each after
+    an LLM call, so contention is negligible.
+    """
+
+    def __init__(
+        self,
+        path: str = CHECKPOINT_DB_PATH,
+        ttl_seconds: float = CHECKPOINT_TTL_SECONDS,
+        max_attempts: int = CHECKPOINT_MAX_ATTEMPTS,
+        heartbeat_seconds: float = CHECKPOINT_HEARTBEAT_SECONDS,
+    ):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_attempts = max_attempts
+        self.heartbeat_seconds = heartbeat_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.saved_stages = 0
+        self.resumed_stages = 0
+        self._lock = threading.Lock()
+        self._heartbeat: Optional[threading.Thread] = None
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA foreign_keys=ON")
+            self._db.executescript(_SCHEMA)
+            columns = {row[1] for row in self._db.execute("PRAGMA table_info(jobs)")}
+            for column, ddl in (("owner", "TEXT"), ("attempts", "INTEGER NOT NULL DEFAULT 0"), ("failed_at", "REAL")):
+                if column not in columns:
+                    self._db.execute(f"ALTER TABLE jobs ADD COLUMN {column} {ddl}")
+
+    def start(self, job_id: str, kind: str, params: Dict[str, Any]) -> None:
+        """Record ``job_id`` as running here and count the attempt; a resumed job keeps its stages and creation time."""
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT INTO jobs (id, kind, params, created_at, updated_at, owner, attempts) "
+                "VALUES (?, ?, ?, ?, ?, ?, 1) "
+                "ON CONFLICT (id) DO UPDATE SET updated_at = excluded.updated_at, owner = excluded.owner, "
+                "attempts = attempts + 1",
+                (job_id, kind, json_codec.dumps(params), now, now, self.owner),
+            )
+            self._beat(now)
+        self._start_heartbeat()
+
+    def _beat(self, now: float) -> None:
+        self._db.execute("INSERT OR REPLACE INTO owners (owner, seen_at) VALUES (?, ?)", (self.owner, now))
+
+    def _start_heartbeat(self) -> None:
+        with self._lock:
+            if self._heartbeat is not None or self.path == ":memory:":
+                return
+            self._heartbeat = threading.Thread(target=self._heartbeat_loop, name="checkpoint-heartbeat", daemon=True)
+            self._heartbeat.start()
+
+    def _heartbeat_loop(self) -> None:
+        while True:
+            time.sleep(self.heartbeat_seconds)
+            try:
+                with self._lock, self._db:
+                    self._beat(time.time())
+            except sqlite3.Error as exc:
+                logger.warning("Checkpoint heartbeat failed: %s", exc)
+
+    def save_stage(self, job_id: str, stage: str, output: str) -> None:
+        now = time.time()
+        with self._lock, self._db:
+            if self._db.execute("UPDATE jobs SET updated_at = ? WHERE id = ?", (now, job_id)).rowcount == 0:
+                return
+            self._db.execute(
+                "INSERT OR REPLACE INTO stages (job_id, stage, output, created_at) VALUES (?, ?, ?, ?)",
+                (job_id, stage, output, now),
+            )
+            self.saved_stages += 1
+
+    def get_stage(self, job_id: str, stage: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT output FROM stages WHERE job_id = ? AND stage = ?", (job_id, stage)
+            ).fetchone()
+            if row is not None:
+                self.resumed_stages += 1
+        return row[0] if row is not None else None
+
+    def stages(self, job_id: str) -> Dict[str, str]:
+        with self._lock:
+            return dict(self._db.execute("SELECT stage, output FROM stages WHERE job_id = ?", (job_id,)))
+
+    def finish(self, job_id: str) -> None:
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+
+    def unfinished(self) -> List[Dict[str, Any]]:
+        """Jobs not finished (by any process) and not failed, oldest first; expired ones are deleted."""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM jobs WHERE updated_at < ?", (time.time() - self.ttl_seconds,))
+            rows = self._db.execute(
+                "SELECT id, kind, params, created_at, attempts FROM jobs WHERE failed_at IS NULL ORDER BY created_at"
+            ).fetchall()
+        return [self._record(row) for row in rows]
+
+    def claim_orphans(self) -> List[Dict[str, Any]]:
+        """
+        Take over the jobs whose process stopped heartbeating, oldest first.
+
+        Runs as one write transaction, so concurrent callers never claim the same job.
+        Jobs that already used ``max_attempts`` are marked failed instead.
+        """
+        now = time.time()
+        orphaned = "failed_at IS NULL AND (owner IS NULL OR owner NOT IN (SELECT owner FROM owners))"
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM jobs WHERE updated_at < ?", (now - self.ttl_seconds,))
+            self._beat(now)
+            self._db.execute("DELETE FROM owners WHERE seen_at < ?", (now - 3 * self.heartbeat_seconds,))
+            exhausted = self._db.execute(
+                f"SELECT id FROM jobs WHERE {orphaned} AND attempts >= ?", (self.max_attempts,)
+            ).fetchall()
+            self._db.executemany("UPDATE jobs SET failed_at = ? WHERE id = ?", [(now, row[0]) for row in exhausted])
+            rows = self._db.execute(
+                f"SELECT id, kind, params, created_at, attempts FROM jobs WHERE {orphaned} ORDER BY created_at"
+            ).fetchall()
+            self._db.executemany("UPDATE jobs SET owner = ? WHERE id = ?", [(self.owner, row[0]) for row in rows])
+        for (job_id,) in exhausted:
+            logger.warning("Checkpointed job %s failed %d times; not resuming it", job_id, self.max_attempts)
+        if rows:
+            self._start_heartbeat()
+        return [self._record(row) for row in rows]
+
+    @staticmethod
+    def _record(row: Tuple[Any, ...]) -> Dict[str, Any]:
+        job_id, kind, params, created_at, attempts = row
+        return {
+            "id": job_id, "kind": kind, "params": json_codec.loads(params),
+            "created_at": created_at, "attempts": attempts,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            jobs, failed = self._db.execute(
+                "SELECT COUNT(*) - COUNT(failed_at), COUNT(failed_at) FROM jobs"
+            ).fetchone()
+            return {
+                "unfinished_jobs": jobs,
+                "failed_jobs": failed,
+                "saved_stages": self.saved_stages,
+                "resumed_stages": self.resumed_stages,
+            }
+
+
+_CHECKPOINT_STORE: Optional[CheckpointStore] = None
+_CHECKPOINT_STORE_LOCK = threading.Lock()
+
+_SCOPE: contextvars.ContextVar[Optional[Tuple[CheckpointStore, str]]] = contextvars.ContextVar(
+    "checkpoint_scope", default=None
+)
+
+
+def get_checkpoint_store() -> CheckpointStore:
+    """Process-wide store, created on first use so importing never touches the disk."""
+    global _CHECKPOINT_STORE
+    with _CHECKPOINT_STORE_LOCK:
+        if _CHECKPOINT_STORE is None:
+            _CHECKPOINT_STORE = CheckpointStore()
+        return _CHECKPOINT_STORE
+
+
+def checkpoint_stats() -> Optional[Dict[str, Any]]:
+    """Stats of the process-wide store, or ``None`` while nothing has opened it yet."""
+    store = _CHECKPOINT_STORE
+    return store.stats() if store is not None else None
+
+
+def _guarded(what: str, call: Callable[[], Any], default: Any = None) -> Any:
+    # A checkpoint is an optimization: a failing store must not fail the job.
+    try:
+        return call()
+    except sqlite3.Error as exc:
+        logger.warning("Checkpoint %s failed: %s", what, exc)
+        return default
+
+
+@contextmanager
+def checkpoint_job(
+    job_id: str, kind: str, params: Dict[str, Any], store: Optional[CheckpointStore] = None
+) -> Iterator[None]:
+    """
+    Record ``job_id`` as running and checkpoint the stages completed in this block.
+
+    The record is deleted once the block returns or raises, so only a job whose process
+    dies inside the block is resumed.
+    """
+    store = store or get_checkpoint_store()
+    _guarded("start", lambda: store.start(job_id, kind, params))
+    token = _SCOPE.set((store, job_id))
+    try:
+        yield
+    except Exception:
+        _guarded("finish", lambda: store.finish(job_id))
+        raise
+    else:
+        _guarded("finish", lambda: store.finish(job_id))
+    finally:
+        _SCOPE.reset(token)
+
+
+def checkpointed(stage: str, compute: Callable[[], str]) -> str:
+    """The saved output of ``stage`` for the current job, else ``compute()``, saved once it returns."""
+    scope = _SCOPE.get()
+    if scope is None:
+        return compute()
+    store, job_id = scope
+    saved = _guarded("read", lambda: store.get_stage(job_id, stage))
+    if saved is not None:
+        logger.info("Resuming job %s from checkpointed stage %s", job_id, stage)
+        return saved
+    output = compute()
+    _guarded("write", lambda: store.save_stage(job_id, stage, output))
+    return output
+
+
+def completed_stages() -> Dict[str, str]:
+    """Saved stage outputs of the current job; empty outside ``checkpoint_job``."""
+    scope = _SCOPE.get()
+    if scope is None:
+        return {}
+    store, job_id = scope
+    return _guarded("read", lambda: store.stages(job_id), {})
+
+
+def stage_recorder() -> Optional[Callable[[str, str], None]]:
+    """
+    ``record(stage, output)`` bound to the current job, or ``None`` outside ``checkpoint_job``.
+
+    For outputs reported by callbacks that may run outside this context, such as
+    CrewAI task callbacks.
+    """
+    scope = _SCOPE.get()
+    if scope is None:
+        return None
+    store, job_id = scope
+
+    def record(stage: str, output: str) -> None:
+        _guarded("write", lambda: store.save_stage(job_id, stage, output))
+
+    return record
@@ -1,17 +1,110 @@
 from __future__ import annotations
-from datetime import datetime
 from pathlib import Path
-import json
 import logging
-import re
-from typing import Any, Dict, List, Optional
+import os
+import sqlite3
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional
 from urllib.parse import urlparse
 
 import yaml
 from crewai import Agent, Crew, Process, Task
 
+try:
+    import anthropic
+except Exception:  # noqa: BLE001
+    anthropic = None
+
+from checkpoints import checkpointed, completed_stages, stage_recorder
+from deadline import check_cancelled, check_deadline, current_cancel, guarded_call, remaining
+from json_extract import extract_best_json
+from llm_cache import CachedCrewOutput, cache_bypassed, crew_key, get_llm_cache, prompt_key, task_cache_enabled
+from llm_limiter import LLM_LIMITER, is_throttle_error
+from model_router import PINNED_PROVIDER_MODEL, ModelRouter, ModelRoutingError, ModelSpec
+from prompt_registry import PromptError, PromptRegistry, RenderedPrompt, get_prompt_registry
+from report_store import ReportStore
+from tools.fingerprint import INPUT_REGIONS, fetch_region_digests, module_fingerprint
+
 logger = logging.getLogger(__name__)
 
+# Output tokens budgeted per task before the provider reports real usage.
+LLM_OUTPUT_TOKEN_ESTIMATE = int(os.environ.get("LLM_OUTPUT_TOKEN_ESTIMATE", "1500"))
+# "two_call": snapshot, then a summary of it; "single_call": one combined snapshot + summary.
+SPARKY_MODES = ("two_call", "single_call")
+SPARKY_MODE = os.environ.get("SPARKY_MODE", "two_call")
+# Checkpoint stage name of an audit module's output (see checkpoints.checkpoint_job).
+MODULE_STAGE_PREFIX = "module:"
+
+
+def _usage_tokens(crew: Any) -> Optional[float]:
+    total = getattr(getattr(crew, "usage_metrics", None), "total_tokens", None)
+    return float(total) if total else None
+
+
+def _cache_get(key: str) -> Optional[Dict[str, Any]]:
+    try:
+        return get_llm_cache().get(key)
+    except sqlite3.Error as exc:
+        logger.warning("LLM cache read failed: %s", exc)
+        return None
+
+
+def _cache_put(key: str, value: Dict[str, Any]) -> None:
+    try:
+        get_llm_cache().put(key, value)
+    except sqlite3.Error as exc:
+        logger.warning("LLM cache write failed: %s", exc)
+
+
+def render_task_prompt(prompts: PromptRegistry, task_cfg: Dict[str, Any], **variables: Any) -> RenderedPrompt:
+    """A task's ``prompt:`` template from the registry, or its inline ``description``."""
+    if task_cfg.get("prompt"):
+        return prompts.render(task_cfg["prompt"], **variables)
+    suffix = task_cfg["description"].format(**variables)
+    return RenderedPrompt(name="", version=None, prefix="", suffix=suffix, prefix_hash=None)
+
+
+def missing_prompts(prompts: PromptRegistry, tasks_config: Dict[str, Any], task_ids: List[str]) -> List[str]:
+    """Tasks among ``task_ids`` whose ``prompt:`` is unknown or that have no prompt text at all."""
+    missing = []
+    for task_id in task_ids:
+        task_cfg = tasks_config[task_id]
+        name = task_cfg.get("prompt")
+        if (name and name not in prompts) or (not name and not task_cfg.get("description")):
+            missing.append(task_id)
+    return missing
+
+
+def kickoff_limited(crew: Crew, inputs: Dict[str, Any], cache_model: Optional[str] = None) -> Any:
+    """
+    ``crew.kickoff`` admitted through the shared LLM limiter (one request per task).
+
+    With ``cache_model`` set, the output is looked up in / stored to the LLM response
+    cache under a key of that model, the crew's prompts and ``inputs``; a cache bypass
+    in effect skips the lookup but still refreshes the entry. Nothing runs once the
+    guarded call this belongs to has been abandoned.
+    """
+    check_cancelled("crew kickoff")
+    tasks = list(crew.tasks)
+    key = crew_key(cache_model, crew, inputs) if cache_model else None
+    if key is not None and not cache_bypassed():
+        cached = _cache_get(key)
+        if cached is not None:
+            return CachedCrewOutput(cached["tasks_output"], cached["raw"])
+    estimate = sum(len(task.description) // 4 + LLM_OUTPUT_TOKEN_ESTIMATE for task in tasks)
+    left = remaining()
+    result = LLM_LIMITER.run(
+        lambda: crew.kickoff(inputs=inputs),
+        tokens=estimate,
+        requests=max(1, len(tasks)),
+        usage=lambda _result: _usage_tokens(crew),
+        timeout=None if left is None else max(0.0, left),
+    )
+    if key is not None:
+        tasks_output = getattr(result, "tasks_output", None) or []
+        _cache_put(key, {"tasks_output": [str(output) for output in tasks_output], "raw": str(result)})
+    return result
+
 class ConfigurationError(Exception):
     """Raised when static crew configuration is invalid."""
 
@@ -32,13 +125,33 @@ class WebsiteAnalyzerCrew:
         "wordpress": "wordpress_audit_task",
         "sparky": "site_snapshot_task",
     }
+    # Page regions (tools.fingerprint.INPUT_REGIONS) each module's task reads. On re-audit a
+    # module is re-executed only if one of these regions, its prompt or the model changed.
+    MODULE_INPUTS = {
+        "seo": ("head", "headings", "text", "links", "images"),
+        "performance": ("scripts", "styles", "images", "headers"),
+        "accessibility": ("head", "headings", "images", "forms", "landmarks"),
+        "security": ("headers", "scripts", "forms"),
+        "content": ("head", "headings", "text"),
+        "wordpress": ("head", "scripts", "styles", "headers"),
+        "sparky": INPUT_REGIONS,
+    }
 
-    def __init__(self) -> None:
+    def __init__(self, report_store: Optional[ReportStore] = None) -> None:
+        self.report_store = report_store
         self.agents_config = self._read_yaml("agents.yaml")
         self.tasks_config = self._read_yaml("tasks.yaml")
         self.models_config = self._read_yaml("models.yaml")
         self.default_model_name = self.models_config.get("default_model", "claude_opus")
         self.model_settings = self.models_config["models"][self.default_model_name]
+        try:
+            self.prompts = get_prompt_registry()
+        except PromptError as exc:
+            raise ConfigurationError(str(exc)) from exc
+        try:
+            self.router = ModelRouter(self.models_config)
+        except ModelRoutingError as exc:
+            raise ConfigurationError(str(exc)) from exc
         self._validate_configuration()
 
     def _read_yaml(self, filename: str) -> Dict[str, Any]:
@@ -62,11 +175,20 @@ class WebsiteAnalyzerCrew:
             if not agent_id or agent_id not in self.agents_config:
                 raise ConfigurationError(f"Task '{task_id}' references unknown agent '{agent_id}'")
 
+        unresolved = missing_prompts(self.prompts, self.tasks_config, list(self.MODULE_TASK_MAP.values()))
+        if unresolved:
+            raise ConfigurationError(f"Tasks without a known prompt: {unresolved}")
+
         provider_model = self.model_settings.get("provider_model")
-        if provider_model != "anthropic/claude-opus-4-6":
+        if provider_model != PINNED_PROVIDER_MODEL:
             raise ConfigurationError(
-                "Production model drift detected: default model must resolve to anthropic/claude-opus-4-6"
+                f"Production model drift detected: default model must resolve to {PINNED_PROVIDER_MODEL}"
             )
+        # Audit modules and the report feed deployment decisions: all stay on the pinned model.
+        try:
+            self.router.check_drift(PINNED_PROVIDER_MODEL, [*self.MODULE_TASK_MAP.values(), "reporting_task"])
+        except ModelRoutingError as exc:
+            raise ConfigurationError(str(exc)) from exc
 
     def _normalize_modules(self, selected: List[str]) -> List[str]:
         if not selected:
@@ -95,26 +217,38 @@ class WebsiteAnalyzerCrew:
             task_id = self.MODULE_TASK_MAP[module]
             agent_id = self.tasks_config[task_id]["agent"]
             cfg = self.agents_config[agent_id]
+            model = self.router.select(task_id)
             agents[module] = Agent(
                 role=cfg["role"],
                 goal=cfg["goal"],
                 backstory=cfg["backstory"],
-                llm=self.model_settings["provider_model"],
+                llm=model.provider_model,
                 verbose=False,
                 allow_delegation=False,
-                max_iter=self.model_settings.get("max_iter", 1),
+                max_iter=model.get("max_iter", 1),
             )
         return agents
 
-    def build_tasks(self, selected_modules: List[str], url: str, agents: Dict[str, Agent]) -> List[Task]:
+    def build_tasks(
+        self,
+        selected_modules: List[str],
+        url: str,
+        agents: Dict[str, Agent],
+        on_output: Optional[Callable[[str, str], None]] = None,
+    ) -> List[Task]:
+        """Module tasks in order; ``on_output(module, output)`` is called as each one completes."""
         tasks: List[Task] = []
         for module in selected_modules:
             task_cfg = self.tasks_config[self.MODULE_TASK_MAP[module]]
+            extra: Dict[str, Any] = {}
+            if on_output is not None:
+                extra["callback"] = lambda output, module=module: on_output(module, str(output))
             tasks.append(
                 Task(
-                    description=task_cfg["description"].format(url=url),
+                    description=render_task_prompt(self.prompts, task_cfg, url=url).text,
                     expected_output=task_cfg["expected_output"],
                     agent=agents[module],
+                    **extra,
                 )
             )
         return tasks
@@ -124,73 +258,173 @@ class WebsiteAnalyzerCrew:
         url: str,
         selected_modules: List[str],
         context_tasks: List[Task],
-        output_file: str,
+        output_file: Optional[str] = None,
+        reused_outputs: Optional[Dict[str, str]] = None,
+        resumed_outputs: Optional[Dict[str, str]] = None,
     ) -> Task:
         report_agent_cfg = self.agents_config["reporting_analyst"]
         reporting_agent = Agent(
             role=report_agent_cfg["role"],
             goal=report_agent_cfg["goal"],
             backstory=report_agent_cfg["backstory"],
-            llm=self.model_settings["provider_model"],
+            llm=self.router.select("reporting_task").provider_model,
             verbose=False,
             allow_delegation=False,
             max_iter=1,
         )
+        description = (
+            f"Synthesize module outputs for {url}. "
+            f"Modules executed in deterministic order: {', '.join(selected_modules)}. "
+            "Report must include prioritized repairs, blockers, and production deployment readiness verdict."
+        )
+        if reused_outputs:
+            description += "\n\nThe inputs of these modules are unchanged since the previous audit; their earlier outputs:"
+            for module, output in reused_outputs.items():
+                description += f"\n\n### {module}\n{output}"
+        if resumed_outputs:
+            description += "\n\nThese modules completed before this audit was interrupted; their outputs:"
+            for module, output in resumed_outputs.items():
+                description += f"\n\n### {module}\n{output}"
         return Task(
-            description=(
-                f"Synthesize module outputs for {url}. "
-                f"Modules executed in deterministic order: {', '.join(selected_modules)}. "
-                "Report must include prioritized repairs, blockers, and production deployment readiness verdict."
-            ),
+            description=description,
             expected_output="Structured markdown report for deployment decision-making.",
             agent=reporting_agent,
             context=context_tasks,
             output_file=output_file,
         )
 
-    def analyze_website(self, selected: List[str], url: str) -> Dict[str, Any]:
-        normalized_url = self._sanitize_url(url)
-        selected_modules = self._normalize_modules(selected)
-
-        agents = self.build_agents(selected_modules)
-        module_tasks = self.build_tasks(selected_modules, normalized_url, agents)
+    def _store(self) -> ReportStore:
+        if self.report_store is None:
+            self.report_store = ReportStore()
+        return self.report_store
 
-        timestamp = datetime.now().strftime("%Y-%m-%d-%H-%M")
-        url_slug = normalized_url.replace("https://", "").replace("http://", "").replace("/", "_")
-        report_file = f"report_{url_slug}_{timestamp}.md"
+    def module_fingerprints(self, url: str, modules: List[str]) -> Dict[str, Optional[str]]:
+        """Input fingerprint per module, or an empty mapping if the page cannot be fetched."""
+        try:
+            regions = fetch_region_digests(url)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Fingerprinting %s failed, re-running all modules: %s", url, exc)
+            return {}
+        fingerprints: Dict[str, Optional[str]] = {}
+        for module in modules:
+            task_cfg = self.tasks_config[self.MODULE_TASK_MAP[module]]
+            model = self.router.select(self.MODULE_TASK_MAP[module]).provider_model
+            prompt = render_task_prompt(self.prompts, task_cfg, url=url)
+            salt = [prompt.text, task_cfg["expected_output"], model]
+            fingerprints[module] = module_fingerprint(regions, self.MODULE_INPUTS[module], salt)
+        return fingerprints
 
-        reporting_task = self.build_reporting_task(
-            normalized_url,
-            selected_modules,
-            module_tasks,
-            report_file,
-        )
+    def analyze_website(self, selected: List[str], url: str, incremental: bool = True) -> Dict[str, Any]:
+        """
+        Run the selected modules plus the reporting task and store the run.
 
-        crew = Crew(
-            agents=list(agents.values()) + [reporting_task.agent],
-            tasks=module_tasks + [reporting_task],
-            process=Process.sequential,
-            verbose=False,
+        With ``incremental`` (the default), modules whose input fingerprint matches a
+        stored output for this URL and model are not re-executed; that output is handed
+        to the reporting task instead. Inside a checkpointed job each module's output is
+        saved as it completes, and modules a resumed job already completed are handed
+        over the same way.
+        """
+        normalized_url = self._sanitize_url(url)
+        selected_modules = self._normalize_modules(selected)
+        model = self.model_settings["provider_model"]
+
+        fingerprints = self.module_fingerprints(normalized_url, selected_modules) if incremental else {}
+        reused = self._store().reusable_outputs(normalized_url, model, fingerprints) if fingerprints else {}
+        pending = [module for module in selected_modules if module not in reused]
+        record_stage = stage_recorder()
+
+        def module_checkpoints() -> Dict[str, str]:
+            saved = completed_stages()
+            return {
+                module: saved[MODULE_STAGE_PREFIX + module]
+                for module in pending if MODULE_STAGE_PREFIX + module in saved
+            }
+
+        task_ids = [self.MODULE_TASK_MAP[module] for module in pending] + ["reporting_task"]
+        task_models = [self.router.select(task_id) for task_id in task_ids]
+
+        def attempt() -> Any:
+            # Built per attempt: a timed-out crew may still be running and must not be reused.
+            # Modules it checkpointed before timing out are not run again.
+            resumed = module_checkpoints()
+            run_modules = [module for module in pending if module not in resumed]
+            attempt_ids = [self.MODULE_TASK_MAP[module] for module in run_modules] + ["reporting_task"]
+            crew_models = ",".join(
+                dict.fromkeys(self.router.select(task_id).provider_model for task_id in attempt_ids)
+            )
+            cancel = current_cancel()
+
+            def on_output(module: str, output: str) -> None:
+                # Task callbacks run outside this context: check the captured token, and raise
+                # so an abandoned crew neither checkpoints nor starts its next task.
+                check_cancelled(f"audit of {normalized_url}", cancel)
+                if record_stage is not None:
+                    record_stage(MODULE_STAGE_PREFIX + module, output)
+
+            agents = self.build_agents(run_modules)
+            module_tasks = self.build_tasks(run_modules, normalized_url, agents, on_output=on_output)
+            reporting_task = self.build_reporting_task(
+                normalized_url,
+                selected_modules,
+                module_tasks,
+                reused_outputs={module: entry["output"] for module, entry in reused.items()},
+                resumed_outputs=resumed,
+            )
+            crew = Crew(
+                agents=list(agents.values()) + [reporting_task.agent],
+                tasks=module_tasks + [reporting_task],
+                process=Process.sequential,
+                verbose=False,
+            )
+            cache_model = crew_models if task_cache_enabled(self.tasks_config, attempt_ids) else None
+            return crew, run_modules, resumed, kickoff_limited(crew, {"url": normalized_url}, cache_model=cache_model)
+
+        # Tasks run sequentially, so the crew may take the sum of its tasks' timeouts.
+        crew, run_modules, resumed, result = guarded_call(
+            attempt,
+            timeout=sum(float(spec.get("timeout_seconds", 60)) for spec in task_models),
+            retries=int(self.model_settings.get("retry_limit", 0)),
+            what=f"audit of {normalized_url}",
         )
 
-        result = crew.kickoff(inputs={"url": normalized_url})
-
-        module_results: Dict[str, Any] = {}
+        fresh_results: Dict[str, Any] = {}
         if hasattr(result, "tasks_output"):
-            for idx, module in enumerate(selected_modules):
-                module_results[module] = str(result.tasks_output[idx]) if idx < len(result.tasks_output) else "No output"
+            for idx, module in enumerate(run_modules):
+                if idx < len(result.tasks_output):
+                    fresh_results[module] = str(result.tasks_output[idx])
             report_output = str(result.tasks_output[-1]) if result.tasks_output else str(result)
         else:
             report_output = str(result)
+        fresh_results.update(resumed)
+        module_results = {
+            module: reused[module]["output"] if module in reused else fresh_results.get(module, "No output")
+            for module in selected_modules
+        }
+
+        usage_metrics = getattr(crew, "usage_metrics", None)
+        report_id = self._store().save(
+            normalized_url,
+            model,
+            report_output,
+            module_results,
+            usage=usage_metrics.model_dump() if hasattr(usage_metrics, "model_dump") else usage_metrics,
+            # Outputs without a real answer are stored unfingerprinted so they are never reused.
+            fingerprints={
+                module: fingerprint for module, fingerprint in fingerprints.items()
+                if module in reused or module in fresh_results
+            },
+        )
 
         return {
             "url": normalized_url,
             "selected_modules": selected_modules,
             "results": module_results,
+            "reused_modules": [module for module in selected_modules if module in reused],
+            "resumed_modules": [module for module in selected_modules if module in resumed],
             "report": report_output,
-            "markdown_report_file": report_file,
-            "usage_metrics": getattr(crew, "usage_metrics", None),
-            "model": self.model_settings["provider_model"],
+            "report_id": report_id,
+            "usage_metrics": usage_metrics,
+            "model": model,
         }
 
 class CrewService:
@@ -203,16 +437,29 @@ class CrewService:
         "site_snapshot": "site_snapshot",
         "site_snapshot_task": "site_snapshot_task",
         "generate_sparky_summary": "sparky_summary",
+        "sparky_combined": "sparky_combined_task",
         "repair_accessibility": "accessibility_repair",
     }
 
     CONFIG_DIR = WebsiteAnalyzerCrew.CONFIG_DIR
+    STREAM_MAX_TOKENS = 4096
 
     def __init__(self, model: str = "anthropic/claude-opus-4-6", config_dir: Optional[Path] = None) -> None:
         self.config_dir = config_dir or self.CONFIG_DIR
         self.model = model
+        self._anthropic_client: Any = None
+        try:
+            self.prompts = get_prompt_registry()
+        except PromptError as exc:
+            raise CrewConfigurationError(str(exc)) from exc
         self.agents_config = self._read_yaml("agents.yaml")
         self.tasks_config = self._read_yaml("tasks.yaml")
+        models_config = self._read_yaml("models.yaml") if (self.config_dir / "models.yaml").exists() else {}
+        try:
+            # Routed tasks use their models.yaml chain; everything else uses ``model``.
+            self.router = ModelRouter(models_config, default_provider_model=model)
+        except ModelRoutingError as exc:
+            raise CrewConfigurationError(str(exc)) from exc
         self._validate()
 
     def _read_yaml(self, name: str) -> Dict[str, Any]:
@@ -230,6 +477,7 @@ class CrewService:
         required_tasks = {
             "site_snapshot_task": "site_snapshot_task",
             "generate_sparky_summary": "sparky_summary",
+            "sparky_combined": "sparky_combined_task",
         }
 
         for task_key, task_id in required_tasks.items():
@@ -242,6 +490,15 @@ class CrewService:
                     f"Task '{task_id}' references unknown agent '{agent_id}'"
                 )
 
+        unresolved = missing_prompts(self.prompts, self.tasks_config, list(required_tasks.values()))
+        if unresolved:
+            raise CrewConfigurationError(f"Tasks without a known prompt: {unresolved}")
+
+        try:
+            self.router.check_drift(PINNED_PROVIDER_MODEL)
+        except ModelRoutingError as exc:
+            raise CrewConfigurationError(str(exc)) from exc
+
     @staticmethod
     def _validate_url(url: str) -> str:
         parsed = urlparse(url)
@@ -249,7 +506,7 @@ class CrewService:
             raise ValueError(f"Invalid URL: {url}")
         return url
 
-    def _build_task(self, task_key: str, url: str) -> Task:
+    def _build_task(self, task_key: str, url: str, model: Optional[str] = None) -> Task:
         task_id = self.TASK_MAP[task_key]
         task_cfg = self.tasks_config[task_id]
         agent_cfg = self.agents_config[task_cfg["agent"]]
@@ -258,14 +515,14 @@ class CrewService:
             role=agent_cfg["role"],
             goal=agent_cfg["goal"],
             backstory=agent_cfg["backstory"],
-            llm=self.model,
+            llm=model or self.router.select(task_id).provider_model,
             allow_delegation=False,
             verbose=False,
             max_iter=1,
         )
 
         return Task(
-            description=task_cfg["description"].format(url=url),
+            description=render_task_prompt(self.prompts, task_cfg, url=url).text,
             expected_output=task_cfg["expected_output"],
             agent=agent,
         )
@@ -275,10 +532,16 @@ class CrewService:
             raise ValueError(f"Unsupported task key: {task_key}")
 
         normalized_url = self._validate_url(url)
-        task = self._build_task(task_key, normalized_url)
+        task_id = self.TASK_MAP[task_key]
+        cacheable = task_cache_enabled(self.tasks_config, [task_id])
 
-        crew = Crew(agents=[task.agent], tasks=[task], process=Process.sequential, verbose=False)
-        result = crew.kickoff(inputs={"url": normalized_url})
+        def attempt(model: ModelSpec) -> Any:
+            task = self._build_task(task_key, normalized_url, model.provider_model)
+            crew = Crew(agents=[task.agent], tasks=[task], process=Process.sequential, verbose=False)
+            cache_model = model.provider_model if cacheable else None
+            return model, crew, kickoff_limited(crew, {"url": normalized_url}, cache_model=cache_model)
+
+        model, crew, result = self.router.run(task_id, attempt)
 
         if hasattr(result, "tasks_output") and result.tasks_output:
             output = str(result.tasks_output[0])
@@ -288,57 +551,173 @@ class CrewService:
         return {
             "task": task_key,
             "url": normalized_url,
-            "model": self.model,
+            "model": model.provider_model,
             "result": output,
             "usage_metrics": getattr(crew, "usage_metrics", None),
         }
     def site_snapshot_task(self, url: str) -> str:
         return str(self.run_task("site_snapshot_task", url).get("result", ""))
 
+    def stream_site_snapshot(self, url: str, task_key: str = "site_snapshot_task") -> Iterator[str]:
+        """
+        Yield the snapshot output as the provider generates it.
+
+        Streams straight from the Anthropic Messages API when the SDK is installed and the
+        routed model is an Anthropic one; otherwise falls back to a single chunk from
+        the blocking crew kickoff so callers can always consume an iterator. A stream is
+        not retried on a fallback model once it started, since chunks are already out.
+        ``task_key="sparky_combined"`` streams the single-call snapshot-plus-summary instead.
+        """
+        normalized_url = self._validate_url(url)
+        task_id = self.TASK_MAP[task_key]
+        model = self.router.select(task_id)
+        client = self._streaming_client(model.provider_model)
+        if client is None:
+            yield str(self.run_task(task_key, normalized_url).get("result", ""))
+            return
+
+        task_cfg = self.tasks_config[task_id]
+        agent_cfg = self.agents_config[task_cfg["agent"]]
+        prompt = render_task_prompt(self.prompts, task_cfg, url=normalized_url)
+        # Everything but the URL is identical across requests and goes first, in the system
+        # block, so the provider can serve it from its prompt cache.
+        system_prompt = "\n\n".join(part for part in (
+            f"You are {agent_cfg['role'].strip()}. {agent_cfg['backstory'].strip()}\n"
+            f"Your personal goal is: {agent_cfg['goal'].strip()}",
+            prompt.prefix,
+            f"Expected output: {task_cfg['expected_output'].strip()}",
+        ) if part)
+        user_prompt = prompt.suffix
+
+        key = None
+        if task_cache_enabled(self.tasks_config, [task_id]):
+            key = prompt_key(model.provider_model, system=system_prompt, user=user_prompt, max_tokens=self.STREAM_MAX_TOKENS)
+            cached = None if cache_bypassed() else _cache_get(key)
+            if cached is not None:
+                yield cached["raw"]
+                return
+
+        check_deadline("site snapshot")
+        left = remaining()
+        ticket = LLM_LIMITER.acquire(
+            tokens=(len(system_prompt) + len(user_prompt)) // 4 + self.STREAM_MAX_TOKENS,
+            timeout=None if left is None else max(0.0, left),
+        )
+        throttled = False
+        chunks: List[str] = []
+        started = time.monotonic()
+        # The SDK applies this per network read; the deadline is re-checked between chunks.
+        timeouts = [t for t in (model.get("timeout_seconds"), remaining()) if t is not None]
+        options = {"timeout": max(1.0, min(timeouts))} if timeouts else {}
+        try:
+            with client.messages.stream(
+                model=model.provider_model.split("/", 1)[1],
+                max_tokens=self.STREAM_MAX_TOKENS,
+                system=[{"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}],
+                messages=[{"role": "user", "content": user_prompt}],
+                **options,
+            ) as stream:
+                for chunk in stream.text_stream:
+                    chunks.append(chunk)
+                    yield chunk
+                    check_deadline("site snapshot")
+                usage = stream.get_final_message().usage
+                ticket.used_tokens = usage.input_tokens + usage.output_tokens
+                if prompt.name:
+                    cached_tokens = getattr(usage, "cache_read_input_tokens", None) or 0
+                    written_tokens = getattr(usage, "cache_creation_input_tokens", None) or 0
+                    self.prompts.record_provider_cache(
+                        prompt.name, cached_tokens, usage.input_tokens + cached_tokens + written_tokens
+                    )
+        except Exception as exc:
+            throttled = is_throttle_error(exc)
+            self.router.record(task_id, model, time.monotonic() - started, ok=False)
+            raise
+        finally:
+            LLM_LIMITER.release(ticket, throttled=throttled)
+        self.router.record(task_id, model, time.monotonic() - started)
+        if key is not None:
+            _cache_put(key, {"tasks_output": [], "raw": "".join(chunks)})
+
+    def _streaming_client(self, provider_model: str) -> Any:
+        if anthropic is None or not provider_model.startswith("anthropic/"):
+            return None
+        if self._anthropic_client is None:
+            self._anthropic_client = anthropic.Anthropic()
+        return self._anthropic_client
+
     def sparky_summary(self, snapshot_raw: str) -> str:
         task_id = self.TASK_MAP["generate_sparky_summary"]
         task_cfg = self.tasks_config[task_id]
         agent_cfg = self.agents_config[task_cfg["agent"]]
 
-        agent = Agent(
-            role=agent_cfg["role"],
-            goal=agent_cfg["goal"],
-            backstory=agent_cfg["backstory"],
-            llm=self.model,
-            allow_delegation=False,
-            verbose=False,
-            max_iter=1,
-        )
-
-        task = Task(
-            description=f"{task_cfg['description']}\n\nInput snapshot:\n{snapshot_raw}",
-            expected_output=task_cfg["expected_output"],
-            agent=agent,
-        )
+        if task_cfg.get("prompt"):
+            task_description = render_task_prompt(self.prompts, task_cfg, snapshot=snapshot_raw).text
+        else:
+            task_description = f"{task_cfg['description']}\n\nInput snapshot:\n{snapshot_raw}"
+        cacheable = task_cache_enabled(self.tasks_config, [task_id])
+
+        def attempt(model: ModelSpec) -> Any:
+            agent = Agent(
+                role=agent_cfg["role"],
+                goal=agent_cfg["goal"],
+                backstory=agent_cfg["backstory"],
+                llm=model.provider_model,
+                allow_delegation=False,
+                verbose=False,
+                max_iter=1,
+            )
+            task = Task(description=task_description, expected_output=task_cfg["expected_output"], agent=agent)
+            crew = Crew(agents=[agent], tasks=[task], process=Process.sequential, verbose=False)
+            return kickoff_limited(crew, {}, cache_model=model.provider_model if cacheable else None)
 
-        crew = Crew(agents=[agent], tasks=[task], process=Process.sequential, verbose=False)
-        result = crew.kickoff(inputs={})
+        result = self.router.run(task_id, attempt)
 
         if hasattr(result, "tasks_output") and result.tasks_output:
             return str(result.tasks_output[0])
         return str(result)
 
-    def run_full_audit(self, url: str) -> Dict[str, Any]:
-        return WebsiteAnalyzerCrew().analyze_website(["seo", "performance", "accessibility", "security", "content", "wordpress"], url)
+    def run_full_audit(self, url: str, modules: Optional[List[str]] = None) -> Dict[str, Any]:
+        return WebsiteAnalyzerCrew().analyze_website(
+            modules or ["seo", "performance", "accessibility", "security", "content", "wordpress"], url
+        )
 
-    def run_sparky_pipeline(self, url: str) -> Dict[str, Any]:
-        """Fast homepage pipeline: snapshot → summary → normalized output."""
-        logger.info(f"[SPARKY] Running fast pipeline for {url}")
+    def run_sparky_pipeline(self, url: str, mode: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Fast homepage pipeline → normalized output.
+
+        ``two_call`` runs snapshot → summary; ``single_call`` asks for both in one response,
+        saving a round trip and the snapshot tokens re-sent to the summary. ``mode``
+        defaults to SPARKY_MODE.
+        """
+        mode = mode or SPARKY_MODE
+        if mode not in SPARKY_MODES:
+            raise ValueError(f"Unsupported Sparky mode '{mode}'; expected one of {list(SPARKY_MODES)}")
+        logger.info(f"[SPARKY] Running fast pipeline ({mode}) for {url}")
+
+        # Inside a checkpointed job each stage's raw output is saved, and a resumed job
+        # reads completed stages back instead of re-running them.
+        if mode == "single_call":
+            combined_raw = checkpointed(
+                "sparky_combined", lambda: str(self.run_task("sparky_combined", url).get("result", ""))
+            )
+            logger.info(f"[SPARKY] Raw combined output:\n{combined_raw}")
+            snapshot = self._extract_best_json(combined_raw)
+            return self._finalize_sparky(snapshot, snapshot, combined_raw)
 
-        snapshot_raw = self.site_snapshot_task(url)
+        snapshot_raw = checkpointed("site_snapshot", lambda: self.site_snapshot_task(url))
         logger.info(f"[SPARKY] Raw snapshot output:\n{snapshot_raw}")
 
-        summary_raw = self.sparky_summary(snapshot_raw)
+        summary_raw = checkpointed("sparky_summary", lambda: self.sparky_summary(snapshot_raw))
         logger.info(f"[SPARKY] Raw summary output:\n{summary_raw}")
 
-        snapshot = self._extract_best_json(snapshot_raw)
-        summary_json = self._extract_best_json(summary_raw)
+        return self._finalize_sparky(
+            self._extract_best_json(snapshot_raw), self._extract_best_json(summary_raw), summary_raw
+        )
 
+    def _finalize_sparky(
+        self, snapshot: Dict[str, Any], summary_json: Dict[str, Any], summary_raw: str
+    ) -> Dict[str, Any]:
         platform = snapshot.get("platform", "generic")
         categories = self._normalize_categories(snapshot.get("categories"))
         greeting = snapshot.get("greeting") or snapshot.get("title") or "Here's what we found"
@@ -364,23 +743,8 @@ class CrewService:
         return final
 
     def _extract_best_json(self, text: str) -> Dict[str, Any]:
-        """Extract fenced JSON or fallback to best-effort parse."""
-        if not text:
-            return {}
-
-        fences = re.findall(r"```(?:json|JSON)?\s*(\{.*?\})\s*```", text, re.DOTALL)
-        candidates = fences if fences else [text]
-
-        best: Dict[str, Any] = {}
-        for block in candidates:
-            try:
-                obj = json.loads(block)
-                if isinstance(obj, dict) and len(json.dumps(obj)) > len(json.dumps(best)):
-                    best = obj
-            except Exception:
-                continue
-
-        return best
+        """Return the largest JSON object found anywhere in the output (fenced or inline)."""
+        return extract_best_json(text)
 
     def _normalize_categories(self, cats: Any) -> List[Dict[str, Any]]:
         """
@@ -435,17 +799,7 @@ class CrewService:
 
     @staticmethod
     def _parse_json_payload(raw_output: str) -> Dict[str, Any]:
-        cleaned = raw_output.strip()
-        fenced_match = re.search(r"```(?:json)?\s*(\{.*\})\s*```", cleaned, re.DOTALL)
-        if fenced_match:
-            cleaned = fenced_match.group(1).strip()
-
-        try:
-            payload = json.loads(cleaned)
-            return payload if isinstance(payload, dict) else {}
-        except json.JSONDecodeError:
-            return {}
-
+        return extract_best_json(raw_output)
 
 def create_wordpress_crew(model: str = "anthropic/claude-opus-4-6") -> CrewService:
     """Factory for microservice-compatible WordPress task execution."""
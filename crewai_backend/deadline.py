@@ -0,0 +1,249 @@
+"""
+deadline.py
+Job deadlines that follow the work, plus enforced timeouts, bounded retries and hedging.
+
+A deadline is set once per job with ``deadline_scope`` and read wherever an LLM call is
+made in that context (threads started through ``guarded_call`` inherit it). A provider
+call cannot be interrupted, so ``guarded_call`` runs it on a daemon thread and stops
+waiting when its time is up. The abandoned call is then cancelled: it stops at the next
+``check_cancelled`` (before an LLM request, between crew tasks) and its result is
+discarded. Because its in-flight request still runs to completion, a timed-out call is
+not retried.
+
+Attempts are also counted: every LLM request made under one ``attempt_scope`` (a routed
+call, including its model fallbacks, guard retries and throttle retries) draws on one
+budget of ``LLM_MAX_ATTEMPTS``.
+"""
+from __future__ import annotations
+
+import contextvars
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional, Tuple, TypeVar
+
+from tools.ratelimit import backoff_delay
+
+T = TypeVar("T")
+
+# Wait bound for a guarded call given neither a timeout nor a deadline.
+DEFAULT_CALL_TIMEOUT_SECONDS = float(os.environ.get("LLM_CALL_TIMEOUT_SECONDS", "600"))
+LLM_MAX_ATTEMPTS = int(os.environ.get("LLM_MAX_ATTEMPTS", "6"))
+
+_DEADLINE: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("job_deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """The job's deadline passed; no further attempts are made."""
+
+
+class CallCancelled(Exception):
+    """The caller stopped waiting for this work (timeout or a faster hedge)."""
+
+
+class AttemptsExhausted(RuntimeError):
+    """The call's attempt budget is spent; no further LLM requests are made."""
+
+
+class CancelToken:
+    """Set once nobody waits for the work any more; cancelling a token cancels the tokens nested in it."""
+
+    def __init__(self, parent: Optional["CancelToken"] = None):
+        self._event = threading.Event()
+        self._parent = parent
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    def is_cancelled(self) -> bool:
+        return self._event.is_set() or (self._parent is not None and self._parent.is_cancelled())
+
+
+class _AttemptBudget:
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.used = 0
+        self._lock = threading.Lock()
+
+    def take(self) -> bool:
+        with self._lock:
+            if self.used >= self.limit:
+                return False
+            self.used += 1
+            return True
+
+    def left(self) -> int:
+        with self._lock:
+            return self.limit - self.used
+
+
+_CANCEL: contextvars.ContextVar[Optional[CancelToken]] = contextvars.ContextVar("call_cancel", default=None)
+_ATTEMPTS: contextvars.ContextVar[Optional[_AttemptBudget]] = contextvars.ContextVar("call_attempts", default=None)
+
+
+def current_cancel() -> Optional[CancelToken]:
+    """The token of the guarded call running in this context, for callbacks that run outside it."""
+    return _CANCEL.get()
+
+
+def check_cancelled(what: str = "call", token: Optional[CancelToken] = None) -> None:
+    token = token if token is not None else _CANCEL.get()
+    if token is not None and token.is_cancelled():
+        raise CallCancelled(f"{what} was abandoned by its caller")
+
+
+@contextmanager
+def attempt_scope(limit: Optional[int] = None) -> Iterator[None]:
+    """Share one budget of ``limit`` (default LLM_MAX_ATTEMPTS) LLM attempts in this block; outer scopes win."""
+    if _ATTEMPTS.get() is not None:
+        yield
+        return
+    token = _ATTEMPTS.set(_AttemptBudget(LLM_MAX_ATTEMPTS if limit is None else limit))
+    try:
+        yield
+    finally:
+        _ATTEMPTS.reset(token)
+
+
+def take_attempt(what: str = "LLM call") -> None:
+    """Count one LLM request against the current budget; raises ``AttemptsExhausted`` once it is spent."""
+    budget = _ATTEMPTS.get()
+    if budget is not None and not budget.take():
+        raise AttemptsExhausted(f"{what} gave up after {budget.limit} attempts")
+
+
+def attempts_left() -> Optional[int]:
+    budget = _ATTEMPTS.get()
+    return None if budget is None else budget.left()
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float]) -> Iterator[None]:
+    """Bound the work in this block to ``seconds`` from now; nested scopes only tighten it."""
+    if seconds is None:
+        yield
+        return
+    current = _DEADLINE.get()
+    candidate = time.monotonic() + seconds
+    token = _DEADLINE.set(candidate if current is None else min(current, candidate))
+    try:
+        yield
+    finally:
+        _DEADLINE.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current deadline (may be negative), or ``None`` without one."""
+    deadline = _DEADLINE.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def check_deadline(what: str = "job") -> None:
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded(f"Deadline exceeded before {what} finished")
+
+
+def _budget(timeout: Optional[float]) -> Tuple[float, bool]:
+    """Wait limit for one attempt and whether the job deadline (not ``timeout``) sets it."""
+    left = remaining()
+    if left is None:
+        return (DEFAULT_CALL_TIMEOUT_SECONDS if timeout is None else timeout), False
+    if timeout is None or left <= timeout:
+        return left, True
+    return timeout, False
+
+
+def guarded_call(
+    call: Callable[[], T],
+    timeout: Optional[float] = None,
+    retries: int = 0,
+    hedge_after: Optional[float] = None,
+    what: str = "LLM call",
+) -> T:
+    """
+    Run ``call`` with a per-attempt ``timeout`` and up to ``retries`` further attempts after failures.
+
+    If an attempt is still running after ``hedge_after`` seconds (typically the call's
+    p95), one duplicate is started and whichever finishes first wins; the other is
+    cancelled. An attempt that times out is cancelled and not retried. Everything stays
+    inside the current deadline and attempt budget; running out of the deadline raises
+    ``DeadlineExceeded``.
+    """
+    with attempt_scope():
+        return _guarded_call(call, timeout, retries, hedge_after, what)
+
+
+def _guarded_call(
+    call: Callable[[], T], timeout: Optional[float], retries: int, hedge_after: Optional[float], what: str
+) -> T:
+    last_error: Optional[BaseException] = None
+    parent = _CANCEL.get()
+    for attempt in range(retries + 1):
+        check_cancelled(what, parent)
+        budget, deadline_bound = _budget(timeout)
+        if budget <= 0:
+            raise DeadlineExceeded(f"Deadline exceeded before {what} finished") from last_error
+        results: "queue.Queue[Tuple[bool, Any]]" = queue.Queue()
+        cancel = CancelToken(parent)
+
+        def launch() -> None:
+            context = contextvars.copy_context()
+            context.run(_CANCEL.set, cancel)
+
+            def target() -> None:
+                try:
+                    results.put((True, context.run(call)))
+                except BaseException as exc:  # noqa: BLE001
+                    results.put((False, exc))
+
+            threading.Thread(target=target, daemon=True).start()
+
+        started = time.monotonic()
+        launch()
+        pending, hedge_due, timed_out = 1, hedge_after is not None, False
+        try:
+            while pending:
+                now = time.monotonic()
+                wait = started + budget - now
+                if hedge_due:
+                    wait = min(wait, started + hedge_after - now)
+                try:
+                    ok, value = results.get(timeout=max(0.0, wait))
+                except queue.Empty:
+                    if hedge_due and time.monotonic() < started + budget:
+                        hedge_due = False
+                        pending += 1
+                        launch()
+                        continue
+                    timed_out = True
+                    break
+                pending -= 1
+                if ok:
+                    return value
+                last_error = value
+                # Only ordinary failures are retried; SystemExit and the like end the call.
+                if not isinstance(value, Exception) or isinstance(
+                    value, (DeadlineExceeded, AttemptsExhausted, CallCancelled)
+                ):
+                    raise value
+        finally:
+            # Whatever is still running has lost: stop it at its next check.
+            cancel.cancel()
+        if timed_out:
+            if deadline_bound:
+                raise DeadlineExceeded(f"Deadline exceeded while waiting for {what}")
+            # The abandoned request may still be running and spending tokens; do not add another.
+            raise TimeoutError(f"{what} exceeded {budget:.0f}s")
+        if attempt == retries or attempts_left() == 0:
+            break
+        pause = backoff_delay(attempt + 1)
+        left = remaining()
+        if left is not None and left <= pause:
+            raise DeadlineExceeded(f"Deadline exceeded before {what} could be retried") from last_error
+        time.sleep(pause)
+    if last_error is None:
+        raise RuntimeError("unreachable")
+    raise last_error
@@ -0,0 +1,89 @@
+"""
+health.py
+Health probe helpers: named readiness checks and a rate-limited deep probe.
+
+Liveness needs nothing from here. Readiness runs cheap in-process checks on every call.
+The deep probe exercises the real LLM pipeline, so its outcome is cached and the check
+itself runs at most once per interval no matter how often an orchestrator polls.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+Check = Callable[[], Tuple[bool, Any]]
+
+
+def run_checks(checks: Mapping[str, Check]) -> Dict[str, Any]:
+    """Run each named check; one that raises counts as failed with the error as its detail."""
+    results: Dict[str, Any] = {}
+    for name, check in checks.items():
+        try:
+            ok, detail = check()
+        except Exception as exc:  # noqa: BLE001
+            ok, detail = False, str(exc)
+        results[name] = {"ok": bool(ok), "detail": detail}
+    return {"ready": all(result["ok"] for result in results.values()), "checks": results}
+
+
+class CachedProbe:
+    """
+    Runs ``probe`` at most once per ``interval_seconds`` and serves the last outcome in between.
+
+    Failures are retried sooner, after ``failure_interval_seconds``. Concurrent callers
+    never start a second run: while one is in flight they get the previous outcome, or
+    wait for the first one if there is none yet.
+    """
+
+    def __init__(
+        self,
+        probe: Callable[[], Dict[str, Any]],
+        interval_seconds: float = 300.0,
+        failure_interval_seconds: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.probe = probe
+        self.interval_seconds = interval_seconds
+        self.failure_interval_seconds = min(failure_interval_seconds, interval_seconds)
+        self._clock = clock
+        self._run_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._last: Optional[Dict[str, Any]] = None
+        self._last_at = 0.0
+
+    def _fresh(self, now: float) -> bool:
+        if self._last is None:
+            return False
+        ttl = self.interval_seconds if self._last["ok"] else self.failure_interval_seconds
+        return now - self._last_at < ttl
+
+    def _serve(self, now: float, cached: bool) -> Dict[str, Any]:
+        return {**(self._last or {}), "cached": cached, "age_seconds": round(now - self._last_at, 1)}
+
+    def result(self) -> Dict[str, Any]:
+        with self._state_lock:
+            if self._fresh(self._clock()):
+                return self._serve(self._clock(), cached=True)
+        if not self._run_lock.acquire(blocking=self._last is None):
+            with self._state_lock:
+                return self._serve(self._clock(), cached=True)
+        try:
+            with self._state_lock:
+                # Another caller may have finished a run while this one waited for the lock.
+                if self._fresh(self._clock()):
+                    return self._serve(self._clock(), cached=True)
+            started = self._clock()
+            try:
+                outcome = {"ok": True, "result": self.probe(), "error": None}
+            except Exception as exc:  # noqa: BLE001
+                outcome = {"ok": False, "result": None, "error": str(exc)}
+            finished = self._clock()
+            outcome["latency_ms"] = round((finished - started) * 1000, 1)
+            outcome["checked_at"] = datetime.now(timezone.utc).isoformat()
+            with self._state_lock:
+                self._last, self._last_at = outcome, finished
+                return self._serve(finished, cached=False)
+        finally:
+            self._run_lock.release()
@@ -0,0 +1,261 @@
+"""
+jobs.py
+TestJob, JobEvent and EventLog: in-memory state of Sparky test jobs and their SSE event history.
+
+Finished jobs are retained for TEST_JOB_TTL_SECONDS, so many thousands can be held at
+once. Both classes are slotted. An event keeps its common fields (type, state, progress,
+message, timestamp) in slots, with interned type and state strings, instead of a dict
+per event; the dict form is built only when an event is serialized or read by key. A
+numeric ``timestamp`` is stored as epoch seconds and read back as ISO-8601 UTC.
+
+Each job's events live in one append-only EventLog. SSE readers keep only an integer
+cursor into it, so replay and live tail are the same loop and publishing an event costs
+the same however many clients are watching. A reader that falls more than
+SSE_MAX_LAG_EVENTS behind is handled by SSE_BACKPRESSURE_POLICY (see apply_backpressure).
+"""
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# "coalesce": skip progress/heartbeat events a later one supersedes; "drop_oldest": skip
+# the oldest non-critical events down to the lag bound; "disconnect": close the stream
+# with a resumable cursor.
+BACKPRESSURE_POLICIES = ("coalesce", "drop_oldest", "disconnect")
+SSE_BACKPRESSURE_POLICY = os.environ.get("SSE_BACKPRESSURE_POLICY", "coalesce")
+SSE_MAX_LAG_EVENTS = int(os.environ.get("SSE_MAX_LAG_EVENTS", "32"))
+
+_UNSET: Any = object()
+_SLOT_FIELDS = ("state", "progress", "message", "timestamp")
+
+
+def iso_timestamp(epoch: float) -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(epoch))
+
+
+class JobEvent:
+    """One job event; reads like the ``{"type": ..., **payload}`` dict it replaces."""
+
+    __slots__ = ("type", "state", "progress", "message", "_timestamp", "extra")
+
+    def __init__(
+        self,
+        event_type: str,
+        state: Any = _UNSET,
+        progress: Any = _UNSET,
+        message: Any = _UNSET,
+        timestamp: Any = _UNSET,
+        extra: Tuple[Tuple[str, Any], ...] = (),
+    ) -> None:
+        self.type = sys.intern(event_type)
+        self.state = sys.intern(state) if isinstance(state, str) else state
+        self.progress = progress
+        self.message = message
+        self._timestamp = timestamp
+        self.extra = extra
+
+    @classmethod
+    def create(cls, event_type: str, **payload: Any) -> "JobEvent":
+        slots = {name: payload.pop(name, _UNSET) for name in _SLOT_FIELDS}
+        return cls(event_type, extra=tuple(payload.items()), **slots)
+
+    @property
+    def timestamp(self) -> Any:
+        value = self._timestamp
+        return iso_timestamp(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else value
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        yield "type", self.type
+        for name in _SLOT_FIELDS:
+            value = getattr(self, name)
+            if value is not _UNSET:
+                yield name, value
+        yield from self.extra
+
+    def as_dict(self) -> Dict[str, Any]:
+        return dict(self.items())
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key == "type":
+            return self.type
+        if key in _SLOT_FIELDS:
+            value = getattr(self, key)
+            return default if value is _UNSET else value
+        for name, value in self.extra:
+            if name == key:
+                return value
+        return default
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key, _UNSET)
+        if value is _UNSET:
+            raise KeyError(key)
+        return value
+
+    def __repr__(self) -> str:
+        return f"JobEvent({self.as_dict()!r})"
+
+
+# One lock for all logs: appends and cursor checks are O(1), and a per-log lock would
+# cost memory on every retained job.
+_LOG_LOCK = threading.Lock()
+
+
+class EventLog:
+    """
+    Append-only event history of one job, read through cursors (indexes into it).
+
+    The log is closed by its terminal event; readers then stop waiting. The condition
+    readers block on is created only while someone waits on an open log.
+    """
+
+    __slots__ = ("_events", "closed", "_cond")
+
+    def __init__(self) -> None:
+        self._events: List[JobEvent] = []
+        self.closed = False
+        self._cond: Optional[threading.Condition] = None
+
+    def append(self, event: JobEvent, terminal: bool = False) -> int:
+        """Add ``event`` and wake waiting readers; returns the new length."""
+        with _LOG_LOCK:
+            self._events.append(event)
+            if terminal:
+                self.closed = True
+            if self._cond is not None:
+                self._cond.notify_all()
+                if self.closed:
+                    self._cond = None
+            return len(self._events)
+
+    def wait(self, cursor: int, timeout: Optional[float] = None) -> int:
+        """Block until the log holds more than ``cursor`` events, closes or ``timeout`` passes; returns its length."""
+        with _LOG_LOCK:
+            if len(self._events) <= cursor and not self.closed:
+                if self._cond is None:
+                    self._cond = threading.Condition(_LOG_LOCK)
+                self._cond.wait(timeout)
+            return len(self._events)
+
+    def read(self, cursor: int, end: Optional[int] = None) -> Iterator[JobEvent]:
+        """Events from ``cursor`` up to ``end`` (default: the current length)."""
+        # Events are only ever appended, so indexes below a length once seen stay valid.
+        stop = len(self._events) if end is None else end
+        for index in range(cursor, stop):
+            yield self._events[index]
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def __getitem__(self, index: int) -> JobEvent:
+        return self._events[index]
+
+    def __iter__(self) -> Iterator[JobEvent]:
+        return self.read(0)
+
+
+@dataclass(slots=True)
+class TestJob:
+    id: str
+    url: str
+    status: str = "pending"
+    progress: float = 0.0
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    tenant: Optional[str] = None
+    cache_bypass: bool = False
+    deadline_at: Optional[float] = None
+    sparky_mode: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+    events: EventLog = field(default_factory=EventLog)
+
+
+def superseded_kind(event: JobEvent) -> Optional[str]:
+    """``"progress"`` or ``"heartbeat"`` for events only the latest of which matters."""
+    if event.type == "progress":
+        return "progress"
+    if event.type == "status" and event.message == "heartbeat":
+        return "heartbeat"
+    return None
+
+
+def is_critical(event: JobEvent) -> bool:
+    return event.type != "debug" and superseded_kind(event) is None
+
+
+class StreamStats:
+    """Events skipped and readers disconnected by the backpressure policy."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.coalesced = 0
+        self.dropped = 0
+        self.evicted = 0
+
+    def record(self, coalesced: int = 0, dropped: int = 0, evicted: int = 0) -> None:
+        with self._lock:
+            self.coalesced += coalesced
+            self.dropped += dropped
+            self.evicted += evicted
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "policy": SSE_BACKPRESSURE_POLICY,
+                "max_lag_events": SSE_MAX_LAG_EVENTS,
+                "coalesced_events": self.coalesced,
+                "dropped_events": self.dropped,
+                "evicted_readers": self.evicted,
+            }
+
+
+STREAM_STATS = StreamStats()
+
+
+def apply_backpressure(
+    backlog: List[Tuple[int, JobEvent]],
+    policy: str = SSE_BACKPRESSURE_POLICY,
+    max_lag: int = SSE_MAX_LAG_EVENTS,
+    stats: StreamStats = STREAM_STATS,
+) -> Optional[List[Tuple[int, JobEvent]]]:
+    """
+    The ``(index, event)`` pairs to send a reader that is ``len(backlog)`` events behind.
+
+    Within ``max_lag`` everything is sent. Beyond it, ``coalesce`` keeps only the newest
+    progress and heartbeat events, ``drop_oldest`` skips the oldest non-critical events
+    until the bound is met (critical ones are always sent), and ``disconnect`` returns
+    ``None``: the caller closes the stream and the client resumes from its cursor.
+    """
+    if policy not in BACKPRESSURE_POLICIES:
+        raise ValueError(f"policy must be one of {BACKPRESSURE_POLICIES}")
+    if len(backlog) <= max_lag:
+        return backlog
+    if policy == "disconnect":
+        stats.record(evicted=1)
+        return None
+    if policy == "drop_oldest":
+        excess = len(backlog) - max_lag
+        kept = []
+        for index, event in backlog:
+            if excess > 0 and not is_critical(event):
+                excess -= 1
+                continue
+            kept.append((index, event))
+        stats.record(dropped=len(backlog) - len(kept))
+        return kept
+    latest: Dict[str, int] = {}
+    for index, event in backlog:
+        kind = superseded_kind(event)
+        if kind is not None:
+            latest[kind] = index
+    kept = [
+        (index, event) for index, event in backlog
+        if (kind := superseded_kind(event)) is None or latest[kind] == index
+    ]
+    stats.record(coalesced=len(backlog) - len(kept))
+    return kept
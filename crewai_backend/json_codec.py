@@ -0,0 +1,102 @@
+"""
+json_codec.py
+The JSON codec used on hot paths: SSE frames, NDJSON streams, stored payloads and LLM output parsing.
+
+orjson is used when installed (``JSON_CODEC=stdlib`` forces the fallback). Both backends
+emit the same compact UTF-8 text, so output does not depend on which one is active:
+no spaces after separators, non-ASCII characters unescaped, and unsupported values
+passed through ``str``. That includes datetimes and dataclasses, which orjson would
+otherwise encode natively. Where orjson's own behaviour differs, the odd case is
+brought into line on its slow path: NaN and infinities are written as ``null`` by both,
+and integers beyond 64 bits, which orjson refuses, are encoded by the stdlib encoder.
+Plain ``Enum`` members still differ (orjson writes the value, the stdlib ``str(member)``),
+so keep them out of payloads.
+``sort_keys=True`` gives the stable text that cache keys and digests hash.
+
+``loads`` accepts ``str`` or ``bytes`` and raises ``ValueError`` on invalid input with
+either backend, including the ``NaN``/``Infinity`` literals only the stdlib parser knows.
+"""
+from __future__ import annotations
+
+import json
+import math
+import os
+from typing import Any, Union
+
+try:
+    import orjson
+except Exception:  # noqa: BLE001
+    orjson = None
+
+JSON_CODEC = os.environ.get("JSON_CODEC", "auto").lower()
+
+_ORJSON = orjson is not None and JSON_CODEC != "stdlib"
+CODEC_NAME = "orjson" if _ORJSON else "stdlib"
+
+_ENCODERS = {
+    sort_keys: json.JSONEncoder(
+        separators=(",", ":"), ensure_ascii=False, default=str, allow_nan=False, sort_keys=sort_keys
+    )
+    for sort_keys in (False, True)
+}
+# Passthrough sends datetimes and dataclasses to ``default=str``, as the stdlib encoder does.
+_ORJSON_BASE = (
+    orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+    if orjson is not None else 0
+)
+_ORJSON_OPTIONS = {
+    False: _ORJSON_BASE,
+    True: _ORJSON_BASE | orjson.OPT_SORT_KEYS if orjson is not None else 0,
+}
+
+
+def _finite(value: Any) -> Any:
+    """``value`` with NaN and infinities replaced by ``None``, as orjson writes them."""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: _finite(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite(item) for item in value]
+    return value
+
+
+def _stdlib_dumps(value: Any, sort_keys: bool) -> str:
+    encoder = _ENCODERS[sort_keys]
+    try:
+        return encoder.encode(value)
+    except ValueError as exc:
+        if "float" not in str(exc):
+            raise
+        return encoder.encode(_finite(value))
+
+
+def _orjson_dumps(value: Any, sort_keys: bool) -> bytes:
+    try:
+        return orjson.dumps(value, default=str, option=_ORJSON_OPTIONS[sort_keys])
+    except orjson.JSONEncodeError as exc:
+        if "64-bit" not in str(exc):
+            raise
+        return _stdlib_dumps(value, sort_keys).encode("utf-8")
+
+
+def _reject_constant(name: str) -> Any:
+    raise ValueError(f"{name} is not valid JSON")
+
+
+def dumps_bytes(value: Any, sort_keys: bool = False) -> bytes:
+    if _ORJSON:
+        return _orjson_dumps(value, sort_keys)
+    return _stdlib_dumps(value, sort_keys).encode("utf-8")
+
+
+def dumps(value: Any, sort_keys: bool = False) -> str:
+    if _ORJSON:
+        return _orjson_dumps(value, sort_keys).decode("utf-8")
+    return _stdlib_dumps(value, sort_keys)
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    if _ORJSON:
+        return orjson.loads(data)
+    return json.loads(data, parse_constant=_reject_constant)
@@ -0,0 +1,207 @@
+"""Single-pass JSON object extraction for free-form LLM output."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+import json_codec
+
+Span = Tuple[int, int]
+StreamEvent = Tuple[str, str, Any]
+
+
+def iter_object_spans(text: str) -> Iterator[Span]:
+    """
+    Yield ``(start, end)`` for every balanced ``{...}`` region in ``text``.
+
+    The scan is linear and string-aware: braces inside JSON strings are ignored and
+    escapes are honoured. Nested spans are yielded before their enclosing span. A raw
+    newline inside a string cannot occur in valid JSON, so it abandons the open
+    candidate instead of letting a stray quote in prose swallow the rest of the text.
+    """
+    starts: List[int] = []
+    in_string = False
+    escaped = False
+
+    for index, char in enumerate(text):
+        if not starts:
+            if char == "{":
+                starts.append(index)
+            continue
+
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            elif char == "\n":
+                in_string = False
+                starts.clear()
+            continue
+
+        if char == '"':
+            in_string = True
+        elif char == "{":
+            starts.append(index)
+        elif char == "}":
+            yield starts.pop(), index + 1
+
+
+def find_json_objects(text: str) -> List[Tuple[Span, Dict[str, Any]]]:
+    """
+    Return every top-level JSON object in ``text`` (fenced or embedded in prose).
+
+    Results are ``((start, end), obj)`` pairs in source order. An object nested inside
+    another decodable object is not reported separately.
+    """
+    if not text:
+        return []
+
+    found: List[Tuple[Span, Dict[str, Any]]] = []
+    covered_until = 0
+    # Spans are either nested or disjoint, so ordering parents before children lets a
+    # decodable enclosing object shadow everything it contains with a single cursor.
+    for start, end in sorted(iter_object_spans(text), key=lambda span: (span[0], -span[1])):
+        if start < covered_until:
+            continue
+        obj = _decode(text[start:end])
+        if obj is not None:
+            found.append(((start, end), obj))
+            covered_until = end
+    return found
+
+
+def extract_best_json(text: str) -> Dict[str, Any]:
+    """Return the decodable JSON object with the longest source span, or ``{}``."""
+    if not text:
+        return {}
+
+    for start, end in sorted(iter_object_spans(text), key=lambda span: span[0] - span[1]):
+        obj = _decode(text[start:end])
+        if obj is not None:
+            return obj
+    return {}
+
+
+class IncrementalJSONParser:
+    """
+    Recognise completed members of the first JSON object in a text stream as it arrives.
+
+    ``feed`` returns ``(kind, key, value)`` events: ``("member", key, value)`` once a
+    top-level member has been fully received, and ``("item", key, value)`` for each
+    completed element of the arrays named in ``stream_arrays`` (those arrays are not
+    reported again as members). Text before the opening brace, such as a code fence,
+    is skipped. Each character is inspected once, so feeding is linear in the output.
+    """
+
+    def __init__(self, stream_arrays: Iterable[str] = ()) -> None:
+        self.stream_arrays = frozenset(stream_arrays)
+        self.done = False
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._expect_value = False
+        self._streaming = False
+        self._key: str | None = None
+        self._key_chars: List[str] = []
+        self._value_chars: List[str] = []
+        self._item_chars: List[str] = []
+
+    def feed(self, chunk: str) -> List[StreamEvent]:
+        events: List[StreamEvent] = []
+        for char in chunk:
+            if self.done:
+                break
+            if self._depth == 0:
+                if char == "{":
+                    self._depth = 1
+                continue
+
+            if self._in_string:
+                self._capture(char)
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._capture(char)
+            elif char in "{[":
+                if self._depth == 1 and char == "[" and self._expect_value and self._key in self.stream_arrays:
+                    self._streaming = True
+                else:
+                    self._capture(char)
+                self._depth += 1
+            elif char in "}]":
+                if self._depth == 1:
+                    self._finish_member(events)
+                    self.done = True
+                elif self._streaming and self._depth == 2:
+                    self._finish_item(events)
+                    self._streaming = False
+                    self._depth = 1
+                else:
+                    self._capture(char)
+                    self._depth -= 1
+            elif char == "," and self._depth == 1:
+                self._finish_member(events)
+            elif char == "," and self._streaming and self._depth == 2:
+                self._finish_item(events)
+            elif char == ":" and self._depth == 1 and not self._expect_value:
+                self._key = _decode_value("".join(self._key_chars))
+                self._key_chars = []
+                self._expect_value = True
+            else:
+                self._capture(char)
+        return events
+
+    def _capture(self, char: str) -> None:
+        if self._streaming and self._depth >= 2:
+            self._item_chars.append(char)
+        elif self._depth >= 2 or self._expect_value:
+            self._value_chars.append(char)
+        else:
+            self._key_chars.append(char)
+
+    def _finish_member(self, events: List[StreamEvent]) -> None:
+        raw = "".join(self._value_chars).strip()
+        if raw and isinstance(self._key, str):
+            value = _decode_value(raw)
+            if value is not _INVALID:
+                events.append(("member", self._key, value))
+        self._key = None
+        self._key_chars = []
+        self._value_chars = []
+        self._expect_value = False
+
+    def _finish_item(self, events: List[StreamEvent]) -> None:
+        raw = "".join(self._item_chars).strip()
+        self._item_chars = []
+        if raw and isinstance(self._key, str):
+            value = _decode_value(raw)
+            if value is not _INVALID:
+                events.append(("item", self._key, value))
+
+
+_INVALID = object()
+
+
+def _decode_value(raw: str) -> Any:
+    try:
+        return json_codec.loads(raw)
+    except ValueError:
+        return _INVALID
+
+
+def _decode(block: str) -> Dict[str, Any] | None:
+    try:
+        obj = json_codec.loads(block)
+    except ValueError:
+        return None
+    return obj if isinstance(obj, dict) else None
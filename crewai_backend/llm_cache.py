@@ -0,0 +1,190 @@
+"""
+llm_cache.py
+LLMResponseCache: on-disk cache of crew outputs keyed by a hash of everything sent.
+
+The key covers the model, each task's agent (role, goal, backstory), the rendered task
+description and expected output, and the kickoff inputs. With ``temperature: 0`` the
+same key yields the same answer, so repeat audits, CI and self-tests can reuse it.
+Page content is not part of the key (agents fetch it themselves), so the TTL bounds how
+stale a cached audit can be; tasks that must always see the live site set ``cache: false``.
+"""
+from __future__ import annotations
+
+import contextvars
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional
+
+import json_codec
+
+LLM_CACHE_ENABLED = os.environ.get("LLM_CACHE_ENABLED", "false").lower() in {"1", "true", "yes"}
+LLM_CACHE_PATH = os.environ.get("LLM_CACHE_PATH") or str(Path(__file__).resolve().parent / "reports" / "llm_cache.sqlite3")
+LLM_CACHE_TTL_SECONDS = float(os.environ.get("LLM_CACHE_TTL_SECONDS", str(24 * 3600)))
+LLM_CACHE_MAX_BYTES = int(os.environ.get("LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+# Eviction trims down to this share of the limit so it does not run on every write.
+EVICT_TO_FRACTION = 0.9
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    size INTEGER NOT NULL,
+    body BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at);
+"""
+
+_BYPASS: contextvars.ContextVar[bool] = contextvars.ContextVar("llm_cache_bypass", default=False)
+
+
+@contextmanager
+def cache_bypass(bypass: bool = True) -> Iterator[None]:
+    """Skip cache lookups for LLM calls in this block; fresh answers still refresh the cache."""
+    token = _BYPASS.set(bool(bypass))
+    try:
+        yield
+    finally:
+        _BYPASS.reset(token)
+
+
+def cache_bypassed() -> bool:
+    return _BYPASS.get()
+
+
+def task_cache_enabled(tasks_config: Mapping[str, Any], task_ids: List[str]) -> bool:
+    """Every task's ``cache:`` setting in tasks.yaml, falling back to LLM_CACHE_ENABLED."""
+    return all(bool(tasks_config.get(task_id, {}).get("cache", LLM_CACHE_ENABLED)) for task_id in task_ids)
+
+
+def prompt_key(model: str, **parts: Any) -> str:
+    payload = json_codec.dumps({"model": model, **parts}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def crew_key(model: str, crew: Any, inputs: Mapping[str, Any]) -> str:
+    tasks = []
+    for task in crew.tasks:
+        agent = getattr(task, "agent", None)
+        tasks.append({
+            "agent": [getattr(agent, name, None) for name in ("role", "goal", "backstory")],
+            "description": getattr(task, "description", None),
+            "expected_output": getattr(task, "expected_output", None),
+        })
+    return prompt_key(model, tasks=tasks, inputs=dict(inputs))
+
+
+class CachedCrewOutput:
+    """Stands in for a ``CrewOutput``: ``tasks_output`` and ``str()`` are what callers read."""
+
+    def __init__(self, tasks_output: List[str], raw: str):
+        self.tasks_output = tasks_output
+        self.raw = raw
+        self.from_cache = True
+
+    def __str__(self) -> str:
+        return self.raw
+
+
+class LLMResponseCache:
+    """
+    SQLite store of compressed responses with a TTL and a total-size bound.
+
+    Least recently read entries are evicted first once the bodies exceed ``max_bytes``.
+    One connection is shared behind a lock; entries are small and reads are point
+    lookups, so contention is negligible next to an LLM call.
+    """
+
+    def __init__(
+        self,
+        path: str = LLM_CACHE_PATH,
+        ttl_seconds: float = LLM_CACHE_TTL_SECONDS,
+        max_bytes: int = LLM_CACHE_MAX_BYTES,
+    ):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript(_SCHEMA)
+            self._total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock, self._db:
+            row = self._db.execute("SELECT created_at, size, body FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or row[0] + self.ttl_seconds < now:
+                if row is not None:
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._total -= row[1]
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return json_codec.loads(zlib.decompress(row[2]))
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        body = zlib.compress(json_codec.dumps_bytes(value))
+        if len(body) > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock, self._db:
+            previous = self._db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, created_at, accessed_at, size, body) VALUES (?, ?, ?, ?, ?)",
+                (key, now, now, len(body), body),
+            )
+            self._total += len(body) - (previous[0] if previous else 0)
+            if self._total > self.max_bytes:
+                self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        self._db.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+        target = self.max_bytes * EVICT_TO_FRACTION
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total > target:
+            doomed, freed = [], 0
+            for key, size in self._db.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+                if total - freed <= target:
+                    break
+                doomed.append((key,))
+                freed += size
+            self._db.executemany("DELETE FROM responses WHERE key = ?", doomed)
+            total -= freed
+        self._total = total
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            return {"entries": entries, "bytes": self._total, "hits": self.hits, "misses": self.misses}
+
+
+_LLM_CACHE: Optional[LLMResponseCache] = None
+_LLM_CACHE_LOCK = threading.Lock()
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """Process-wide cache, created on first use so importing never touches the disk."""
+    global _LLM_CACHE
+    with _LLM_CACHE_LOCK:
+        if _LLM_CACHE is None:
+            _LLM_CACHE = LLMResponseCache()
+        return _LLM_CACHE
+
+
+def cache_stats() -> Optional[Dict[str, Any]]:
+    """Stats of the process-wide cache, or ``None`` while nothing has opened it yet."""
+    cache = _LLM_CACHE
+    return cache.stats() if cache is not None else None
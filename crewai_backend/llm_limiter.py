@@ -0,0 +1,342 @@
+"""
+llm_limiter.py
+LLMLimiter: one process-wide gate in front of every LLM provider call.
+
+Calls wait in a weighted-fair queue across tenants, then pass a concurrency cap and
+request/token per-minute buckets. Provider throttling (429 / overloaded) pauses the
+queue and halves the admitted rate, which recovers gradually on success.
+"""
+from __future__ import annotations
+
+import contextvars
+import heapq
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterator, List, Mapping, Optional, Tuple, TypeVar
+
+from deadline import attempts_left, check_cancelled, current_cancel, take_attempt
+from tools.ratelimit import TokenBucket, backoff_delay
+
+T = TypeVar("T")
+
+LLM_REQUESTS_PER_MINUTE = float(os.environ.get("LLM_REQUESTS_PER_MINUTE", "50"))
+LLM_TOKENS_PER_MINUTE = float(os.environ.get("LLM_TOKENS_PER_MINUTE", "80000"))
+LLM_MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY", "8"))
+LLM_MAX_THROTTLE_RETRIES = int(os.environ.get("LLM_MAX_THROTTLE_RETRIES", "4"))
+# "tenant-a=3,tenant-b=1": relative queue shares; unlisted tenants weigh 1.
+LLM_TENANT_WEIGHTS = os.environ.get("LLM_TENANT_WEIGHTS", "")
+DEFAULT_TENANT = "default"
+MIN_RATE_FACTOR = 0.1
+RATE_RECOVERY_STEP = 0.1
+WAIT_SAMPLES = 512
+# How often a queued call re-checks whether its caller gave up on it.
+CANCEL_POLL_SECONDS = 0.25
+# Per-tenant stats are kept for the most recently active tenants; older ones are folded
+# into one aggregate so memory stays bounded however many tenants appear.
+LLM_MAX_TRACKED_TENANTS = int(os.environ.get("LLM_MAX_TRACKED_TENANTS", "1000"))
+LLM_METRICS_TOP_TENANTS = int(os.environ.get("LLM_METRICS_TOP_TENANTS", "20"))
+
+_CURRENT_TENANT: contextvars.ContextVar[str] = contextvars.ContextVar("llm_tenant", default=DEFAULT_TENANT)
+
+
+def current_tenant() -> str:
+    return _CURRENT_TENANT.get()
+
+
+@contextmanager
+def tenant_context(tenant: Optional[str]) -> Iterator[None]:
+    """Attribute LLM calls made in this block (same thread/context) to ``tenant``."""
+    token = _CURRENT_TENANT.set(tenant or DEFAULT_TENANT)
+    try:
+        yield
+    finally:
+        _CURRENT_TENANT.reset(token)
+
+
+def parse_weights(spec: str) -> Dict[str, float]:
+    weights: Dict[str, float] = {}
+    for item in spec.split(","):
+        name, _, value = item.partition("=")
+        if name.strip() and value.strip():
+            weights[name.strip()] = max(float(value), 0.01)
+    return weights
+
+
+def is_throttle_error(exc: BaseException) -> bool:
+    """Provider rate-limit / overload signals as surfaced by the Anthropic SDK and LiteLLM."""
+    if getattr(exc, "status_code", None) in (429, 529):
+        return True
+    name = type(exc).__name__.lower()
+    text = str(exc).lower()
+    return "ratelimit" in name or "rate limit" in text or "rate_limit" in text or "overloaded" in text
+
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    response = getattr(exc, "response", None)
+    value = getattr(response, "headers", {}).get("retry-after") if response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class _TenantStats:
+    admitted: int = 0
+    throttled: int = 0
+    wait_total: float = 0.0
+    wait_max: float = 0.0
+    # Provider-reported usage where available, otherwise the admission estimate.
+    tokens: float = 0.0
+    recent: Deque[float] = field(default_factory=lambda: deque(maxlen=WAIT_SAMPLES))
+
+    def record(self, waited: float) -> None:
+        self.admitted += 1
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+        self.recent.append(waited)
+
+    def merge(self, other: "_TenantStats") -> None:
+        self.admitted += other.admitted
+        self.throttled += other.throttled
+        self.wait_total += other.wait_total
+        self.wait_max = max(self.wait_max, other.wait_max)
+        self.tokens += other.tokens
+        self.recent.extend(other.recent)
+
+    def to_dict(self) -> Dict[str, Any]:
+        recent = sorted(self.recent)
+
+        def percentile(fraction: float) -> float:
+            return recent[min(len(recent) - 1, int(fraction * len(recent)))] if recent else 0.0
+
+        return {
+            "admitted": self.admitted,
+            "throttled": self.throttled,
+            "tokens": round(self.tokens),
+            "wait_avg_ms": round(self.wait_total / self.admitted * 1000, 1) if self.admitted else 0.0,
+            "wait_p50_ms": round(percentile(0.5) * 1000, 1),
+            "wait_p95_ms": round(percentile(0.95) * 1000, 1),
+            "wait_max_ms": round(self.wait_max * 1000, 1),
+        }
+
+
+@dataclass
+class Ticket:
+    """An admitted call; set ``used_tokens`` to reconcile the token estimate on release."""
+    tenant: str
+    tokens: float
+    requests: int
+    waited: float
+    used_tokens: Optional[float] = None
+
+
+class LLMLimiter:
+    """
+    Weighted fair queuing (by estimated tokens) in front of shared provider budgets.
+
+    Each waiter gets a virtual finish tag ``max(V, tenant_last_tag) + tokens / weight``
+    and only the smallest tag may be admitted, so a tenant submitting a burst queues
+    behind its own earlier calls while others keep their share. The head waiter is
+    admitted once a concurrency slot is free, both per-minute buckets cover it and no
+    throttle pause is active.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = LLM_REQUESTS_PER_MINUTE,
+        tokens_per_minute: float = LLM_TOKENS_PER_MINUTE,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        tenant_weights: Optional[Mapping[str, float]] = None,
+        max_throttle_retries: int = LLM_MAX_THROTTLE_RETRIES,
+        max_tracked_tenants: int = LLM_MAX_TRACKED_TENANTS,
+    ):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_concurrency = max(1, max_concurrency)
+        self.tenant_weights = dict(tenant_weights or {})
+        self.max_throttle_retries = max_throttle_retries
+        self.max_tracked_tenants = max(1, max_tracked_tenants)
+        self._requests = TokenBucket(requests_per_minute / 60, capacity=requests_per_minute)
+        self._tokens = TokenBucket(tokens_per_minute / 60, capacity=tokens_per_minute)
+        self._cond = threading.Condition()
+        self._queue: List[Tuple[float, int, str]] = []
+        self._seq = itertools.count()
+        self._virtual_time = 0.0
+        self._last_tag: Dict[str, float] = {}
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._rate_factor = 1.0
+        self._throttle_streak = 0
+        self._stats: "OrderedDict[str, _TenantStats]" = OrderedDict()
+        self._evicted = _TenantStats()
+        self._evicted_tenants = 0
+
+    def _weight(self, tenant: str) -> float:
+        return self.tenant_weights.get(tenant, 1.0)
+
+    def _tenant_stats(self, tenant: str) -> _TenantStats:
+        """Stats for ``tenant``, least recently active tenants evicted into the aggregate. Holds ``_cond``."""
+        stats = self._stats.get(tenant)
+        if stats is None:
+            stats = self._stats[tenant] = _TenantStats()
+            while len(self._stats) > self.max_tracked_tenants:
+                self._evicted.merge(self._stats.popitem(last=False)[1])
+                self._evicted_tenants += 1
+        else:
+            self._stats.move_to_end(tenant)
+        return stats
+
+    def _advance(self, tag: float) -> None:
+        """Move virtual time to ``tag`` and forget tenants with nothing queued beyond it. Holds ``_cond``."""
+        self._virtual_time = tag
+        # max(V, last_tag) == V for these, so their entries no longer affect any tag.
+        for tenant in [tenant for tenant, last in self._last_tag.items() if last <= tag]:
+            del self._last_tag[tenant]
+
+    def _set_rate_factor(self, factor: float) -> None:
+        self._rate_factor = factor
+        self._requests.set_rate(self.requests_per_minute / 60 * factor)
+        self._tokens.set_rate(self.tokens_per_minute / 60 * factor)
+
+    def acquire(
+        self, tokens: float = 1000, requests: int = 1, tenant: Optional[str] = None, timeout: Optional[float] = None
+    ) -> Ticket:
+        tenant = tenant or current_tenant()
+        cancel = current_cancel()
+        started = time.monotonic()
+        deadline = None if timeout is None else started + timeout
+        with self._cond:
+            tag = max(self._virtual_time, self._last_tag.get(tenant, 0.0)) + tokens / self._weight(tenant)
+            self._last_tag[tenant] = tag
+            entry = (tag, next(self._seq), tenant)
+            heapq.heappush(self._queue, entry)
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait: Optional[float] = None
+                    if self._queue[0] is entry and self._in_flight < self.max_concurrency:
+                        wait = max(
+                            self._paused_until - now,
+                            self._requests.peek(requests),
+                            self._tokens.peek(tokens),
+                        )
+                        if wait <= 0:
+                            heapq.heappop(self._queue)
+                            self._requests.consume(requests)
+                            self._tokens.consume(tokens)
+                            self._in_flight += 1
+                            self._advance(tag)
+                            waited = now - started
+                            self._tenant_stats(tenant).record(waited)
+                            self._cond.notify_all()
+                            return Ticket(tenant=tenant, tokens=tokens, requests=requests, waited=waited)
+                    if deadline is not None:
+                        remaining = deadline - now
+                        if remaining <= 0:
+                            raise TimeoutError(f"LLM queue wait exceeded {timeout}s")
+                        wait = remaining if wait is None else min(wait, remaining)
+                    if cancel is not None:
+                        check_cancelled("queued LLM call", cancel)
+                        wait = CANCEL_POLL_SECONDS if wait is None else min(wait, CANCEL_POLL_SECONDS)
+                    self._cond.wait(wait)
+            except BaseException:
+                if entry in self._queue:
+                    self._queue.remove(entry)
+                    heapq.heapify(self._queue)
+                    self._cond.notify_all()
+                raise
+
+    def release(self, ticket: Ticket, throttled: bool = False, retry_after: Optional[float] = None) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            stats = self._tenant_stats(ticket.tenant)
+            stats.tokens += ticket.tokens if ticket.used_tokens is None else ticket.used_tokens
+            if ticket.used_tokens is not None:
+                # Settle the estimate: refund unused tokens or charge the overrun.
+                self._tokens.consume(ticket.used_tokens - ticket.tokens)
+            if throttled:
+                self._throttle_streak += 1
+                stats.throttled += 1
+                delay = retry_after if retry_after is not None else backoff_delay(self._throttle_streak, base=1.0, cap=60.0)
+                self._paused_until = max(self._paused_until, time.monotonic() + delay)
+                self._set_rate_factor(max(MIN_RATE_FACTOR, self._rate_factor / 2))
+            else:
+                self._throttle_streak = 0
+                if self._rate_factor < 1.0:
+                    self._set_rate_factor(min(1.0, self._rate_factor + RATE_RECOVERY_STEP))
+            self._cond.notify_all()
+
+    def run(
+        self,
+        call: Callable[[], T],
+        tokens: float = 1000,
+        requests: int = 1,
+        tenant: Optional[str] = None,
+        usage: Optional[Callable[[T], Optional[float]]] = None,
+        timeout: Optional[float] = None,
+    ) -> T:
+        """
+        Run ``call`` once admitted, retrying provider throttling up to ``max_throttle_retries``.
+
+        ``usage(result)`` may return the tokens actually used, to settle the estimate.
+        ``timeout`` bounds the total time spent queueing across attempts. Each attempt
+        counts against the current ``deadline.attempt_scope``, and none starts once the
+        guarded call it belongs to was abandoned.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for attempt in range(self.max_throttle_retries + 1):
+            check_cancelled("LLM call")
+            take_attempt()
+            wait = None if deadline is None else max(0.0, deadline - time.monotonic())
+            ticket = self.acquire(tokens=tokens, requests=requests, tenant=tenant, timeout=wait)
+            throttled, retry_after = False, None
+            try:
+                result = call()
+                if usage is not None:
+                    try:
+                        ticket.used_tokens = usage(result)
+                    except Exception:  # noqa: BLE001
+                        ticket.used_tokens = None
+            except Exception as exc:
+                throttled = is_throttle_error(exc)
+                retry_after = _retry_after(exc) if throttled else None
+                if not throttled or attempt == self.max_throttle_retries or attempts_left() == 0:
+                    raise
+                continue
+            finally:
+                # Also on SystemExit and the like, or the slot would be lost for good.
+                self.release(ticket, throttled=throttled, retry_after=retry_after)
+            return result
+        raise RuntimeError("unreachable")
+
+    def metrics(self, top_tenants: int = LLM_METRICS_TOP_TENANTS) -> Dict[str, Any]:
+        """Limiter state with the ``top_tenants`` busiest tenants listed; the rest are aggregated."""
+        with self._cond:
+            busiest = sorted(self._stats.items(), key=lambda item: item[1].admitted, reverse=True)
+            other = _TenantStats()
+            other.merge(self._evicted)
+            for _, stats in busiest[top_tenants:]:
+                other.merge(stats)
+            return {
+                "queued": len(self._queue),
+                "in_flight": self._in_flight,
+                "max_concurrency": self.max_concurrency,
+                "rate_factor": round(self._rate_factor, 2),
+                "paused_for_ms": round(max(0.0, self._paused_until - time.monotonic()) * 1000, 1),
+                "requests_per_minute": self.requests_per_minute,
+                "tokens_per_minute": self.tokens_per_minute,
+                "tenants": {tenant: stats.to_dict() for tenant, stats in busiest[:top_tenants]},
+                "other_tenants": {
+                    "count": max(0, len(busiest) - top_tenants) + self._evicted_tenants,
+                    **other.to_dict(),
+                },
+            }
+
+
+LLM_LIMITER = LLMLimiter(tenant_weights=parse_weights(LLM_TENANT_WEIGHTS))
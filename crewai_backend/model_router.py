@@ -0,0 +1,236 @@
+"""
+model_router.py
+ModelRouter: per-task model choice from models.yaml, with fallback chains and latency budgets.
+
+A ``routing`` entry lists the models a task may use in order of preference. Models whose
+recent latency for that task exceeds its ``latency_budget_seconds`` are tried last, and a
+failed call falls through to the next model in the chain. Tasks marked ``pinned`` (plus
+any the caller designates) must resolve to the pinned production model on every link.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterable, List, Mapping, Optional, Tuple, TypeVar
+
+from deadline import AttemptsExhausted, CallCancelled, DeadlineExceeded, attempt_scope, attempts_left, guarded_call
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+PINNED_PROVIDER_MODEL = "anthropic/claude-opus-4-6"
+# Weight of the newest sample in the per-route latency moving average.
+LATENCY_EWMA_ALPHA = 0.3
+# A model demoted for being slow is tried first again once its last sample is this old.
+LATENCY_SAMPLE_TTL_SECONDS = 300.0
+LATENCY_SAMPLES = 200
+# Hedging waits for this many successful calls so the p95 it keys on means something.
+HEDGE_MIN_SAMPLES = 20
+
+
+class ModelRoutingError(ValueError):
+    """Raised when models.yaml routing is inconsistent or a pinned task drifted."""
+
+
+@dataclass(frozen=True)
+class ModelSpec:
+    name: str
+    provider_model: str
+    settings: Mapping[str, Any] = field(default_factory=dict, compare=False)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.settings.get(key, default)
+
+
+@dataclass(frozen=True)
+class TaskRoute:
+    task_id: str
+    chain: Tuple[ModelSpec, ...]
+    latency_budget: Optional[float] = None
+    pinned: bool = False
+    hedge: bool = False
+
+
+@dataclass
+class _RouteSample:
+    calls: int = 0
+    failures: int = 0
+    latency_ewma: Optional[float] = None
+    last_at: float = 0.0
+    recent: Deque[float] = field(default_factory=lambda: deque(maxlen=LATENCY_SAMPLES))
+
+
+class RouteStats:
+    """Latency and failure counts per (task, provider model), shared by every router."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._samples: Dict[Tuple[str, str], _RouteSample] = {}
+
+    def record(self, task_id: str, provider_model: str, seconds: float, ok: bool = True) -> None:
+        with self._lock:
+            sample = self._samples.setdefault((task_id, provider_model), _RouteSample())
+            sample.calls += 1
+            if not ok:
+                sample.failures += 1
+                return
+            sample.last_at = time.monotonic()
+            sample.recent.append(seconds)
+            sample.latency_ewma = (
+                seconds if sample.latency_ewma is None
+                else LATENCY_EWMA_ALPHA * seconds + (1 - LATENCY_EWMA_ALPHA) * sample.latency_ewma
+            )
+
+    def latency(self, task_id: str, provider_model: str) -> Optional[float]:
+        """Recent latency average, or ``None`` without a sample in the last LATENCY_SAMPLE_TTL_SECONDS."""
+        with self._lock:
+            sample = self._samples.get((task_id, provider_model))
+            if sample is None or time.monotonic() - sample.last_at > LATENCY_SAMPLE_TTL_SECONDS:
+                return None
+            return sample.latency_ewma
+
+    def p95(self, task_id: str, provider_model: str) -> Optional[float]:
+        with self._lock:
+            sample = self._samples.get((task_id, provider_model))
+            if sample is None or len(sample.recent) < HEDGE_MIN_SAMPLES:
+                return None
+            recent = sorted(sample.recent)
+            return recent[min(len(recent) - 1, int(0.95 * len(recent)))]
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            routes: Dict[str, Dict[str, Any]] = {}
+            for (task_id, provider_model), sample in self._samples.items():
+                routes.setdefault(task_id, {})[provider_model] = {
+                    "calls": sample.calls,
+                    "failures": sample.failures,
+                    "latency_ms": None if sample.latency_ewma is None else round(sample.latency_ewma * 1000, 1),
+                }
+            return routes
+
+
+ROUTE_STATS = RouteStats()
+
+
+class ModelRouter:
+    """
+    Resolves the models for a task from a parsed models.yaml.
+
+    Tasks without a ``routing`` entry use the default model; ``default_provider_model``
+    replaces its provider model (e.g. the ``CREW_MODEL`` override of the service).
+    """
+
+    def __init__(
+        self,
+        models_config: Mapping[str, Any],
+        default_provider_model: Optional[str] = None,
+        stats: RouteStats = ROUTE_STATS,
+    ):
+        self.stats = stats
+        self.specs: Dict[str, ModelSpec] = {}
+        for name, cfg in (models_config.get("models") or {}).items():
+            if not isinstance(cfg, Mapping) or not cfg.get("provider_model"):
+                raise ModelRoutingError(f"Model '{name}' needs a provider_model")
+            self.specs[name] = ModelSpec(name, cfg["provider_model"], dict(cfg))
+
+        default_name = models_config.get("default_model") or next(iter(self.specs), "default")
+        default = self.specs.get(default_name)
+        if default is None and default_provider_model is None:
+            raise ModelRoutingError(f"Unknown default_model '{default_name}'")
+        if default_provider_model is not None:
+            default = ModelSpec(default_name, default_provider_model, default.settings if default else {})
+        self.default = default
+
+        self.routes: Dict[str, TaskRoute] = {}
+        for task_id, cfg in (models_config.get("routing") or {}).items():
+            cfg = cfg or {}
+            names = cfg.get("models") or [default_name]
+            unknown = [name for name in names if name not in self.specs and name != default_name]
+            if unknown:
+                raise ModelRoutingError(f"Route '{task_id}' references unknown models {unknown}")
+            budget = cfg.get("latency_budget_seconds")
+            self.routes[task_id] = TaskRoute(
+                task_id=task_id,
+                chain=tuple(self.default if name == default_name else self.specs[name] for name in names),
+                latency_budget=float(budget) if budget is not None else None,
+                pinned=bool(cfg.get("pinned", False)),
+                hedge=bool(cfg.get("hedge", False)),
+            )
+
+    def route(self, task_id: str) -> TaskRoute:
+        return self.routes.get(task_id) or TaskRoute(task_id=task_id, chain=(self.default,))
+
+    def check_drift(self, expected: str = PINNED_PROVIDER_MODEL, task_ids: Iterable[str] = ()) -> None:
+        """Every model a pinned or designated task may use, fallbacks included, must be ``expected``."""
+        designated = list(dict.fromkeys([*task_ids, *(t for t, route in self.routes.items() if route.pinned)]))
+        for task_id in designated:
+            for spec in self.route(task_id).chain:
+                if spec.provider_model != expected:
+                    raise ModelRoutingError(
+                        f"Production model drift detected: task '{task_id}' must resolve to {expected}, "
+                        f"got {spec.provider_model} ({spec.name})"
+                    )
+
+    def candidates(self, task_id: str) -> List[ModelSpec]:
+        """The task's chain, with models currently over its latency budget moved to the end."""
+        route = self.route(task_id)
+        chain = list(route.chain)
+        if route.latency_budget is None:
+            return chain
+
+        def over_budget(spec: ModelSpec) -> bool:
+            latency = self.stats.latency(task_id, spec.provider_model)
+            return latency is not None and latency > route.latency_budget
+
+        return sorted(chain, key=over_budget)
+
+    def select(self, task_id: str) -> ModelSpec:
+        return self.candidates(task_id)[0]
+
+    def record(self, task_id: str, spec: ModelSpec, seconds: float, ok: bool = True) -> None:
+        self.stats.record(task_id, spec.provider_model, seconds, ok)
+
+    def run(self, task_id: str, call: Callable[[ModelSpec], T]) -> T:
+        """
+        Call with each candidate in turn until one succeeds; re-raises the last failure.
+
+        Each model's ``timeout_seconds`` and ``retry_limit`` are enforced within the current
+        deadline, and hedged routes start a duplicate once a call runs past its p95. An
+        expired deadline, a spent attempt budget (shared by the whole chain) or an abandoned
+        call ends the chain instead of moving on to the next model.
+        """
+        with attempt_scope():
+            return self._run(task_id, call)
+
+    def _run(self, task_id: str, call: Callable[[ModelSpec], T]) -> T:
+        route = self.route(task_id)
+        last_error: Optional[Exception] = None
+        for spec in self.candidates(task_id):
+            if last_error is not None and attempts_left() == 0:
+                break
+            started = time.monotonic()
+            try:
+                result = guarded_call(
+                    lambda: call(spec),
+                    timeout=spec.get("timeout_seconds"),
+                    retries=int(spec.get("retry_limit", 0)),
+                    hedge_after=self.stats.p95(task_id, spec.provider_model) if route.hedge else None,
+                    what=f"{task_id} on {spec.provider_model}",
+                )
+            except (DeadlineExceeded, AttemptsExhausted, CallCancelled):
+                self.record(task_id, spec, time.monotonic() - started, ok=False)
+                raise
+            except Exception as exc:
+                self.record(task_id, spec, time.monotonic() - started, ok=False)
+                logger.warning("Model %s failed for %s: %s", spec.provider_model, task_id, exc)
+                last_error = exc
+                continue
+            self.record(task_id, spec, time.monotonic() - started)
+            return result
+        if last_error is None:
+            raise ModelRoutingError(f"No models routed for '{task_id}'")
+        raise last_error
@@ -0,0 +1,155 @@
+"""
+prompt_registry.py
+PromptRegistry: versioned prompt templates loaded once from ``prompts/``.
+
+A template file is a static prefix and a variable suffix split by a ``--- variables ---``
+line; an optional first line ``# version: N`` versions it::
+
+    # version: 1
+    Produce a fast homepage snapshot ... Return strict JSON only.
+    --- variables ---
+    Website: {url}
+
+Only the suffix is formatted, so every request for a template shares a byte-identical
+prefix that provider-side prompt caching can reuse. Render counts per prefix hash show
+how often that happens.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+PROMPTS_DIR = os.environ.get("PROMPTS_DIR") or str(Path(__file__).resolve().parent / "prompts")
+SUFFIX_MARKER = "--- variables ---"
+
+_VERSION_LINE = re.compile(r"^#\s*version:\s*(\S+)\s*$")
+# ``{url}``-style fields; JSON examples such as ``{"module": ...}`` are not placeholders.
+_PLACEHOLDER = re.compile(r"(?<!\{)\{[A-Za-z_][A-Za-z0-9_]*\}(?!\})")
+
+
+class PromptError(ValueError):
+    """Raised for malformed templates, unknown names or missing variables."""
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    name: str
+    version: str
+    prefix: str
+    suffix: str
+    prefix_hash: str
+
+
+@dataclass(frozen=True)
+class RenderedPrompt:
+    name: str
+    version: Optional[str]
+    prefix: str
+    suffix: str
+    prefix_hash: Optional[str]
+
+    @property
+    def text(self) -> str:
+        return f"{self.prefix}\n\n{self.suffix}" if self.prefix else self.suffix
+
+
+def parse_template(name: str, source: str) -> PromptTemplate:
+    lines = source.strip().splitlines()
+    version = "1"
+    if lines and _VERSION_LINE.match(lines[0]):
+        version = _VERSION_LINE.match(lines[0]).group(1)
+        lines = lines[1:]
+    body = "\n".join(lines)
+    if SUFFIX_MARKER in body:
+        prefix, suffix = (part.strip() for part in body.split(SUFFIX_MARKER, 1))
+    else:
+        prefix, suffix = body.strip(), ""
+    stray = _PLACEHOLDER.findall(prefix)
+    if stray:
+        raise PromptError(f"Prompt '{name}' has variables {stray} in its static prefix; move them below {SUFFIX_MARKER!r}")
+    return PromptTemplate(
+        name=name,
+        version=version,
+        prefix=prefix,
+        suffix=suffix,
+        prefix_hash=hashlib.sha256(prefix.encode("utf-8")).hexdigest()[:16],
+    )
+
+
+class PromptRegistry:
+    """Templates keyed by path under the prompts directory without ``.txt`` (``sparky/snapshot``)."""
+
+    def __init__(self, directory: str = PROMPTS_DIR):
+        self.directory = Path(directory)
+        self.templates: Dict[str, PromptTemplate] = {}
+        self._lock = threading.Lock()
+        self._renders: Dict[str, int] = {}
+        self._provider_cache: Dict[str, Dict[str, int]] = {}
+        for path in sorted(self.directory.rglob("*.txt")):
+            source = path.read_text(encoding="utf-8")
+            if not source.strip():
+                continue
+            name = path.relative_to(self.directory).with_suffix("").as_posix()
+            self.templates[name] = parse_template(name, source)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.templates
+
+    def get(self, name: str) -> PromptTemplate:
+        try:
+            return self.templates[name]
+        except KeyError:
+            raise PromptError(f"Unknown prompt '{name}' (looked in {self.directory})") from None
+
+    def render(self, name: str, **variables: Any) -> RenderedPrompt:
+        template = self.get(name)
+        try:
+            suffix = template.suffix.format(**variables)
+        except KeyError as exc:
+            raise PromptError(f"Prompt '{name}' needs variable {exc.args[0]!r}") from None
+        with self._lock:
+            self._renders[name] = self._renders.get(name, 0) + 1
+        return RenderedPrompt(name, template.version, template.prefix, suffix, template.prefix_hash)
+
+    def record_provider_cache(self, name: str, cached_tokens: int, input_tokens: int) -> None:
+        """Input tokens the provider reported as read from its prompt cache for ``name``."""
+        with self._lock:
+            usage = self._provider_cache.setdefault(name, {"cached_tokens": 0, "input_tokens": 0})
+            usage["cached_tokens"] += cached_tokens
+            usage["input_tokens"] += input_tokens
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per template: version, prefix hash and size, renders, and how many reused the prefix."""
+        with self._lock:
+            stats = {}
+            for name, template in self.templates.items():
+                renders = self._renders.get(name, 0)
+                stats[name] = {
+                    "version": template.version,
+                    "prefix_hash": template.prefix_hash,
+                    "prefix_chars": len(template.prefix),
+                    "renders": renders,
+                    # Every render after the first sends an identical prefix.
+                    "prefix_reuse_ratio": round((renders - 1) / renders, 3) if renders > 1 else 0.0,
+                }
+                if name in self._provider_cache:
+                    stats[name]["provider_cache"] = dict(self._provider_cache[name])
+            return stats
+
+
+_PROMPTS: Optional[PromptRegistry] = None
+_PROMPTS_LOCK = threading.Lock()
+
+
+def get_prompt_registry() -> PromptRegistry:
+    """Process-wide registry; templates are read from disk once."""
+    global _PROMPTS
+    with _PROMPTS_LOCK:
+        if _PROMPTS is None:
+            _PROMPTS = PromptRegistry()
+        return _PROMPTS
@@ -0,0 +1,286 @@
+"""
+report_store.py
+ReportStore: SQLite-backed history of website analysis runs.
+
+Each run keeps its metadata in an indexed row and its report and per-module outputs
+as zlib-compressed blobs, so history queries never touch report bodies.
+"""
+from __future__ import annotations
+
+import difflib
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+from urllib.parse import urlparse
+
+import json_codec
+
+REPORT_DB_PATH = os.environ.get("REPORT_DB_PATH") or str(Path(__file__).resolve().parent / "reports" / "reports.sqlite3")
+COMPRESSION_LEVEL = 6
+MAX_LIST_LIMIT = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    domain TEXT NOT NULL,
+    url TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    model TEXT NOT NULL,
+    modules TEXT NOT NULL,
+    report BLOB NOT NULL,
+    report_size INTEGER NOT NULL,
+    usage TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_domain_created ON runs (domain, created_at);
+CREATE INDEX IF NOT EXISTS runs_domain_model_created ON runs (domain, model, created_at);
+CREATE INDEX IF NOT EXISTS runs_model_created ON runs (model, created_at);
+CREATE INDEX IF NOT EXISTS runs_created ON runs (created_at);
+CREATE TABLE IF NOT EXISTS module_outputs (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    module TEXT NOT NULL,
+    body BLOB NOT NULL,
+    fingerprint TEXT,
+    PRIMARY KEY (run_id, module)
+) WITHOUT ROWID;
+"""
+
+# report_<slug>_<YYYY-MM-DD-HH-MM>.md as written by WebsiteAnalyzerCrew before the store existed.
+_LEGACY_REPORT_NAME = re.compile(r"^report_(?P<slug>.+?)(?:_+(?P<stamp>\d{4}-\d{2}-\d{2}-\d{2}-\d{2}))?\.md$")
+
+
+def report_domain(url: str) -> str:
+    """Index key for a site: lowercase hostname without a leading ``www.``."""
+    host = (urlparse(url if "://" in url else f"//{url}").hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def _pack(text: str) -> bytes:
+    return zlib.compress(text.encode("utf-8"), COMPRESSION_LEVEL)
+
+
+def _unpack(blob: bytes) -> str:
+    return zlib.decompress(blob).decode("utf-8")
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).isoformat()
+
+
+class ReportStore:
+    """
+    Stores, lists, fetches and diffs analysis runs.
+
+    Safe to share across threads: every thread gets its own connection, and the
+    database runs in WAL mode so readers never wait on a writer.
+    """
+
+    def __init__(self, path: str = REPORT_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(module_outputs)")}
+            if "fingerprint" not in columns:
+                conn.execute("ALTER TABLE module_outputs ADD COLUMN fingerprint TEXT")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    def ping(self) -> bool:
+        """Cheap reachability check for readiness probes (schema present, database readable)."""
+        self._connect().execute("SELECT 1 FROM runs LIMIT 1").fetchall()
+        return True
+
+    def save(
+        self,
+        url: str,
+        model: str,
+        report: str,
+        module_results: Optional[Mapping[str, Any]] = None,
+        usage: Any = None,
+        created_at: Optional[float] = None,
+        fingerprints: Optional[Mapping[str, Optional[str]]] = None,
+    ) -> int:
+        """Store one run and return its id; ``fingerprints`` maps module to input fingerprint."""
+        module_results = dict(module_results or {})
+        fingerprints = fingerprints or {}
+        created_at = time.time() if created_at is None else created_at
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT INTO runs (domain, url, created_at, model, modules, report, report_size, usage)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    report_domain(url),
+                    url,
+                    created_at,
+                    model,
+                    ",".join(module_results),
+                    _pack(report),
+                    len(report),
+                    None if usage is None else json_codec.dumps(usage),
+                ),
+            )
+            run_id = cursor.lastrowid
+            conn.executemany(
+                "INSERT INTO module_outputs (run_id, module, body, fingerprint) VALUES (?, ?, ?, ?)",
+                [
+                    (run_id, module, _pack(str(output)), fingerprints.get(module))
+                    for module, output in module_results.items()
+                ],
+            )
+        return run_id
+
+    @staticmethod
+    def _summary(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            "id": row["id"],
+            "domain": row["domain"],
+            "url": row["url"],
+            "created_at": _iso(row["created_at"]),
+            "model": row["model"],
+            "modules": row["modules"].split(",") if row["modules"] else [],
+            "report_size": row["report_size"],
+        }
+
+    def list_runs(
+        self,
+        domain: Optional[str] = None,
+        model: Optional[str] = None,
+        module: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        limit: int = 50,
+    ) -> List[Dict[str, Any]]:
+        """Run metadata, newest first; ``domain`` accepts a bare domain or a URL."""
+        clauses, params = [], []
+        if domain:
+            clauses.append("domain = ?")
+            params.append(report_domain(domain))
+        if model:
+            clauses.append("model = ?")
+            params.append(model)
+        if module:
+            # Probes the (run_id, module) key per candidate run, walking runs newest first.
+            clauses.append("EXISTS (SELECT 1 FROM module_outputs WHERE run_id = runs.id AND module = ?)")
+            params.append(module)
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("created_at < ?")
+            params.append(until)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        params.append(max(1, min(limit, MAX_LIST_LIMIT)))
+        rows = self._connect().execute(
+            "SELECT id, domain, url, created_at, model, modules, report_size FROM runs"
+            f" {where} ORDER BY created_at DESC, id DESC LIMIT ?",
+            params,
+        )
+        return [self._summary(row) for row in rows]
+
+    def get_run(self, run_id: int, modules: Optional[Iterable[str]] = None) -> Optional[Dict[str, Any]]:
+        """Full run with decompressed report and module outputs (optionally only ``modules``)."""
+        conn = self._connect()
+        row = conn.execute("SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone()
+        if row is None:
+            return None
+        run = self._summary(row)
+        run["report"] = _unpack(row["report"])
+        run["usage"] = json_codec.loads(row["usage"]) if row["usage"] else None
+        query = "SELECT module, body FROM module_outputs WHERE run_id = ?"
+        params: List[Any] = [run_id]
+        wanted = list(modules) if modules is not None else None
+        if wanted is not None:
+            query += f" AND module IN ({', '.join('?' for _ in wanted)})"
+            params.extend(wanted)
+        outputs = {module: _unpack(body) for module, body in conn.execute(query, params)}
+        run["results"] = {module: outputs[module] for module in run["modules"] if module in outputs}
+        return run
+
+    def reusable_outputs(
+        self, url: str, model: str, fingerprints: Mapping[str, Optional[str]]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Newest stored output per module whose input fingerprint equals the given one.
+
+        Only runs of the same URL and model qualify. Modules with a ``None`` fingerprint
+        are never reused.
+        """
+        conn = self._connect()
+        reusable: Dict[str, Dict[str, Any]] = {}
+        for module, fingerprint in fingerprints.items():
+            if fingerprint is None:
+                continue
+            row = conn.execute(
+                "SELECT runs.id, module_outputs.body FROM runs"
+                " JOIN module_outputs ON module_outputs.run_id = runs.id AND module_outputs.module = ?"
+                " WHERE runs.domain = ? AND runs.model = ? AND runs.url = ? AND module_outputs.fingerprint = ?"
+                " ORDER BY runs.created_at DESC LIMIT 1",
+                (module, report_domain(url), model, url, fingerprint),
+            ).fetchone()
+            if row is not None:
+                reusable[module] = {"run_id": row["id"], "output": _unpack(row["body"])}
+        return reusable
+
+    def latest(self, domain: str) -> Optional[Dict[str, Any]]:
+        runs = self.list_runs(domain=domain, limit=1)
+        return self.get_run(runs[0]["id"]) if runs else None
+
+    def diff_runs(self, old_id: int, new_id: int, context: int = 3) -> Optional[Dict[str, Any]]:
+        """Unified diffs of the report and of every module present in either run."""
+        old, new = self.get_run(old_id), self.get_run(new_id)
+        if old is None or new is None:
+            return None
+
+        def unified(before: str, after: str, name: str) -> str:
+            return "".join(difflib.unified_diff(
+                before.splitlines(keepends=True),
+                after.splitlines(keepends=True),
+                fromfile=f"{old_id}/{name}",
+                tofile=f"{new_id}/{name}",
+                n=context,
+            ))
+
+        modules = list(dict.fromkeys(old["modules"] + new["modules"]))
+        return {
+            "old": {key: old[key] for key in ("id", "url", "created_at", "model")},
+            "new": {key: new[key] for key in ("id", "url", "created_at", "model")},
+            "added_modules": [m for m in new["modules"] if m not in old["modules"]],
+            "removed_modules": [m for m in old["modules"] if m not in new["modules"]],
+            "report": unified(old["report"], new["report"], "report"),
+            "modules": {
+                module: unified(old["results"].get(module, ""), new["results"].get(module, ""), module)
+                for module in modules
+            },
+        }
+
+    def import_markdown_reports(self, directory: str, model: str = "unknown") -> List[int]:
+        """Load legacy ``report_<slug>_<timestamp>.md`` files; the files are left in place."""
+        imported = []
+        for path in sorted(Path(directory).glob("report_*.md")):
+            match = _LEGACY_REPORT_NAME.match(path.name)
+            if not match:
+                continue
+            stamp = match.group("stamp")
+            created_at = (
+                datetime.strptime(stamp, "%Y-%m-%d-%H-%M").timestamp() if stamp else path.stat().st_mtime
+            )
+            url = "https://" + match.group("slug").rstrip("_").replace("_", "/")
+            imported.append(self.save(url, model, path.read_text(encoding="utf-8"), created_at=created_at))
+        return imported
@@ -0,0 +1,421 @@
+"""
+scheduler.py
+AuditScheduler: persistent periodic Sparky / full-audit runs for monitored sites.
+
+Sites live in SQLite and, while the scheduler runs, in one min-heap per audit kind
+keyed by due time. A single dispatcher thread sleeps until the earliest due entry and
+hands it to a bounded worker pool, so tens of thousands of sites cost one heap entry
+each and no threads.
+
+Several processes may share one database (e.g. web workers): each can edit schedules,
+but only the holder of the database's lock file runs the dispatcher. The others stand
+by and take over if it exits; the dispatcher re-reads the table every SCHEDULER_SYNC_SECONDS
+to pick up their edits.
+"""
+from __future__ import annotations
+
+import hashlib
+import heapq
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+from urllib.parse import urlparse
+
+try:
+    import fcntl
+except Exception:  # noqa: BLE001
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+SCHEDULER_DB_PATH = os.environ.get("SCHEDULER_DB_PATH") or str(
+    Path(__file__).resolve().parent / "reports" / "schedule.sqlite3"
+)
+AUDIT_KINDS = ("sparky", "full")
+# skip: drop missed slots and wait for the next one; once: run one catch-up as soon as
+# possible; all: replay every missed slot, up to max_catch_up_runs.
+CATCH_UP_POLICIES = ("skip", "once", "all")
+MIN_INTERVAL_SECONDS = 60
+SCHEDULER_SYNC_SECONDS = float(os.environ.get("SCHEDULER_SYNC_SECONDS", "30"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS schedules (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    modules TEXT NOT NULL DEFAULT '',
+    interval_seconds REAL NOT NULL,
+    catch_up TEXT NOT NULL,
+    slot REAL NOT NULL,
+    last_run REAL,
+    last_status TEXT,
+    last_error TEXT,
+    UNIQUE (url, kind)
+);
+"""
+
+
+@dataclass
+class ScheduledSite:
+    """One monitored (url, kind) pair. ``slot`` is the nominal run time before jitter."""
+    id: int
+    url: str
+    kind: str
+    interval_seconds: float
+    catch_up: str
+    slot: float
+    modules: Tuple[str, ...] = ()
+    last_run: Optional[float] = None
+    last_status: Optional[str] = None
+    last_error: Optional[str] = None
+    due: float = field(default=0.0, compare=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "url": self.url,
+            "kind": self.kind,
+            "modules": list(self.modules),
+            "interval_seconds": self.interval_seconds,
+            "catch_up": self.catch_up,
+            "next_run": self.due,
+            "last_run": self.last_run,
+            "last_status": self.last_status,
+            "last_error": self.last_error,
+        }
+
+
+class AuditScheduler:
+    """
+    Runs ``runner(site)`` for every registered site once per interval.
+
+    ``jitter`` spreads sites that share an interval across ``jitter * interval``
+    seconds with a stable per-site offset (derived from the URL), so a batch of sites
+    added together, or a restart, never fires them all at once. ``max_concurrency``
+    caps runs overall and ``kind_limits`` per audit kind (e.g. ``{"full": 2}``). A site
+    never overlaps itself: its next run is only scheduled once the current one ends.
+    """
+
+    def __init__(
+        self,
+        runner: Callable[[ScheduledSite], Any],
+        db_path: str = SCHEDULER_DB_PATH,
+        max_concurrency: int = 4,
+        kind_limits: Optional[Mapping[str, int]] = None,
+        jitter: float = 0.1,
+        catch_up: str = "once",
+        max_catch_up_runs: int = 3,
+        min_interval_seconds: float = MIN_INTERVAL_SECONDS,
+        clock: Callable[[], float] = time.time,
+        sync_seconds: float = SCHEDULER_SYNC_SECONDS,
+    ):
+        if catch_up not in CATCH_UP_POLICIES:
+            raise ValueError(f"catch_up must be one of {CATCH_UP_POLICIES}")
+        self.runner = runner
+        self.db_path = db_path
+        self.max_concurrency = max(1, max_concurrency)
+        self.kind_limits = dict(kind_limits or {})
+        self.jitter = min(max(jitter, 0.0), 1.0)
+        self.catch_up = catch_up
+        self.max_catch_up_runs = max(1, max_catch_up_runs)
+        self.min_interval_seconds = min_interval_seconds
+        self.clock = clock
+        self.sync_seconds = sync_seconds
+        self.is_leader = False
+
+        self._cond = threading.Condition()
+        self._sites: Dict[int, ScheduledSite] = {}
+        self._heaps: Dict[str, List[Tuple[float, int]]] = {kind: [] for kind in AUDIT_KINDS}
+        self._running: Dict[str, int] = {kind: 0 for kind in AUDIT_KINDS}
+        self._active: set = set()
+        self._stopping = False
+        self._dispatcher: Optional[threading.Thread] = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._db_lock = threading.Lock()
+        self._lock_file: Optional[Any] = None
+        # Last (interval, catch_up, modules, slot) seen in the database per site.
+        self._synced: Dict[int, Tuple[Any, ...]] = {}
+
+        if db_path != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        with self._db_lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript(_SCHEMA)
+        self._load()
+
+    # -- scheduling math -------------------------------------------------------------
+
+    def _offset(self, site: ScheduledSite) -> float:
+        digest = hashlib.blake2b(f"{site.url}|{site.kind}".encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "big") / 2 ** 64 * self.jitter * site.interval_seconds
+
+    def _catch_up_slot(self, site: ScheduledSite, slot: float, now: float) -> float:
+        """Apply the site's catch-up policy to a slot whose due time has already passed."""
+        if slot + self._offset(site) > now:
+            return slot
+        missed = int((now - slot) // site.interval_seconds) + 1
+        if site.catch_up == "skip":
+            return slot + missed * site.interval_seconds
+        if site.catch_up == "all":
+            skipped = max(0, missed - self.max_catch_up_runs)
+            return slot + skipped * site.interval_seconds
+        # "once": keep the overdue slot (it runs immediately); the run after it
+        # continues from the current time rather than replaying the gap.
+        return slot
+
+    def _next_slot(self, site: ScheduledSite, now: float) -> float:
+        slot = site.slot + site.interval_seconds
+        if site.catch_up == "once" and slot + self._offset(site) <= now:
+            slot = now - self._offset(site) + site.interval_seconds
+        return self._catch_up_slot(site, slot, now)
+
+    def _push(self, site: ScheduledSite) -> None:
+        site.due = site.slot + self._offset(site)
+        heapq.heappush(self._heaps[site.kind], (site.due, site.id))
+
+    # -- persistence -----------------------------------------------------------------
+
+    @staticmethod
+    def _from_row(row: sqlite3.Row) -> ScheduledSite:
+        return ScheduledSite(
+            id=row["id"],
+            url=row["url"],
+            kind=row["kind"],
+            interval_seconds=row["interval_seconds"],
+            catch_up=row["catch_up"],
+            slot=row["slot"],
+            modules=tuple(module for module in row["modules"].split(",") if module),
+            last_run=row["last_run"],
+            last_status=row["last_status"],
+            last_error=row["last_error"],
+        )
+
+    @staticmethod
+    def _version(interval_seconds: float, catch_up: str, modules: str, slot: float) -> Tuple[Any, ...]:
+        return interval_seconds, catch_up, modules, slot
+
+    def _load(self) -> None:
+        with self._cond:
+            self._sync()
+
+    def _sync(self) -> None:
+        """Load sites added, changed or removed in the database since it was last read. Holds ``_cond``."""
+        now = self.clock()
+        with self._db_lock:
+            rows = self._db.execute("SELECT * FROM schedules").fetchall()
+        seen = set()
+        for row in rows:
+            seen.add(row["id"])
+            version = self._version(row["interval_seconds"], row["catch_up"], row["modules"], row["slot"])
+            if self._synced.get(row["id"]) == version or row["id"] in self._active:
+                continue
+            site = self._from_row(row)
+            site.slot = self._catch_up_slot(site, site.slot, now)
+            self._synced[site.id] = version
+            self._sites[site.id] = site
+            self._push(site)
+        for site_id in [site_id for site_id in self._sites if site_id not in seen and site_id not in self._active]:
+            del self._sites[site_id]
+            self._synced.pop(site_id, None)
+
+    def _save_run(self, site: ScheduledSite) -> None:
+        with self._db_lock, self._db:
+            self._db.execute(
+                "UPDATE schedules SET slot = ?, last_run = ?, last_status = ?, last_error = ? WHERE id = ?",
+                (site.slot, site.last_run, site.last_status, site.last_error, site.id),
+            )
+        self._synced[site.id] = self._version(site.interval_seconds, site.catch_up, ",".join(site.modules), site.slot)
+
+    # -- public API ------------------------------------------------------------------
+
+    def add_site(
+        self,
+        url: str,
+        interval_seconds: float,
+        kind: str = "sparky",
+        modules: Tuple[str, ...] = (),
+        catch_up: Optional[str] = None,
+        start_at: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Register (or update) a monitored site; returns its schedule."""
+        parsed = urlparse(url)
+        if parsed.scheme not in {"http", "https"} or not parsed.netloc:
+            raise ValueError(f"Invalid URL: {url}")
+        if kind not in AUDIT_KINDS:
+            raise ValueError(f"kind must be one of {AUDIT_KINDS}")
+        if not interval_seconds or interval_seconds < self.min_interval_seconds:
+            raise ValueError(f"interval_seconds must be at least {self.min_interval_seconds}")
+        catch_up = catch_up or self.catch_up
+        if catch_up not in CATCH_UP_POLICIES:
+            raise ValueError(f"catch_up must be one of {CATCH_UP_POLICIES}")
+        slot = self.clock() if start_at is None else start_at
+        with self._db_lock, self._db:
+            self._db.execute(
+                "INSERT INTO schedules (url, kind, modules, interval_seconds, catch_up, slot)"
+                " VALUES (?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (url, kind) DO UPDATE SET modules = excluded.modules,"
+                " interval_seconds = excluded.interval_seconds, catch_up = excluded.catch_up,"
+                " slot = excluded.slot",
+                (url, kind, ",".join(modules), interval_seconds, catch_up, slot),
+            )
+            row = self._db.execute("SELECT * FROM schedules WHERE url = ? AND kind = ?", (url, kind)).fetchone()
+        site = self._from_row(row)
+        with self._cond:
+            previous = self._sites.get(site.id)
+            if previous is not None:
+                site.last_run, site.last_status, site.last_error = (
+                    previous.last_run, previous.last_status, previous.last_error
+                )
+            self._sites[site.id] = site
+            self._synced[site.id] = self._version(row["interval_seconds"], row["catch_up"], row["modules"], row["slot"])
+            if site.id not in self._active:
+                self._push(site)
+            self._cond.notify_all()
+            return site.to_dict()
+
+    def remove_site(self, site_id: int) -> bool:
+        with self._db_lock, self._db:
+            deleted = self._db.execute("DELETE FROM schedules WHERE id = ?", (site_id,)).rowcount
+        with self._cond:
+            # Heap entries of removed sites are discarded lazily by the dispatcher.
+            self._sites.pop(site_id, None)
+            self._synced.pop(site_id, None)
+            self._cond.notify_all()
+        return bool(deleted)
+
+    def list_sites(self, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+        with self._cond:
+            sites = sorted(self._sites.values(), key=lambda site: site.due)
+            return [site.to_dict() for site in sites[offset:offset + limit]]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "sites": len(self._sites),
+                "running": dict(self._running),
+                "leader": self.is_leader,
+                "next_due": min((heap[0][0] for heap in self._heaps.values() if heap), default=None),
+            }
+
+    # -- dispatch --------------------------------------------------------------------
+
+    def _kind_has_capacity(self, kind: str) -> bool:
+        limit = self.kind_limits.get(kind)
+        return limit is None or self._running[kind] < limit
+
+    def _pop_due(self, now: float) -> Tuple[List[ScheduledSite], Optional[float]]:
+        """Due sites that fit the caps, and the earliest time anything else becomes due."""
+        ready: List[ScheduledSite] = []
+        wake_at: Optional[float] = None
+        for kind, heap in self._heaps.items():
+            while heap:
+                due, site_id = heap[0]
+                site = self._sites.get(site_id)
+                if site is None or site.due != due or site_id in self._active:
+                    heapq.heappop(heap)
+                    continue
+                if due > now:
+                    wake_at = due if wake_at is None else min(wake_at, due)
+                    break
+                if len(self._active) >= self.max_concurrency or not self._kind_has_capacity(kind):
+                    break
+                heapq.heappop(heap)
+                self._active.add(site_id)
+                self._running[kind] += 1
+                ready.append(site)
+        return ready, wake_at
+
+    def _try_lead(self) -> bool:
+        """Take the database's lock file; only its holder dispatches. Released when the process exits."""
+        if self.is_leader:
+            return True
+        if fcntl is None or self.db_path == ":memory:":
+            self.is_leader = True
+            return True
+        handle = open(f"{self.db_path}.lock", "a")
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return False
+        self._lock_file, self.is_leader = handle, True
+        logger.info("Audit scheduler dispatching for %s", self.db_path)
+        return True
+
+    def _release_lead(self) -> None:
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+        self.is_leader = False
+
+    def _dispatch_loop(self) -> None:
+        with self._cond:
+            while not self._stopping and not self._try_lead():
+                self._cond.wait(self.sync_seconds)
+            # Schedules may have been edited by the previous leader or other processes.
+            self._sync()
+            next_sync = time.monotonic() + self.sync_seconds
+            while not self._stopping:
+                if time.monotonic() >= next_sync:
+                    self._sync()
+                    next_sync = time.monotonic() + self.sync_seconds
+                ready, wake_at = self._pop_due(self.clock())
+                for site in ready:
+                    self._pool.submit(self._execute, replace(site))
+                if ready:
+                    continue
+                timeout = max(0.0, next_sync - time.monotonic())
+                if wake_at is not None:
+                    timeout = min(timeout, max(0.0, wake_at - self.clock()))
+                self._cond.wait(timeout)
+
+    def _execute(self, snapshot: ScheduledSite) -> None:
+        started = self.clock()
+        status, error = "ok", None
+        try:
+            self.runner(snapshot)
+        except Exception as exc:  # noqa: BLE001
+            status, error = "error", str(exc)
+            logger.warning("Scheduled %s audit of %s failed: %s", snapshot.kind, snapshot.url, exc)
+        finally:
+            with self._cond:
+                self._active.discard(snapshot.id)
+                self._running[snapshot.kind] -= 1
+                site = self._sites.get(snapshot.id)
+                if site is not None:
+                    site.last_run, site.last_status, site.last_error = started, status, error
+                    if site.slot == snapshot.slot:
+                        site.slot = self._next_slot(site, self.clock())
+                    self._push(site)
+                    # Saved under the lock so a sync never sees the previous slot as an edit.
+                    self._save_run(site)
+                self._cond.notify_all()
+
+    def start(self) -> None:
+        with self._cond:
+            if self._dispatcher is not None:
+                return
+            self._stopping = False
+            self._pool = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="audit-scheduler")
+            self._dispatcher = threading.Thread(target=self._dispatch_loop, name="audit-scheduler", daemon=True)
+            self._dispatcher.start()
+
+    def stop(self, wait: bool = True) -> None:
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+            dispatcher, self._dispatcher = self._dispatcher, None
+        if dispatcher is not None:
+            dispatcher.join()
+        self._release_lead()
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,12 @@
+import os
+import sys
+from pathlib import Path
+
+# Backend modules import each other flat (``from crew import ...``), as they do when
+# app.py runs from this directory.
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+# Checkpoints of jobs the tests run must not be resumed by the next app started from this tree.
+os.environ.setdefault("CHECKPOINT_DB_PATH", ":memory:")
@@ -0,0 +1,137 @@
+import json
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from test_sse_contract import load_app_module
+from tools.bulk_seo import BulkSEOAnalyzer
+
+PAGE = b"<html><head><title>Bulk analysis page</title></head><body><h1>Hi</h1></body></html>"
+DELAY_SECONDS = 0.2
+
+
+class _SlowHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    lock = threading.Lock()
+    in_flight = {}
+    peak = {}
+
+    def do_GET(self):
+        host = self.headers["Host"].split(":")[0]
+        with self.lock:
+            self.in_flight[host] = self.in_flight.get(host, 0) + 1
+            self.peak[host] = max(self.peak.get(host, 0), self.in_flight[host])
+        try:
+            time.sleep(DELAY_SECONDS)
+            status = 404 if self.path.startswith("/missing") else 200
+            self.send_response(status)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(PAGE)))
+            self.end_headers()
+            self.wfile.write(PAGE)
+        finally:
+            with self.lock:
+                self.in_flight[host] -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+class _SlowParsePool(ThreadPoolExecutor):
+    """One parse worker slower than the fetches; records the most pages it held at once."""
+
+    def __init__(self):
+        super().__init__(max_workers=1)
+        self.lock = threading.Lock()
+        self.pending = self.peak = 0
+
+    def submit(self, fn, *args, **kwargs):
+        with self.lock:
+            self.pending += 1
+            self.peak = max(self.peak, self.pending)
+
+        def slow_parse():
+            time.sleep(DELAY_SECONDS / 2)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self.lock:
+                    self.pending -= 1
+
+        return super().submit(slow_parse)
+
+
+class TestBulkSEOAnalyzer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _SlowHandler)
+        cls.port = cls.server.server_address[1]
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        _SlowHandler.peak = {}
+
+    def _urls(self, count):
+        # Two hostnames for the same server so per-host limits can be observed separately.
+        hosts = ("127.0.0.1", "localhost")
+        return [f"http://{hosts[i % 2]}:{self.port}/page-{i}" for i in range(count)]
+
+    def test_concurrent_results_respect_per_host_limit(self):
+        urls = self._urls(16)
+        analyzer = BulkSEOAnalyzer(max_concurrency=8, per_host=3)
+
+        started = time.perf_counter()
+        results = list(analyzer.analyze(urls))
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(sorted(r["url"] for r in results), sorted(urls))
+        self.assertTrue(all(r["ok"] for r in results))
+        self.assertEqual(results[0]["result"]["title"]["text"], "Bulk analysis page")
+        self.assertLessEqual(max(_SlowHandler.peak.values()), 3)
+        # 16 requests of 0.2s would take 3.2s serially; 6 concurrent slots need ~0.6s.
+        self.assertLess(elapsed, 16 * DELAY_SECONDS / 2)
+
+    def test_fetches_wait_for_slow_parses(self):
+        parse_pool = _SlowParsePool()
+        analyzer = BulkSEOAnalyzer(max_concurrency=4, per_host=4, parse_executor=parse_pool, max_pending_parses=2)
+        try:
+            results = list(analyzer.analyze(self._urls(12)))
+        finally:
+            parse_pool.shutdown()
+
+        self.assertEqual(len(results), 12)
+        # Fetches already running when the limit is reached still hand their pages over.
+        self.assertLessEqual(parse_pool.peak, 2 + 4)
+
+    def test_errors_are_reported_per_url(self):
+        urls = ["not a url", f"http://127.0.0.1:{self.port}/missing"]
+        results = {r["url"]: r for r in BulkSEOAnalyzer().analyze(urls)}
+
+        self.assertFalse(results["not a url"]["ok"])
+        self.assertIn("404", results[urls[1]]["error"])
+
+    def test_endpoint_streams_ndjson(self):
+        app_module = load_app_module()
+        client = app_module.app.test_client()
+        urls = self._urls(4)
+
+        response = client.post("/api/seo/bulk?concurrency=4", data="\n".join(urls) + "\n# comment\n",
+                               content_type="text/plain")
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+        self.assertEqual(response.mimetype, "application/x-ndjson")
+        self.assertEqual(sorted(line["url"] for line in lines), sorted(urls))
+
+        bad = client.post("/api/seo/bulk", json={"urls": "https://example.com"})
+        self.assertEqual(bad.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,250 @@
+import json
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import checkpoints
+from checkpoints import CheckpointStore, checkpoint_job, checkpointed, completed_stages
+from llm_cache import LLMResponseCache
+from report_store import ReportStore
+from test_deadline import _InlineThread
+from test_fingerprint import PAGE, _FakeAgent, _FakeCrew, _FakeTask, load_crew_module
+from test_sparky_modes import _Agent, _Crew, _Task
+from test_sse_contract import load_app_module
+from tools.fingerprint import region_digests
+
+
+class _ProcessDied(BaseException):
+    """Stands in for a deploy or crash: nothing below the worker gets to handle it."""
+
+
+def dead_process_store(path):
+    """A store whose process has stopped heartbeating."""
+    store = CheckpointStore(path)
+
+    def die():
+        with store._db:
+            store._db.execute("UPDATE owners SET seen_at = 0 WHERE owner = ?", (store.owner,))
+
+    return store, die
+
+
+class TestCheckpointStore(unittest.TestCase):
+    def setUp(self):
+        self.store = CheckpointStore(":memory:")
+
+    def test_stages_live_until_the_job_finishes(self):
+        self.store.start("job", "sparky", {"url": "https://example.com"})
+        self.store.save_stage("job", "site_snapshot", "{}")
+        self.store.save_stage("unknown", "site_snapshot", "{}")
+        self.assertEqual(self.store.stages("job"), {"site_snapshot": "{}"})
+        self.assertEqual(self.store.stages("unknown"), {})
+        [record] = self.store.unfinished()
+        self.assertEqual((record["id"], record["kind"], record["params"]), ("job", "sparky", {"url": "https://example.com"}))
+
+        self.store.start("job", "sparky", {})
+        self.assertEqual(self.store.get_stage("job", "site_snapshot"), "{}")
+        self.store.finish("job")
+        self.assertEqual(self.store.unfinished(), [])
+        self.assertEqual(self.store.stages("job"), {})
+
+    def test_expired_jobs_are_dropped(self):
+        store = CheckpointStore(":memory:", ttl_seconds=60)
+        store.start("old", "full", {})
+        with patch.object(checkpoints.time, "time", return_value=time.time() + 120):
+            self.assertEqual(store.unfinished(), [])
+
+    def test_orphans_are_claimed_once(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = str(Path(tmp.name) / "checkpoints.sqlite3")
+        dead, die = dead_process_store(path)
+        dead.start("job", "sparky", {"url": "https://example.com"})
+        first, second = CheckpointStore(path), CheckpointStore(path)
+        # The owner is still heartbeating: its job is running, not orphaned.
+        self.assertEqual(first.claim_orphans(), [])
+
+        die()
+        claims = []
+        threads = [threading.Thread(target=lambda store=store: claims.extend(store.claim_orphans()))
+                   for store in (first, second)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([record["id"] for record in claims], ["job"])
+        self.assertEqual(second.claim_orphans(), [])
+
+    def test_job_that_keeps_crashing_is_failed(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = str(Path(tmp.name) / "checkpoints.sqlite3")
+        live = CheckpointStore(path, max_attempts=2)
+        for attempt in range(2):
+            dead, die = dead_process_store(path)
+            dead.start("job", "sparky", {})
+            die()
+            claimed = live.claim_orphans()
+            self.assertEqual([record["attempts"] for record in claimed], [1] if attempt == 0 else [])
+        self.assertEqual(live.unfinished(), [])
+        self.assertEqual(live.stats()["failed_jobs"], 1)
+
+    def test_job_scope_resumes_until_the_block_exits(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return "snapshot"
+
+        self.assertEqual(checkpointed("site_snapshot", compute), "snapshot")
+        self.assertEqual(completed_stages(), {})
+        with self.assertRaises(_ProcessDied), checkpoint_job("job", "sparky", {}, store=self.store):
+            checkpointed("site_snapshot", compute)
+            raise _ProcessDied
+        self.assertEqual(self.store.stages("job"), {"site_snapshot": "snapshot"})
+
+        with checkpoint_job("job", "sparky", {}, store=self.store):
+            self.assertEqual(checkpointed("site_snapshot", compute), "snapshot")
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(self.store.unfinished(), [])
+
+        with self.assertRaises(ValueError), checkpoint_job("failing", "sparky", {}, store=self.store):
+            raise ValueError("bad url")
+        self.assertEqual(self.store.unfinished(), [])
+
+
+class TestSparkyResume(unittest.TestCase):
+    def setUp(self):
+        self.crew_module = load_crew_module()
+        for name, fake in (("Agent", _Agent), ("Task", _Task), ("Crew", _Crew)):
+            patcher = patch.object(self.crew_module, name, fake)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        cache = LLMResponseCache(str(Path(tmp.name) / "cache.sqlite3"))
+        patcher = patch.object(self.crew_module, "get_llm_cache", return_value=cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        _Crew.kickoffs = []
+        self.service = self.crew_module.CrewService()
+        self.store = CheckpointStore(":memory:")
+
+    def test_completed_snapshot_is_not_rerun(self):
+        with self.assertRaises(_ProcessDied), checkpoint_job("job", "sparky", {}, store=self.store), patch.object(
+            self.service, "sparky_summary", side_effect=_ProcessDied
+        ):
+            self.service.run_sparky_pipeline("https://example.com")
+        self.assertEqual(len(_Crew.kickoffs), 1)
+        self.assertEqual(list(self.store.stages("job")), ["site_snapshot"])
+
+        with checkpoint_job("job", "sparky", {}, store=self.store):
+            result = self.service.run_sparky_pipeline("https://example.com")
+        self.assertEqual(len(_Crew.kickoffs), 2)
+        self.assertIn("Input snapshot:", _Crew.kickoffs[-1])
+        self.assertEqual(result["summary"], "Plain text summary.")
+        self.assertEqual(self.store.unfinished(), [])
+
+
+class _CrashingCrew(_FakeCrew):
+    """Reports each module task through its callback and can die partway through."""
+
+    crash_after = None
+
+    def kickoff(self, inputs):
+        for index, task in enumerate(self.tasks[:-1]):
+            if index == type(self).crash_after:
+                raise _ProcessDied
+            task.callback(f"output {index}")
+        return super().kickoff(inputs)
+
+
+class TestAuditResume(unittest.TestCase):
+    def setUp(self):
+        crew_module = load_crew_module()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        for name, fake in (("Agent", _FakeAgent), ("Task", _FakeTask), ("Crew", _CrashingCrew)):
+            patcher = patch.object(crew_module, name, fake)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = patch.object(crew_module, "fetch_region_digests", lambda url: region_digests(PAGE))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        with patch.object(crew_module.WebsiteAnalyzerCrew, "_validate_configuration"):
+            self.analyzer = crew_module.WebsiteAnalyzerCrew(ReportStore(str(Path(tmp.name) / "r.sqlite3")))
+        self.analyzer.model_settings = {**self.analyzer.model_settings, "retry_limit": 0}
+        self.store = CheckpointStore(":memory:")
+        _CrashingCrew.runs = []
+
+    def test_completed_modules_are_handed_to_the_report(self):
+        modules = ["seo", "performance", "content"]
+        _CrashingCrew.crash_after = 1
+        with self.assertRaises(_ProcessDied), checkpoint_job("audit", "full", {}, store=self.store):
+            self.analyzer.analyze_website(modules, "https://example.com")
+        self.assertEqual(self.store.stages("audit"), {"module:seo": "output 0"})
+
+        _CrashingCrew.crash_after = None
+        with checkpoint_job("audit", "full", {}, store=self.store):
+            result = self.analyzer.analyze_website(modules, "https://example.com")
+        self.assertEqual(result["resumed_modules"], ["seo"])
+        self.assertEqual(len(_CrashingCrew.runs[-1]), 3)
+        self.assertIn("### seo\noutput 0", _CrashingCrew.runs[-1][-1].description)
+        self.assertEqual(result["results"], {"seo": "output 0", "performance": "output 0", "content": "output 1"})
+        self.assertEqual(self.store.unfinished(), [])
+
+
+class TestResumeOnStart(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = str(Path(tmp.name) / "checkpoints.sqlite3")
+        self.store = CheckpointStore(self.path)
+        patcher = patch.object(checkpoints, "_CHECKPOINT_STORE", self.store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.app_module = load_app_module()
+
+    def test_resume_is_opt_in_and_not_run_on_import(self):
+        self.assertFalse(self.app_module.RESUME_JOBS_ON_START)
+        with patch.object(self.app_module, "resume_unfinished_jobs") as resume:
+            self.app_module.start_background_services()
+        resume.assert_not_called()
+
+    def test_interrupted_test_job_keeps_its_id(self):
+        params = {"url": "https://example.com", "tenant": "acme", "cache_bypass": False,
+                  "sparky_mode": "single_call", "deadline_seconds": 60}
+        dead, die = dead_process_store(self.path)
+        dead.start("abc123", "sparky", params)
+        die()
+        pipeline_calls = []
+
+        def pipeline(url, mode=None):
+            pipeline_calls.append((url, mode))
+            return {"summary": "Resumed summary", "categories": []}
+
+        with patch.object(self.app_module, "_simulate_progress"), patch.object(
+            self.app_module.CREW, "run_sparky_pipeline", side_effect=pipeline
+        ), patch.object(self.app_module.threading, "Thread", _InlineThread):
+            self.assertEqual(self.app_module.resume_unfinished_jobs(), 1)
+
+        self.assertEqual(pipeline_calls, [("https://example.com", "single_call")])
+        job = self.app_module.get_job("abc123")
+        self.assertEqual((job.status, job.tenant), ("completed", "acme"))
+        self.assertEqual(job.events[0]["message"], "resumed")
+        self.assertEqual(self.store.unfinished(), [])
+
+        # The client's Last-Event-ID came from the previous process: replay from the start.
+        response = self.app_module.app.test_client().get(
+            "/api/test/events/abc123", headers={"Last-Event-ID": "40"}
+        )
+        body = response.get_data(as_text=True)
+        self.assertTrue(body.startswith("id: 1\nevent: status\n"))
+        self.assertIn(json.dumps("Resumed summary"), body)
+
+
+if __name__ == "__main__":
+    unittest.main()
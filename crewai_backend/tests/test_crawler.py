@@ -0,0 +1,115 @@
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from tools.crawler import SiteCrawler, VisitedSet, normalize_url, parse_crawl_delay
+
+SITE = {
+    "/": '<a href="/a">A</a><a href="/b#section">B</a><a href="/a?utm_source=x">A again</a>'
+         '<a href="/private/secret">Secret</a><a href="https://elsewhere.example/">Out</a>',
+    "/a": '<a href="/a/deep">Deep</a><a href="/">Home</a>',
+    "/b": '<a href="/b/deep">Deep</a>',
+    "/a/deep": '<a href="/a/deeper">Deeper</a>',
+    "/b/deep": "",
+    "/a/deeper": "",
+    "/private/secret": "",
+}
+ROBOTS = "User-agent: *\nDisallow: /private/\nCrawl-delay: {delay}\n"
+
+
+class _SiteHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    crawl_delay = 0
+    requests = []
+
+    def do_GET(self):
+        type(self).requests.append((self.path, time.monotonic()))
+        if self.path == "/robots.txt":
+            body, content_type = ROBOTS.format(delay=self.crawl_delay).encode(), "text/plain"
+        elif self.path in SITE:
+            body, content_type = f"<html><body>{SITE[self.path]}</body></html>".encode(), "text/html"
+        else:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestSiteCrawler(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _SiteHandler)
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        _SiteHandler.crawl_delay = 0
+        _SiteHandler.requests = []
+
+    def test_bfs_dedupes_and_respects_robots(self):
+        records = list(SiteCrawler(self.base, max_pages=50, max_depth=5, concurrency=4).crawl())
+        by_url = {record["url"].replace(self.base, ""): record for record in records}
+
+        self.assertEqual(set(by_url), {"/", "/a", "/b", "/a/deep", "/b/deep", "/a/deeper", "/private/secret"})
+        self.assertEqual(by_url["/private/secret"]["error"], "disallowed by robots.txt")
+        self.assertNotIn("/private/secret", [path for path, _ in _SiteHandler.requests])
+        self.assertEqual(by_url["/a/deeper"]["depth"], 3)
+        self.assertIn("links", by_url["/"]["result"])
+        fetched_pages = [path for path, _ in _SiteHandler.requests if path != "/robots.txt"]
+        self.assertEqual(len(fetched_pages), len(set(fetched_pages)))
+
+    def test_page_and_depth_budgets(self):
+        shallow = list(SiteCrawler(self.base, max_depth=1, concurrency=2).crawl())
+        self.assertTrue(all(record["depth"] <= 1 for record in shallow))
+
+        capped = list(SiteCrawler(self.base, max_pages=3, concurrency=2).crawl())
+        self.assertEqual(len(capped), 3)
+
+    def test_crawl_delay_spaces_requests(self):
+        _SiteHandler.crawl_delay = 0.1
+        list(SiteCrawler(self.base, max_pages=4, concurrency=4).crawl())
+
+        starts = [ts for path, ts in _SiteHandler.requests if path != "/robots.txt"]
+        gaps = [later - earlier for earlier, later in zip(starts, starts[1:])]
+        self.assertTrue(gaps)
+        self.assertGreaterEqual(min(gaps), 0.08)
+
+
+class TestURLNormalization(unittest.TestCase):
+    def test_normalize_url(self):
+        self.assertEqual(normalize_url("HTTPS://Example.COM:443"), "https://example.com/")
+        self.assertEqual(normalize_url("http://example.com:8080/p?b=2&a=1&utm_medium=x#frag"),
+                         "http://example.com:8080/p?a=1&b=2")
+        self.assertIsNone(normalize_url("mailto:team@example.com"))
+
+    def test_parse_crawl_delay(self):
+        lines = ["User-agent: otherbot", "Crawl-delay: 9", "", "User-agent: getsafe360bot",
+                 "User-agent: *", "Crawl-delay: 0.5 # polite"]
+        self.assertEqual(parse_crawl_delay(lines, "GetSafe360Bot/1.0"), 0.5)
+        self.assertEqual(parse_crawl_delay(lines, "OtherBot/2.0"), 9.0)
+        self.assertEqual(parse_crawl_delay(["User-agent: *", "Disallow: /"], "AnyBot"), 0.0)
+
+    def test_visited_set(self):
+        visited = VisitedSet()
+        self.assertTrue(visited.add("https://example.com/"))
+        self.assertFalse(visited.add("https://example.com/"))
+        self.assertIn("https://example.com/", visited)
+        self.assertEqual(len(visited), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,173 @@
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from deadline import CallCancelled, DeadlineExceeded, check_cancelled, deadline_scope, guarded_call, remaining
+from llm_limiter import LLMLimiter
+from model_router import ModelRouter, RouteStats
+from test_sse_contract import load_app_module
+
+
+class TestGuardedCall(unittest.TestCase):
+    def test_timed_out_call_is_cancelled_not_retried(self):
+        calls, outcomes = [], []
+
+        def slow():
+            calls.append(1)
+            time.sleep(0.3)
+            try:
+                check_cancelled()
+                outcomes.append("continued")
+            except CallCancelled:
+                outcomes.append("cancelled")
+
+        with patch("deadline.backoff_delay", return_value=0), self.assertRaises(TimeoutError):
+            guarded_call(slow, timeout=0.1, retries=2)
+        time.sleep(0.4)
+        self.assertEqual((len(calls), outcomes), (1, ["cancelled"]))
+
+    def test_retries_are_bounded(self):
+        calls = []
+
+        def failing():
+            calls.append(1)
+            raise ValueError("bad gateway")
+
+        with patch("deadline.backoff_delay", return_value=0), self.assertRaisesRegex(ValueError, "bad gateway"):
+            guarded_call(failing, retries=2)
+        self.assertEqual(len(calls), 3)
+
+    def test_process_exit_is_not_retried(self):
+        calls = []
+
+        def exiting():
+            calls.append(1)
+            raise SystemExit(1)
+
+        with self.assertRaises(SystemExit):
+            guarded_call(exiting, retries=2)
+        self.assertEqual(len(calls), 1)
+
+    def test_hedged_duplicate_wins(self):
+        calls = []
+        lock = threading.Lock()
+
+        def slow_first():
+            with lock:
+                calls.append(1)
+                first = len(calls) == 1
+            time.sleep(1 if first else 0.01)
+            return "first" if first else "hedge"
+
+        started = time.monotonic()
+        self.assertEqual(guarded_call(slow_first, timeout=5, hedge_after=0.05), "hedge")
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual(len(calls), 2)
+
+    def test_hedge_without_timeout_or_deadline_is_bounded(self):
+        with patch("deadline.DEFAULT_CALL_TIMEOUT_SECONDS", 0.2), self.assertRaises(TimeoutError):
+            guarded_call(lambda: time.sleep(1), hedge_after=0.05)
+
+    def test_deadline_bounds_attempts_and_propagates(self):
+        seen = []
+
+        def hang():
+            seen.append(remaining())
+            time.sleep(1)
+
+        started = time.monotonic()
+        with deadline_scope(0.2), self.assertRaises(DeadlineExceeded):
+            guarded_call(hang, timeout=60, retries=3)
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual(len(seen), 1)
+        self.assertLessEqual(seen[0], 0.2)
+
+        with deadline_scope(10), deadline_scope(0.5):
+            self.assertLessEqual(remaining(), 0.5)
+        self.assertIsNone(remaining())
+
+    def test_router_stops_fallback_at_deadline(self):
+        router = ModelRouter({
+            "default_model": "a",
+            "models": {"a": {"provider_model": "x/a", "timeout_seconds": 60}, "b": {"provider_model": "x/b"}},
+            "routing": {"task": {"models": ["a", "b"]}},
+        }, stats=RouteStats())
+        tried = []
+
+        def hang(spec):
+            tried.append(spec.name)
+            time.sleep(1)
+
+        with deadline_scope(0.1), self.assertRaises(DeadlineExceeded):
+            router.run("task", hang)
+        self.assertEqual(tried, ["a"])
+
+    def test_attempts_are_capped_across_router_guard_and_limiter(self):
+        router = ModelRouter({
+            "default_model": "a",
+            "models": {
+                "a": {"provider_model": "x/a", "retry_limit": 3},
+                "b": {"provider_model": "x/b", "retry_limit": 3},
+            },
+            "routing": {"task": {"models": ["a", "b"]}},
+        }, stats=RouteStats())
+        limiter = LLMLimiter(requests_per_minute=10 ** 6, tokens_per_minute=10 ** 9, max_throttle_retries=4)
+        requests = []
+
+        def throttled(spec):
+            def call():
+                requests.append(spec.name)
+                raise RuntimeError("rate limit")
+            return limiter.run(call, tokens=1)
+
+        with patch("deadline.LLM_MAX_ATTEMPTS", 5), patch("deadline.backoff_delay", return_value=0), patch(
+            "llm_limiter.backoff_delay", return_value=0
+        ), self.assertRaisesRegex(RuntimeError, "rate limit"):
+            router.run("task", throttled)
+        # Without the shared budget: 2 models x 4 guard attempts x 5 throttle attempts.
+        self.assertEqual(requests, ["a"] * 5)
+
+    def test_queued_call_leaves_the_limiter_when_abandoned(self):
+        limiter = LLMLimiter(max_concurrency=1)
+        held = limiter.acquire(tokens=1)
+        started = time.monotonic()
+        with self.assertRaises(TimeoutError):
+            guarded_call(lambda: limiter.run(lambda: "late", tokens=1), timeout=0.1)
+        time.sleep(0.4)
+        self.assertEqual(limiter.metrics()["queued"], 0)
+        limiter.release(held)
+        self.assertLess(time.monotonic() - started, 1)
+
+
+class TestJobDeadline(unittest.TestCase):
+    def test_expired_deadline_emits_clean_error_event(self):
+        app_module = load_app_module()
+
+        def hung_pipeline(url, mode=None):
+            return guarded_call(lambda: time.sleep(5))
+
+        with patch.object(app_module, "_simulate_progress"), patch.object(
+            app_module.CREW, "run_sparky_pipeline", side_effect=hung_pipeline
+        ), patch.object(app_module.threading, "Thread", _InlineThread):
+            response = app_module.app.test_client().post(
+                "/api/test/start", json={"url": "https://example.com", "deadline_seconds": 0.2}
+            )
+        job = app_module.get_job(response.get_json()["test_id"])
+        self.assertEqual(job.status, "failed")
+        self.assertEqual(job.events[-1]["type"], "error")
+        self.assertEqual(job.events[-1]["code"], "deadline_exceeded")
+
+
+class _InlineThread(threading.Thread):
+    """Runs the job worker inline; other threads (heartbeats, guarded calls) start normally."""
+
+    def start(self):
+        if getattr(self, "_target", None) is not None and self._target.__name__ == "_run_sparky_worker":
+            self.run()
+        else:
+            super().start()
+
+
+if __name__ == "__main__":
+    unittest.main()
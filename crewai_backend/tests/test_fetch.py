@@ -0,0 +1,224 @@
+import gzip
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+from tools import fetch as fetch_module
+from tools.fetch import ConditionalCache, FetchedPage, fetch, get_session, sniff_encoding
+
+BODY = "<html><head><title>Grüße</title></head><body>cached</body></html>".encode("utf-8")
+LATIN_BODY = '<html><head><meta charset="iso-8859-1"><title>Grüße</title></head></html>'.encode("latin-1")
+GZIP_BOMB = gzip.compress(b"<p>" + b"0" * (20 * 1024 * 1024))
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    seen_headers = []
+    peers = set()
+
+    def _send_chunked(self, chunk, count, pause=0.0):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for _ in range(count):
+                self.wfile.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+                self.wfile.flush()
+                time.sleep(pause)
+            self.wfile.write(b"0\r\n\r\n")
+        except OSError:
+            pass
+
+    def do_GET(self):
+        type(self).seen_headers.append(dict(self.headers))
+        type(self).peers.add(self.client_address)
+        if self.path == "/endless":
+            self._send_chunked(b"<div>" + b"x" * 8192 + b"</div>", count=100_000)
+            return
+        if self.path == "/stall":
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", "100000")
+            self.end_headers()
+            self.wfile.write(b"<p>stalled")
+            self.wfile.flush()
+            time.sleep(3)
+            return
+        if self.path == "/trickle":
+            self._send_chunked(b"<p>slow</p>", count=200, pause=0.02)
+            return
+        if self.path in ("/bomb", "/latin"):
+            body = GZIP_BOMB if self.path == "/bomb" else LATIN_BODY
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            if self.path == "/bomb":
+                self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        if self.path == "/etag" and self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.send_header("ETag", '"v1"')
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        if self.path == "/etag":
+            self.send_header("ETag", '"v1"')
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+class _LocalServerTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        _Handler.seen_headers = []
+        _Handler.peers = set()
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.cache = ConditionalCache(self.cache_dir.name)
+
+    def tearDown(self):
+        self.cache_dir.cleanup()
+
+
+class TestConditionalFetch(_LocalServerTestCase):
+    def test_repeat_fetch_revalidates_and_serves_cached_body(self):
+        first = fetch(f"{self.base}/etag", cache=self.cache)
+        second = fetch(f"{self.base}/etag", cache=self.cache)
+
+        self.assertFalse(first.from_cache)
+        self.assertTrue(second.from_cache)
+        self.assertEqual(second.text, first.text)
+        self.assertEqual(second.headers.get("etag"), '"v1"')
+        self.assertIn("Grüße", second.text)
+        self.assertNotIn("If-None-Match", _Handler.seen_headers[0])
+        self.assertEqual(_Handler.seen_headers[1]["If-None-Match"], '"v1"')
+        self.assertIn("gzip", _Handler.seen_headers[0]["Accept-Encoding"])
+
+    def test_responses_without_validators_are_not_cached(self):
+        fetch(f"{self.base}/plain", cache=self.cache)
+        second = fetch(f"{self.base}/plain", cache=self.cache)
+
+        self.assertFalse(second.from_cache)
+        self.assertNotIn("If-None-Match", _Handler.seen_headers[1])
+
+    def test_session_reuses_connections(self):
+        for _ in range(3):
+            fetch(f"{self.base}/plain", cache=None)
+
+        self.assertIs(get_session(), get_session())
+        self.assertEqual(len(_Handler.peers), 1)
+
+
+class TestCacheBounds(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.directory = tmp.name
+
+    @staticmethod
+    def page(name, size=10):
+        return FetchedPage(url=f"https://example.com/{name}", status_code=200, content=b"x" * size,
+                           encoding="utf-8", headers={"ETag": f'"{name}"'})
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = ConditionalCache(self.directory, max_entries=3)
+        for name in ("a", "b", "c"):
+            cache.store(self.page(name))
+        self.assertIsNotNone(cache.load("https://example.com/a"))
+        cache.store(self.page("d"))
+
+        kept = [name for name in "abcd" if cache.load(f"https://example.com/{name}") is not None]
+        self.assertEqual(kept, ["a", "d"])
+
+    def test_total_size_is_bounded(self):
+        cache = ConditionalCache(self.directory, max_bytes=10_000)
+        for index in range(20):
+            cache.store(self.page(str(index), size=1000))
+        stored = sum(path.stat().st_size for path in Path(self.directory).iterdir())
+        self.assertLessEqual(stored, 10_000)
+        self.assertIsNotNone(cache.load("https://example.com/19"))
+
+
+class TestBoundedFetch(_LocalServerTestCase):
+    def test_endless_body_is_capped_and_flagged(self):
+        page = fetch(f"{self.base}/endless", cache=self.cache, max_bytes=256 * 1024)
+
+        self.assertTrue(page.truncated)
+        self.assertEqual(len(page.content), 256 * 1024)
+
+    def test_decompression_is_capped(self):
+        page = fetch(f"{self.base}/bomb", cache=self.cache, max_bytes=1024 * 1024)
+
+        self.assertTrue(page.truncated)
+        self.assertEqual(len(page.content), 1024 * 1024)
+
+    def test_slow_body_stops_at_read_budget(self):
+        started = time.monotonic()
+        page = fetch(f"{self.base}/trickle", cache=self.cache, max_seconds=0.3)
+
+        self.assertTrue(page.truncated)
+        self.assertLess(time.monotonic() - started, 2)
+
+    def test_read_stalled_mid_chunk_stops_at_read_budget(self):
+        started = time.monotonic()
+        page = fetch(f"{self.base}/stall", cache=self.cache, timeout=10, max_seconds=0.3)
+
+        self.assertTrue(page.truncated)
+        self.assertLess(time.monotonic() - started, 1.5)
+
+    def test_late_alarm_leaves_the_pooled_connection_alone(self):
+        alarms = []
+        schedule = fetch_module._WATCHDOG.schedule
+
+        def capture(when, callback):
+            alarms.append(callback)
+            return schedule(when, callback)
+
+        with patch.object(fetch_module._WATCHDOG, "schedule", side_effect=capture):
+            fetch(f"{self.base}/plain", cache=None)
+        # Fires after the read finished and the connection went back to the pool.
+        alarms[0]()
+        page = fetch(f"{self.base}/plain", cache=None)
+
+        self.assertEqual((page.content, page.truncated), (BODY, False))
+        self.assertEqual(len(_Handler.peers), 1)
+
+    def test_complete_page_is_not_truncated_and_meta_charset_is_used(self):
+        page = fetch(f"{self.base}/latin", cache=self.cache)
+
+        self.assertFalse(page.truncated)
+        self.assertEqual(page.encoding, "iso8859-1")
+        self.assertIn("Grüße", page.text)
+
+    def test_sniff_encoding_order(self):
+        self.assertEqual(sniff_encoding("text/html; charset=UTF-8", b'<meta charset="latin-1">'), "utf-8")
+        self.assertEqual(sniff_encoding("text/html", b"\xef\xbb\xbf<html>"), "utf-8")
+        self.assertEqual(sniff_encoding(None, b'<meta http-equiv="Content-Type" content="text/html; charset=windows-1252">'),
+                         "cp1252")
+        self.assertEqual(sniff_encoding("text/html; charset=bogus", b""), "utf-8")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import importlib.util
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from report_store import ReportStore
+from tools.fingerprint import module_fingerprint, region_digests
+
+PAGE = """<html lang="en"><head><title>Shop</title><meta name="description" content="Shoes">
+<link rel="stylesheet" href="/app.css"><script src="/app.js" defer></script></head>
+<body><header><nav>Menu</nav></header><main><h1>Shoes</h1><p>Great shoes.</p>
+<img src="/hero.jpg" alt="Hero"><a href="/about">About</a>
+<form action="/search"><label for="q">Search</label><input id="q" name="q"></form></main></body></html>"""
+
+
+def changed_regions(before, after, headers=None):
+    old, new = region_digests(before), region_digests(after, headers)
+    return sorted(name for name in old if old[name] != new[name])
+
+
+class TestRegionDigests(unittest.TestCase):
+    def test_changes_touch_only_their_region(self):
+        self.assertEqual(changed_regions(PAGE, PAGE), [])
+        self.assertEqual(changed_regions(PAGE, PAGE.replace("/hero.jpg", "/hero.webp")), ["images"])
+        self.assertEqual(changed_regions(PAGE, PAGE.replace("Great shoes.", "Cheap shoes.")), ["text"])
+        self.assertEqual(changed_regions(PAGE, PAGE.replace("/app.js", "/app.v2.js")), ["scripts"])
+        self.assertEqual(changed_regions(PAGE, PAGE, {"Strict-Transport-Security": "max-age=1"}), ["headers"])
+        self.assertEqual(changed_regions(PAGE, PAGE.replace("<p>", "<p>  \n ")), [])
+
+    def test_module_fingerprint(self):
+        regions = region_digests(PAGE)
+        base = module_fingerprint(regions, ("head", "text"), salt="prompt")
+        self.assertEqual(base, module_fingerprint(region_digests(PAGE.replace("/hero.jpg", "/x.jpg")),
+                                                  ("head", "text"), salt="prompt"))
+        self.assertNotEqual(base, module_fingerprint(regions, ("head", "text"), salt="new prompt"))
+        self.assertIsNone(module_fingerprint(regions, ("head", "unknown")))
+
+
+def load_crew_module():
+    spec = importlib.util.spec_from_file_location("crew_under_test", Path(__file__).resolve().parents[1] / "crew.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class _FakeAgent:
+    def __init__(self, **kwargs):
+        self.role = kwargs.get("role")
+
+
+class _FakeTask:
+    def __init__(self, description, expected_output, agent, context=None, output_file=None, callback=None):
+        self.description = description
+        self.agent = agent
+        self.callback = callback
+
+
+class _FakeCrew:
+    runs = []
+
+    def __init__(self, agents, tasks, process, verbose):
+        self.tasks = tasks
+
+    def kickoff(self, inputs):
+        type(self).runs.append(self.tasks)
+        outputs = [f"output {i}" for i in range(len(self.tasks) - 1)] + ["report"]
+        return type("Result", (), {"tasks_output": outputs})()
+
+
+class TestIncrementalAudit(unittest.TestCase):
+    def setUp(self):
+        crew_module = load_crew_module()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        for name, fake in (("Agent", _FakeAgent), ("Task", _FakeTask), ("Crew", _FakeCrew)):
+            patcher = patch.object(crew_module, name, fake)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        with patch.object(crew_module.WebsiteAnalyzerCrew, "_validate_configuration"):
+            self.analyzer = crew_module.WebsiteAnalyzerCrew(ReportStore(str(Path(tmp.name) / "r.sqlite3")))
+        self.page = PAGE
+        patcher = patch.object(crew_module, "fetch_region_digests", lambda url: region_digests(self.page))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        _FakeCrew.runs = []
+
+    def test_only_modules_with_changed_inputs_rerun(self):
+        modules = ["seo", "performance", "content"]
+        first = self.analyzer.analyze_website(modules, "https://example.com")
+        self.assertEqual(first["reused_modules"], [])
+        self.assertEqual(len(_FakeCrew.runs[-1]), 4)
+
+        self.page = PAGE.replace("/app.js", "/app.v2.js")
+        second = self.analyzer.analyze_website(modules, "https://example.com")
+        self.assertEqual(second["reused_modules"], ["seo", "content"])
+        self.assertEqual(len(_FakeCrew.runs[-1]), 2)
+        reporting = _FakeCrew.runs[-1][-1].description
+        self.assertIn("### seo\noutput 0", reporting)
+        self.assertIn("### content\noutput 2", reporting)
+        self.assertEqual(second["results"], {"seo": "output 0", "performance": "output 0", "content": "output 2"})
+
+        forced = self.analyzer.analyze_website(modules, "https://example.com", incremental=False)
+        self.assertEqual(forced["reused_modules"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import threading
+import unittest
+from unittest.mock import patch
+
+from health import CachedProbe, run_checks
+from report_store import ReportStore
+from test_sse_contract import load_app_module
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCachedProbe(unittest.TestCase):
+    def test_runs_once_per_interval(self):
+        clock, calls = _Clock(), []
+        probe = CachedProbe(lambda: calls.append(1) or {"n": len(calls)}, interval_seconds=300, clock=clock)
+
+        first = probe.result()
+        self.assertEqual((first["ok"], first["cached"], first["result"]), (True, False, {"n": 1}))
+        clock.now += 299
+        cached = probe.result()
+        self.assertEqual((cached["cached"], cached["age_seconds"], cached["result"]), (True, 299.0, {"n": 1}))
+        clock.now += 2
+        self.assertEqual(probe.result()["result"], {"n": 2})
+        self.assertEqual(len(calls), 2)
+
+    def test_failures_retry_sooner(self):
+        clock, calls = _Clock(), []
+
+        def failing():
+            calls.append(1)
+            raise RuntimeError("provider down")
+
+        probe = CachedProbe(failing, interval_seconds=300, failure_interval_seconds=30, clock=clock)
+        self.assertEqual(probe.result()["error"], "provider down")
+        clock.now += 20
+        self.assertTrue(probe.result()["cached"])
+        clock.now += 20
+        self.assertFalse(probe.result()["cached"])
+        self.assertEqual(len(calls), 2)
+
+    def test_concurrent_callers_share_one_run(self):
+        release, calls = threading.Event(), []
+
+        def slow():
+            calls.append(1)
+            release.wait(2)
+            return {}
+
+        probe = CachedProbe(slow, interval_seconds=300)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(probe.result())) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(sorted(result["cached"] for result in results), [False, True, True, True, True])
+
+    def test_run_checks_reports_raising_check(self):
+        outcome = run_checks({"ok": lambda: (True, None), "broken": lambda: 1 / 0})
+        self.assertFalse(outcome["ready"])
+        self.assertEqual(outcome["checks"]["broken"], {"ok": False, "detail": "division by zero"})
+
+
+class TestHealthRoutes(unittest.TestCase):
+    def setUp(self):
+        self.app_module = load_app_module()
+        self.app_module._REPORT_STORE = ReportStore(":memory:")
+        self.client = self.app_module.app.test_client()
+
+    def test_liveness(self):
+        response = self.client.get("/api/health/live")
+        self.assertEqual((response.status_code, response.get_json()), (200, {"status": "ok"}))
+
+    def test_readiness(self):
+        with patch.dict("os.environ", {"ANTHROPIC_API_KEY": "test"}):
+            response = self.client.get("/api/health/ready")
+        payload = response.get_json()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(payload["checks"]["job_workers"]["detail"]["active_jobs"], 0)
+
+        with patch.dict("os.environ", {"ANTHROPIC_API_KEY": ""}):
+            response = self.client.get("/api/health/ready")
+        self.assertEqual(response.status_code, 503)
+        self.assertFalse(response.get_json()["checks"]["anthropic_key_present"]["ok"])
+
+    def test_self_test_serves_cached_outcome(self):
+        calls = []
+        original = self.app_module.CREW.run_sparky_pipeline
+        with patch.object(self.app_module.CREW, "run_sparky_pipeline",
+                          side_effect=lambda url: calls.append(url) or original(url)):
+            first = self.client.get("/api/test/self").get_json()
+            second = self.client.get("/api/test/self").get_json()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual((first["status"], first["greeting"], first["cached"]), ("ok", "Hi from test", False))
+        self.assertTrue(second["cached"])
+        self.assertEqual(second["latency_ms"], first["latency_ms"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import threading
+import time
+import unittest
+
+import jobs
+from jobs import EventLog, JobEvent, StreamStats, apply_backpressure
+
+
+class TestJobEvent(unittest.TestCase):
+    def test_reads_like_the_payload_dict(self):
+        event = JobEvent.create("status", state="in_progress", message="heartbeat", timestamp=1772366400.5)
+        self.assertEqual(
+            event.as_dict(),
+            {"type": "status", "state": "in_progress", "message": "heartbeat", "timestamp": "2026-03-01T12:00:00Z"},
+        )
+        self.assertEqual(list(event.as_dict())[:2], ["type", "state"])
+        self.assertEqual((event["type"], event.get("timestamp"), event.get("progress", 0)), ("status", "2026-03-01T12:00:00Z", 0))
+        with self.assertRaises(KeyError):
+            event["progress"]
+
+    def test_explicit_none_is_kept_and_strings_are_interned(self):
+        event = JobEvent.create("error", message=None, code="deadline_exceeded")
+        self.assertEqual(event.as_dict(), {"type": "error", "message": None, "code": "deadline_exceeded"})
+        state = "".join(["comp", "leted"])
+        self.assertIs(JobEvent.create("status", state=state).state, JobEvent.create("status", state="completed").state)
+
+    def test_job_is_slotted(self):
+        job = jobs.TestJob(id="t", url="https://example.com")
+        with self.assertRaises(AttributeError):
+            job.unknown = 1
+
+
+class TestEventLog(unittest.TestCase):
+    def test_cursor_readers_share_one_log(self):
+        log = EventLog()
+        seen = {reader: [] for reader in range(50)}
+
+        def tail(reader):
+            cursor = 0
+            while True:
+                end = log.wait(cursor, timeout=5)
+                seen[reader].extend(event["progress"] for event in log.read(cursor, end))
+                cursor = end
+                if log.closed and cursor == len(log):
+                    return
+
+        threads = [threading.Thread(target=tail, args=(reader,)) for reader in seen]
+        for thread in threads:
+            thread.start()
+        for progress in range(20):
+            log.append(JobEvent.create("progress", progress=progress), terminal=progress == 19)
+            time.sleep(0.001)
+        for thread in threads:
+            thread.join(timeout=5)
+        self.assertTrue(all(events == list(range(20)) for events in seen.values()))
+
+    def test_wait_times_out_and_closed_log_does_not_block(self):
+        log = EventLog()
+        started = time.monotonic()
+        self.assertEqual(log.wait(0, timeout=0.05), 0)
+        self.assertGreaterEqual(time.monotonic() - started, 0.04)
+        log.append(JobEvent.create("status", state="completed"), terminal=True)
+        self.assertEqual(log.wait(1, timeout=10), 1)
+        self.assertEqual([event.type for event in log], ["status"])
+
+
+def _backlog():
+    events = [JobEvent.create("progress", progress=p) for p in (10, 30)]
+    events += [JobEvent.create("status", state="in_progress", message="heartbeat", timestamp=t) for t in range(5)]
+    events += [JobEvent.create("summary", summary="done"), JobEvent.create("progress", progress=80)]
+    return list(enumerate(events))
+
+
+class TestBackpressure(unittest.TestCase):
+    def test_within_bound_everything_is_sent(self):
+        backlog = _backlog()
+        self.assertIs(apply_backpressure(backlog, "disconnect", max_lag=len(backlog), stats=StreamStats()), backlog)
+
+    def test_coalesce_keeps_latest_progress_and_heartbeat(self):
+        stats = StreamStats()
+        kept = apply_backpressure(_backlog(), "coalesce", max_lag=3, stats=stats)
+        self.assertEqual([index for index, _ in kept], [6, 7, 8])
+        self.assertEqual(stats.snapshot()["coalesced_events"], 6)
+
+    def test_drop_oldest_spares_critical_events(self):
+        stats = StreamStats()
+        kept = apply_backpressure(_backlog(), "drop_oldest", max_lag=4, stats=stats)
+        self.assertEqual([index for index, _ in kept], [5, 6, 7, 8])
+        self.assertEqual(stats.snapshot()["dropped_events"], 5)
+        kept = apply_backpressure(_backlog(), "drop_oldest", max_lag=0, stats=stats)
+        self.assertEqual([event.type for _, event in kept], ["summary"])
+
+    def test_disconnect_evicts_the_reader(self):
+        stats = StreamStats()
+        self.assertIsNone(apply_backpressure(_backlog(), "disconnect", max_lag=3, stats=stats))
+        self.assertEqual(stats.snapshot()["evicted_readers"], 1)
+        with self.assertRaises(ValueError):
+            apply_backpressure(_backlog(), "ignore", max_lag=3, stats=stats)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+import json_codec
+
+
+@dataclass
+class _Point:
+    x: int
+    y: int
+
+
+PAYLOADS = [
+    {"type": "status", "state": "in_progress", "message": "heartbeat"},
+    {"type": "summary", "summary": "Grüße — ça va? 👋", "categories": [{"id": "seo", "issues": [], "score": 0.5}]},
+    {"nested": {"list": [1, 2.25, None, True, "x\n\"y\""]}, 3: "int key"},
+    {"at": datetime(2026, 1, 1, 12, tzinfo=timezone.utc), "point": _Point(1, 2)},
+]
+
+
+class TestJSONCodec(unittest.TestCase):
+    def test_stdlib_fallback_matches_accelerated_output(self):
+        with patch.object(json_codec, "_ORJSON", False):
+            fallback = [json_codec.dumps_bytes(payload) for payload in PAYLOADS]
+        self.assertEqual(fallback[0], b'{"type":"status","state":"in_progress","message":"heartbeat"}')
+        if json_codec.orjson is not None:
+            with patch.object(json_codec, "_ORJSON", True):
+                self.assertEqual([json_codec.dumps_bytes(payload) for payload in PAYLOADS], fallback)
+
+    def test_round_trip_and_errors(self):
+        for accelerated in {False, json_codec.orjson is not None}:
+            with self.subTest(accelerated=accelerated), patch.object(json_codec, "_ORJSON", accelerated):
+                self.assertEqual(json_codec.loads(json_codec.dumps(PAYLOADS[1])), PAYLOADS[1])
+                self.assertEqual(json_codec.loads(json_codec.dumps_bytes(PAYLOADS[1])), PAYLOADS[1])
+                with self.assertRaises(ValueError):
+                    json_codec.loads('{"unterminated": ')
+
+    def test_values_orjson_handles_differently_encode_the_same(self):
+        value = {"b": float("nan"), "a": [2 ** 70, float("-inf"), 1.5]}
+        expected = '{"a":[1180591620717411303424,null,1.5],"b":null}'
+        for accelerated in {False, json_codec.orjson is not None}:
+            with self.subTest(accelerated=accelerated), patch.object(json_codec, "_ORJSON", accelerated):
+                self.assertEqual(json_codec.dumps(value, sort_keys=True), expected)
+                with self.assertRaises(ValueError):
+                    json_codec.loads("[NaN]")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+
+from json_extract import IncrementalJSONParser, extract_best_json, find_json_objects, iter_object_spans
+
+
+class TestJSONExtract(unittest.TestCase):
+    def test_prefers_longest_fenced_block(self):
+        text = (
+            "Here you go:\n```json\n{\"a\": 1}\n```\nand the full snapshot:\n"
+            "```json\n{\"module\": \"sparky\", \"categories\": [\"seo\"]}\n```"
+        )
+        self.assertEqual(extract_best_json(text), {"module": "sparky", "categories": ["seo"]})
+
+    def test_finds_unfenced_object_in_prose(self):
+        text = 'Sure! The result is {"platform": "wordpress", "categories": []} — let me know.'
+        self.assertEqual(extract_best_json(text), {"platform": "wordpress", "categories": []})
+
+    def test_ignores_braces_inside_strings(self):
+        text = 'prefix {"summary": "use {curly} and \\"quotes\\" }", "n": 2} suffix'
+        self.assertEqual(extract_best_json(text), {"summary": 'use {curly} and "quotes" }', "n": 2})
+
+    def test_falls_back_to_nested_object_when_outer_braces_are_prose(self):
+        text = '{ note: see {"id": "seo", "issues": []} }'
+        self.assertEqual(extract_best_json(text), {"id": "seo", "issues": []})
+
+    def test_top_level_objects_in_source_order_without_nested_duplicates(self):
+        text = 'first {"a": {"b": 1}} then {"c": 2}'
+        objects = [obj for _, obj in find_json_objects(text)]
+        self.assertEqual(objects, [{"a": {"b": 1}}, {"c": 2}])
+
+    def test_stray_quote_in_prose_does_not_swallow_later_objects(self):
+        text = '{ he said "hi\n {"ok": true}'
+        self.assertEqual(extract_best_json(text), {"ok": True})
+
+    def test_no_json_returns_empty_dict(self):
+        self.assertEqual(extract_best_json(""), {})
+        self.assertEqual(extract_best_json("plain text summary"), {})
+        self.assertEqual(extract_best_json('["seo"]'), {})
+
+    def test_unbalanced_input_scans_linearly(self):
+        spans = list(iter_object_spans("{" * 50_000))
+        self.assertEqual(spans, [])
+
+
+class TestIncrementalJSONParser(unittest.TestCase):
+    SNAPSHOT = (
+        "```json\n"
+        '{"module": "sparky", "platform": "wordpress", "categories": ['
+        '{"id": "seo", "issues": [{"title": "Missing [meta] \\"description\\""}]}, '
+        '"security", '
+        '{"id": "performance", "issues": []}'
+        '], "notes": {"a": [1, 2]}}\n```'
+    )
+
+    def _events_per_char(self, parser, text):
+        events = []
+        for char in text:
+            events.extend(parser.feed(char))
+        return events
+
+    def test_emits_members_and_array_items_in_order(self):
+        parser = IncrementalJSONParser(stream_arrays=("categories",))
+        events = self._events_per_char(parser, self.SNAPSHOT)
+
+        self.assertEqual(events, [
+            ("member", "module", "sparky"),
+            ("member", "platform", "wordpress"),
+            ("item", "categories", {"id": "seo", "issues": [{"title": 'Missing [meta] "description"'}]}),
+            ("item", "categories", "security"),
+            ("item", "categories", {"id": "performance", "issues": []}),
+            ("member", "notes", {"a": [1, 2]}),
+        ])
+        self.assertTrue(parser.done)
+
+    def test_item_is_reported_as_soon_as_it_closes(self):
+        parser = IncrementalJSONParser(stream_arrays=("categories",))
+        first = parser.feed('{"categories": [{"id": "seo"}, {"id": "perf')
+        self.assertEqual(first, [("item", "categories", {"id": "seo"})])
+        self.assertEqual(parser.feed('ormance"}]}'), [("item", "categories", {"id": "performance"})])
+
+    def test_non_streamed_arrays_are_reported_whole(self):
+        parser = IncrementalJSONParser()
+        self.assertEqual(parser.feed('{"categories": ["seo", "security"]}'), [
+            ("member", "categories", ["seo", "security"]),
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()
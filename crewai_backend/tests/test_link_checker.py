@@ -0,0 +1,128 @@
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from tools.links import LinkChecker, LinkStatusCache, get_link_checker
+from tools.seo import SEOAnalyzer
+
+
+class _LinkHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    hits = []
+
+    def _reply(self, status, headers=None):
+        type(self).hits.append((self.command, self.path))
+        if self.path == "/slow":
+            time.sleep(1.0)
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_HEAD(self):
+        if self.path == "/no-head":
+            self._reply(405)
+        else:
+            self._route()
+
+    def do_GET(self):
+        self._route()
+
+    def _route(self):
+        routes = {
+            "/ok": (200, None),
+            "/slow": (200, None),
+            "/no-head": (200, None),
+            "/gone": (404, None),
+            "/moved": (301, {"Location": "/moved-again"}),
+            "/moved-again": (302, {"Location": "/ok"}),
+            "/loop": (302, {"Location": "/loop"}),
+        }
+        status, headers = routes.get(self.path, (404, None))
+        self._reply(status, headers)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestLinkChecker(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _LinkHandler)
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        _LinkHandler.hits = []
+
+    def test_statuses_redirect_chains_and_get_fallback(self):
+        checker = LinkChecker(cache=None)
+        paths = ["/ok", "/gone", "/moved", "/no-head", "/loop"]
+        results = {r["url"].replace(self.base, ""): r for r in checker.check(self.base + p for p in paths)}
+
+        self.assertTrue(results["/ok"]["ok"])
+        self.assertEqual(results["/gone"]["status"], 404)
+        self.assertEqual(results["/moved"]["status"], 200)
+        self.assertEqual([hop["status"] for hop in results["/moved"]["redirects"]], [301, 302])
+        self.assertEqual(results["/moved"]["final_url"], self.base + "/ok")
+        self.assertEqual(results["/no-head"]["method"], "GET")
+        self.assertTrue(results["/no-head"]["ok"])
+        self.assertIn("redirects", results["/loop"]["error"])
+
+    def test_shared_cache_checks_each_link_once_per_window(self):
+        cache = LinkStatusCache(ttl_seconds=60)
+        LinkChecker(cache=cache).check([self.base + "/ok", self.base + "/gone"])
+        second = LinkChecker(cache=cache).check([self.base + "/ok", self.base + "/gone"])
+
+        self.assertTrue(all(r["cached"] for r in second))
+        self.assertEqual(len(_LinkHandler.hits), 2)
+
+        expired = LinkStatusCache(ttl_seconds=0)
+        expired.put("x", {"url": "x"})
+        self.assertIsNone(expired.get("x"))
+
+    def test_global_deadline_reports_unchecked_links(self):
+        checker = LinkChecker(per_host=1, timeout=2, deadline_seconds=0.3, cache=None)
+        started = time.monotonic()
+        results = checker.check([self.base + "/slow", self.base + "/ok"])
+
+        self.assertLess(time.monotonic() - started, 2.5)
+        self.assertTrue(any(r.get("unchecked") for r in results))
+
+    def test_host_cap_holds_across_concurrent_checks(self):
+        checker = LinkChecker(per_host=1, timeout=3, deadline_seconds=5, cache=None)
+        started = time.monotonic()
+        threads = [threading.Thread(target=checker.check, args=([self.base + "/slow"],)) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertGreaterEqual(time.monotonic() - started, 1.9)
+        self.assertEqual(checker._host_slots, {})
+        self.assertIs(get_link_checker(), get_link_checker())
+
+    def test_seo_analyzer_broken_link_mode(self):
+        html = f'<a href="/ok">ok</a><a href="/gone">gone</a><a href="{self.base}/moved">moved</a>'
+        analyzer = SEOAnalyzer.from_html(self.base + "/", html, check_broken_links=True,
+                                         link_checker=LinkChecker(cache=None))
+        links = analyzer.check_links()
+
+        self.assertEqual(links["checked_count"], 3)
+        self.assertEqual(links["broken_links"], [{"url": self.base + "/gone", "status": 404, "error": None}])
+        self.assertEqual(links["issue"], "1 broken links")
+        self.assertEqual(len(links["redirect_chains"]), 1)
+
+        plain = SEOAnalyzer.from_html(self.base + "/", html).check_links()
+        self.assertNotIn("broken_links", plain)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from llm_cache import LLMResponseCache, cache_bypass, crew_key, task_cache_enabled
+from test_fingerprint import load_crew_module
+from test_sse_contract import load_app_module
+
+
+class _Crew:
+    def __init__(self, description, role="Auditor"):
+        self.tasks = [SimpleNamespace(description=description, expected_output="Findings",
+                                      agent=SimpleNamespace(role=role, goal="Audit", backstory="Expert"))]
+        self.kickoffs = 0
+
+    def kickoff(self, inputs):
+        self.kickoffs += 1
+        return SimpleNamespace(tasks_output=[f"answer {self.kickoffs}"], __str__=None)
+
+
+class TestLLMResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = str(Path(self.tmp.name) / "cache.sqlite3")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip_and_ttl(self):
+        cache = LLMResponseCache(self.path, ttl_seconds=60)
+        cache.put("k", {"raw": "hello"})
+        self.assertEqual(cache.get("k"), {"raw": "hello"})
+        self.assertIsNone(cache.get("missing"))
+        with patch("llm_cache.time.time", return_value=time.time() + 61):
+            self.assertIsNone(cache.get("k"))
+        self.assertEqual(cache.stats(), {"entries": 0, "bytes": 0, "hits": 1, "misses": 2})
+        # Entries survive a restart.
+        cache.put("k", {"raw": "again"})
+        self.assertEqual(LLMResponseCache(self.path).get("k"), {"raw": "again"})
+
+    def test_size_bound_evicts_least_recently_read(self):
+        cache = LLMResponseCache(self.path, max_bytes=2500)
+        for index in range(3):
+            cache.put(f"k{index}", {"raw": os.urandom(600).hex()})
+            time.sleep(0.01)
+        cache.get("k0")
+        cache.put("k3", {"raw": os.urandom(600).hex()})
+        self.assertLessEqual(cache.stats()["bytes"], 2500)
+        self.assertIsNotNone(cache.get("k0"))
+        self.assertIsNone(cache.get("k1"))
+        self.assertIsNotNone(cache.get("k3"))
+
+    def test_key_covers_model_prompt_agent_and_inputs(self):
+        base = crew_key("m", _Crew("Audit {url}"), {"url": "https://a.test"})
+        self.assertEqual(base, crew_key("m", _Crew("Audit {url}"), {"url": "https://a.test"}))
+        self.assertNotEqual(base, crew_key("m2", _Crew("Audit {url}"), {"url": "https://a.test"}))
+        self.assertNotEqual(base, crew_key("m", _Crew("Audit {url} now"), {"url": "https://a.test"}))
+        self.assertNotEqual(base, crew_key("m", _Crew("Audit {url}", role="Other"), {"url": "https://a.test"}))
+        self.assertNotEqual(base, crew_key("m", _Crew("Audit {url}"), {"url": "https://b.test"}))
+
+    def test_task_opt_in_and_out(self):
+        config = {"a": {}, "b": {"cache": False}, "c": {"cache": True}}
+        with patch("llm_cache.LLM_CACHE_ENABLED", True):
+            self.assertTrue(task_cache_enabled(config, ["a", "c"]))
+            self.assertFalse(task_cache_enabled(config, ["a", "b"]))
+        with patch("llm_cache.LLM_CACHE_ENABLED", False):
+            self.assertFalse(task_cache_enabled(config, ["a"]))
+            self.assertTrue(task_cache_enabled(config, ["c"]))
+
+
+class TestCachedKickoff(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.crew_module = load_crew_module()
+        cache = LLMResponseCache(str(Path(self.tmp.name) / "cache.sqlite3"))
+        patcher = patch.object(self.crew_module, "get_llm_cache", return_value=cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_hit_skips_kickoff_and_bypass_refreshes(self):
+        kickoff = self.crew_module.kickoff_limited
+        crew = _Crew("Audit {url}")
+        inputs = {"url": "https://a.test"}
+
+        self.assertEqual(kickoff(crew, inputs, cache_model="m").tasks_output, ["answer 1"])
+        cached = kickoff(crew, inputs, cache_model="m")
+        self.assertTrue(cached.from_cache)
+        self.assertEqual(cached.tasks_output, ["answer 1"])
+        self.assertEqual(crew.kickoffs, 1)
+
+        with cache_bypass():
+            self.assertEqual(kickoff(crew, inputs, cache_model="m").tasks_output, ["answer 2"])
+        self.assertEqual(kickoff(crew, inputs, cache_model="m").tasks_output, ["answer 2"])
+        self.assertEqual(crew.kickoffs, 2)
+
+        # Without a cache model (task opted out) every call reaches the provider.
+        kickoff(crew, inputs)
+        self.assertEqual(crew.kickoffs, 3)
+
+    def test_bypass_flag_from_request(self):
+        app_module = load_app_module()
+        with app_module.app.test_request_context("/analyze", headers={"X-LLM-Cache": "bypass"}):
+            self.assertTrue(app_module.request_cache_bypass())
+        with app_module.app.test_request_context("/agent/stream?llm_cache=bypass"):
+            self.assertTrue(app_module.request_cache_bypass())
+        with app_module.app.test_request_context("/agent/stream", headers={"Cache-Control": "no-cache"}):
+            self.assertFalse(app_module.request_cache_bypass())
+
+
+if __name__ == "__main__":
+    unittest.main()
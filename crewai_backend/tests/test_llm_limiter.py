@@ -0,0 +1,150 @@
+import threading
+import time
+import unittest
+
+from llm_limiter import LLMLimiter, is_throttle_error, parse_weights, tenant_context
+from test_sse_contract import load_app_module
+
+
+class _Throttled(Exception):
+    status_code = 429
+
+    class response:
+        headers = {"retry-after": "0.2"}
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not reached")
+        time.sleep(0.005)
+
+
+class TestLLMLimiter(unittest.TestCase):
+    def test_fair_queuing_interleaves_tenants(self):
+        limiter = LLMLimiter(requests_per_minute=6000, tokens_per_minute=10 ** 7, max_concurrency=1,
+                             tenant_weights={"gold": 2})
+        admitted = []
+        lock = threading.Lock()
+        first = limiter.acquire(tokens=100, tenant="bulk")
+
+        def call(tenant):
+            ticket = limiter.acquire(tokens=100, tenant=tenant)
+            with lock:
+                admitted.append(tenant)
+            limiter.release(ticket)
+
+        threads = []
+        for tenant, count in (("bulk", 6), ("small", 2), ("gold", 4)):
+            for _ in range(count):
+                threads.append(threading.Thread(target=call, args=(tenant,)))
+                threads[-1].start()
+            wait_until(lambda: limiter.metrics()["queued"] == len(threads))
+        limiter.release(first)
+        for thread in threads:
+            thread.join()
+
+        # The burst from "bulk" does not starve later tenants; "gold" gets twice the share.
+        # Tags: bulk 200..700, small 200/300, gold (weight 2) 150/200/250/300.
+        self.assertEqual(admitted[:8].count("small"), 2)
+        self.assertEqual(admitted[:8].count("gold"), 4)
+        self.assertEqual(admitted[-4:], ["bulk"] * 4)
+        self.assertEqual(limiter.metrics()["tenants"]["small"]["admitted"], 2)
+
+    def test_token_budget_and_settlement(self):
+        limiter = LLMLimiter(requests_per_minute=6000, tokens_per_minute=600)
+        ticket = limiter.acquire(tokens=600)
+        ticket.used_tokens = 300
+        limiter.release(ticket)
+        self.assertLess(limiter.acquire(tokens=250).waited, 0.05)
+
+        started = time.monotonic()
+        limiter.acquire(tokens=55)
+        self.assertGreaterEqual(time.monotonic() - started, 0.2)
+
+    def test_throttling_retries_and_slows_down(self):
+        limiter = LLMLimiter(requests_per_minute=6000, tokens_per_minute=10 ** 6, max_throttle_retries=2)
+        attempts = []
+
+        def call():
+            attempts.append(time.monotonic())
+            if len(attempts) == 1:
+                raise _Throttled("rate limited")
+            return "ok"
+
+        with tenant_context("acme"):
+            self.assertEqual(limiter.run(call, tokens=10), "ok")
+        self.assertGreaterEqual(attempts[1] - attempts[0], 0.2)
+        metrics = limiter.metrics()
+        self.assertEqual(metrics["rate_factor"], 0.6)
+        self.assertEqual(metrics["tenants"]["acme"]["throttled"], 1)
+        self.assertEqual(metrics["tenants"]["acme"]["admitted"], 2)
+
+        with self.assertRaises(ValueError):
+            limiter.run(lambda: (_ for _ in ()).throw(ValueError("bad prompt")))
+        self.assertEqual(limiter.metrics()["in_flight"], 0)
+
+    def test_base_exception_frees_the_slot(self):
+        limiter = LLMLimiter(max_concurrency=1)
+
+        def exiting():
+            raise SystemExit(1)
+
+        with self.assertRaises(SystemExit):
+            limiter.run(exiting, tokens=1)
+        self.assertEqual(limiter.metrics()["in_flight"], 0)
+        self.assertEqual(limiter.run(lambda: "ok", tokens=1, timeout=0.5), "ok")
+
+    def test_timeout_leaves_queue_clean(self):
+        limiter = LLMLimiter(max_concurrency=1)
+        held = limiter.acquire(tokens=1)
+        with self.assertRaises(TimeoutError):
+            limiter.acquire(tokens=1, timeout=0.05)
+        self.assertEqual(limiter.metrics()["queued"], 0)
+        limiter.release(held)
+        limiter.release(limiter.acquire(tokens=1, timeout=0.5))
+
+    def test_idle_tenants_are_forgotten(self):
+        limiter = LLMLimiter(requests_per_minute=10 ** 6, tokens_per_minute=10 ** 9, max_tracked_tenants=3)
+        for i in range(10):
+            limiter.release(limiter.acquire(tokens=10, tenant=f"t{i}"))
+        # Every tag is at or below virtual time once its call is admitted.
+        self.assertEqual(limiter._last_tag, {})
+        self.assertEqual(list(limiter._stats), ["t7", "t8", "t9"])
+
+        metrics = limiter.metrics(top_tenants=2)
+        self.assertEqual(len(metrics["tenants"]), 2)
+        self.assertEqual(metrics["other_tenants"]["count"], 8)
+        self.assertEqual(metrics["other_tenants"]["admitted"], 8)
+
+    def test_helpers(self):
+        self.assertEqual(parse_weights("a=3, b=0.5,broken"), {"a": 3.0, "b": 0.5})
+        self.assertTrue(is_throttle_error(_Throttled()))
+        self.assertTrue(is_throttle_error(RuntimeError("Error code: 529 - overloaded_error")))
+        self.assertFalse(is_throttle_error(RuntimeError("invalid api key")))
+
+    def test_metrics_endpoint(self):
+        client = load_app_module().app.test_client()
+        payload = client.get("/api/metrics/llm").get_json()
+        self.assertIn("tenants", payload)
+        self.assertIn("queued", payload)
+
+    def test_tenant_comes_from_a_configured_key(self):
+        app_module = load_app_module()
+        app_module._TENANT_KEYS = app_module.parse_tenant_keys("acme=secret-1, beta=secret-2")
+        with app_module.app.test_request_context(headers={"X-API-Key": "secret-1", "X-Tenant-Id": "beta"}):
+            self.assertEqual(app_module.request_tenant(), "acme")
+        with app_module.app.test_request_context(headers={"Authorization": "Bearer secret-2"}):
+            self.assertEqual(app_module.request_tenant(), "beta")
+        tenants = set()
+        for key in ("made-up-1", "made-up-2"):
+            headers = {"X-API-Key": key, "X-Tenant-Id": key}
+            with app_module.app.test_request_context(headers=headers, environ_base={"REMOTE_ADDR": "10.0.0.1"}):
+                tenants.add(app_module.request_tenant())
+        self.assertEqual(len(tenants), 1)
+        self.assertTrue(tenants.pop().startswith("ip:"))
+
+
+if __name__ == "__main__":
+    unittest.main()
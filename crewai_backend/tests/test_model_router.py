@@ -0,0 +1,126 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from llm_cache import LLMResponseCache
+from model_router import ModelRouter, ModelRoutingError, RouteStats
+from test_fingerprint import load_crew_module
+
+CONFIG = {
+    "default_model": "big",
+    "models": {
+        "big": {"provider_model": "anthropic/claude-opus-4-6", "max_iter": 2},
+        "small": {"provider_model": "anthropic/claude-haiku-4-5", "max_iter": 1},
+        "mid": {"provider_model": "anthropic/claude-sonnet-4-5"},
+    },
+    "routing": {
+        "summary": {"models": ["small", "mid", "big"], "latency_budget_seconds": 5},
+        "snapshot": {"models": ["big"], "pinned": True},
+    },
+}
+
+
+class TestModelRouter(unittest.TestCase):
+    def test_routes_per_task_with_default(self):
+        router = ModelRouter(CONFIG, stats=RouteStats())
+        self.assertEqual([spec.name for spec in router.candidates("summary")], ["small", "mid", "big"])
+        self.assertEqual(router.select("unrouted").name, "big")
+        self.assertEqual(router.select("summary").get("max_iter"), 1)
+
+        overridden = ModelRouter(CONFIG, default_provider_model="openai/gpt-5-mini", stats=RouteStats())
+        self.assertEqual(overridden.select("unrouted").provider_model, "openai/gpt-5-mini")
+        self.assertEqual(overridden.select("summary").provider_model, "anthropic/claude-haiku-4-5")
+
+    def test_invalid_config(self):
+        with self.assertRaises(ModelRoutingError):
+            ModelRouter({**CONFIG, "routing": {"summary": {"models": ["missing"]}}})
+        with self.assertRaises(ModelRoutingError):
+            ModelRouter({**CONFIG, "default_model": "missing"})
+
+    def test_drift_check_covers_pinned_and_designated_tasks(self):
+        router = ModelRouter(CONFIG, stats=RouteStats())
+        router.check_drift("anthropic/claude-opus-4-6", ["unrouted"])
+        with self.assertRaisesRegex(ModelRoutingError, "task 'summary'"):
+            router.check_drift("anthropic/claude-opus-4-6", ["summary"])
+        drifted = ModelRouter(CONFIG, default_provider_model="anthropic/claude-opus-4-7", stats=RouteStats())
+        with self.assertRaisesRegex(ModelRoutingError, "task 'snapshot'"):
+            drifted.check_drift("anthropic/claude-opus-4-6")
+
+    def test_slow_models_are_tried_last(self):
+        router = ModelRouter(CONFIG, stats=RouteStats())
+        router.record("summary", router.specs["small"], 9.0)
+        self.assertEqual([spec.name for spec in router.candidates("summary")], ["mid", "big", "small"])
+        router.record("summary", router.specs["mid"], 2.0)
+        self.assertEqual(router.select("summary").name, "mid")
+        with patch("model_router.LATENCY_SAMPLE_TTL_SECONDS", -1):
+            self.assertEqual(router.select("summary").name, "small")
+
+    def test_run_falls_back_along_the_chain(self):
+        router = ModelRouter(CONFIG, stats=RouteStats())
+        tried = []
+
+        def call(spec):
+            tried.append(spec.name)
+            if spec.name == "small":
+                raise RuntimeError("overloaded")
+            return spec.provider_model
+
+        self.assertEqual(router.run("summary", call), "anthropic/claude-sonnet-4-5")
+        self.assertEqual(tried, ["small", "mid"])
+        self.assertEqual(router.stats.snapshot()["summary"]["anthropic/claude-haiku-4-5"]["failures"], 1)
+
+        def failing(spec):
+            raise RuntimeError(f"{spec.name} down")
+
+        with self.assertRaisesRegex(RuntimeError, "big down"):
+            router.run("summary", failing)
+
+
+class _Agent:
+    def __init__(self, **kwargs):
+        self.llm = kwargs["llm"]
+
+
+class _Task:
+    def __init__(self, description, expected_output, agent):
+        self.description = description
+        self.agent = agent
+
+
+class _Crew:
+    def __init__(self, agents, tasks, process, verbose):
+        self.tasks = tasks
+
+    def kickoff(self, inputs):
+        return type("Result", (), {"tasks_output": [f"by {self.tasks[0].agent.llm}"]})()
+
+
+class TestCrewServiceRouting(unittest.TestCase):
+    def setUp(self):
+        self.crew_module = load_crew_module()
+        for name, fake in (("Agent", _Agent), ("Task", _Task), ("Crew", _Crew)):
+            patcher = patch.object(self.crew_module, name, fake)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        cache = LLMResponseCache(str(Path(tmp.name) / "cache.sqlite3"))
+        patcher = patch.object(self.crew_module, "get_llm_cache", return_value=cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_tasks_use_their_routed_model(self):
+        service = self.crew_module.CrewService()
+        self.assertEqual(service.sparky_summary("{}"), "by anthropic/claude-haiku-4-5")
+        result = service.run_task("analyze_seo", "https://example.com")
+        self.assertEqual(result["model"], "anthropic/claude-opus-4-6")
+        self.assertEqual(result["result"], "by anthropic/claude-opus-4-6")
+
+    def test_pinned_snapshot_rejects_drifted_model(self):
+        with self.assertRaisesRegex(self.crew_module.CrewConfigurationError, "drift"):
+            self.crew_module.CrewService(model="anthropic/claude-opus-4-7")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import yaml
+
+from prompt_registry import PROMPTS_DIR, PromptError, PromptRegistry, parse_template
+
+CONFIG_DIR = Path(__file__).resolve().parent.parent / "config"
+
+
+class TestParseTemplate(unittest.TestCase):
+    def test_splits_prefix_and_suffix(self):
+        template = parse_template("t", '# version: 3\nReturn JSON like {"module": "seo"}.\n--- variables ---\nWebsite: {url}\n')
+        self.assertEqual(template.version, "3")
+        self.assertEqual(template.prefix, 'Return JSON like {"module": "seo"}.')
+        self.assertEqual(template.suffix, "Website: {url}")
+
+    def test_rejects_variables_in_prefix(self):
+        with self.assertRaisesRegex(PromptError, "static prefix"):
+            parse_template("t", "Audit {url} now.\n--- variables ---\nWebsite: {url}")
+
+
+class TestPromptRegistry(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        (Path(tmp.name) / "seo").mkdir()
+        (Path(tmp.name) / "seo" / "audit.txt").write_text("# version: 2\nAudit SEO.\n--- variables ---\nWebsite: {url}\n")
+        (Path(tmp.name) / "empty.txt").write_text("")
+        self.registry = PromptRegistry(tmp.name)
+
+    def test_render_keeps_prefix_identical(self):
+        first = self.registry.render("seo/audit", url="https://a.example")
+        second = self.registry.render("seo/audit", url="https://b.example")
+        self.assertEqual(first.prefix, second.prefix)
+        self.assertEqual(first.prefix_hash, second.prefix_hash)
+        self.assertEqual(second.text, "Audit SEO.\n\nWebsite: https://b.example")
+        self.assertNotIn("empty", self.registry)
+
+        stats = self.registry.stats()["seo/audit"]
+        self.assertEqual((stats["version"], stats["renders"], stats["prefix_reuse_ratio"]), ("2", 2, 0.5))
+
+    def test_errors_and_provider_usage(self):
+        with self.assertRaisesRegex(PromptError, "Unknown prompt"):
+            self.registry.render("missing")
+        with self.assertRaisesRegex(PromptError, "needs variable 'url'"):
+            self.registry.render("seo/audit")
+        self.registry.record_provider_cache("seo/audit", 900, 1000)
+        self.assertEqual(self.registry.stats()["seo/audit"]["provider_cache"], {"cached_tokens": 900, "input_tokens": 1000})
+
+    def test_task_prompts_exist(self):
+        registry = PromptRegistry(PROMPTS_DIR)
+        tasks = yaml.safe_load((CONFIG_DIR / "tasks.yaml").read_text(encoding="utf-8"))
+        referenced = {cfg["prompt"] for cfg in tasks.values() if isinstance(cfg, dict) and cfg.get("prompt")}
+        self.assertTrue(referenced)
+        self.assertEqual([name for name in sorted(referenced) if name not in registry], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
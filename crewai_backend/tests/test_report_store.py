@@ -0,0 +1,93 @@
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+from report_store import ReportStore, report_domain
+from test_sse_contract import load_app_module
+
+
+class TestReportStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.store = ReportStore(str(Path(self.tmp.name) / "reports.sqlite3"))
+
+    def test_save_list_and_fetch(self):
+        first = self.store.save(
+            "https://www.Example.com/shop", "anthropic/claude-opus-4-6", "# Report v1\nok\n",
+            {"seo": "missing title", "security": "fine"}, usage={"total_tokens": 10}, created_at=1000,
+        )
+        second = self.store.save("https://example.com/", "other/model", "# Report v2\n", {"seo": "fixed"},
+                                 created_at=2000)
+        self.store.save("https://another.org", "other/model", "x", {"content": "y"}, created_at=3000)
+
+        self.assertEqual(report_domain("https://WWW.Example.com:8443/x"), "example.com")
+        self.assertEqual([run["id"] for run in self.store.list_runs(domain="example.com")], [second, first])
+        self.assertEqual([run["id"] for run in self.store.list_runs(domain="https://www.example.com",
+                                                                    model="other/model")], [second])
+        self.assertEqual([run["id"] for run in self.store.list_runs(module="security")], [first])
+        self.assertEqual(len(self.store.list_runs(since=1500, until=3000)), 1)
+        self.assertEqual(self.store.list_runs(limit=1)[0]["url"], "https://another.org")
+
+        run = self.store.get_run(first)
+        self.assertEqual(run["modules"], ["seo", "security"])
+        self.assertEqual(run["results"], {"seo": "missing title", "security": "fine"})
+        self.assertEqual(run["usage"], {"total_tokens": 10})
+        self.assertEqual(self.store.get_run(first, modules=["security"])["results"], {"security": "fine"})
+        self.assertEqual(self.store.latest("example.com")["id"], second)
+        self.assertIsNone(self.store.get_run(999))
+
+    def test_bodies_are_compressed(self):
+        report = "Prioritized repairs: add alt text.\n" * 500
+        run_id = self.store.save("https://example.com", "m", report, {"seo": report})
+        with sqlite3.connect(self.store.path) as conn:
+            stored = conn.execute("SELECT length(report) FROM runs WHERE id = ?", (run_id,)).fetchone()[0]
+        self.assertLess(stored, len(report) / 10)
+        self.assertEqual(self.store.get_run(run_id)["report"], report)
+
+    def test_diff_runs(self):
+        old = self.store.save("https://example.com", "m", "a\nb\n", {"seo": "title missing\n", "content": "ok\n"})
+        new = self.store.save("https://example.com", "m", "a\nc\n", {"seo": "title ok\n", "security": "hsts\n"})
+        diff = self.store.diff_runs(old, new)
+        self.assertEqual(diff["added_modules"], ["security"])
+        self.assertEqual(diff["removed_modules"], ["content"])
+        self.assertIn("-b\n+c\n", diff["report"])
+        self.assertIn("-title missing\n+title ok\n", diff["modules"]["seo"])
+        self.assertIn("+hsts", diff["modules"]["security"])
+        self.assertIsNone(self.store.diff_runs(old, 999))
+
+    def test_import_legacy_markdown(self):
+        directory = Path(self.tmp.name) / "legacy"
+        directory.mkdir()
+        (directory / "report_example.com__2026-02-27-15-31.md").write_text("old report", encoding="utf-8")
+        (directory / "report_example.com_blog.md").write_text("older report", encoding="utf-8")
+        (directory / "notes.md").write_text("ignored", encoding="utf-8")
+
+        self.assertEqual(len(self.store.import_markdown_reports(str(directory))), 2)
+        urls = {run["url"] for run in self.store.list_runs(domain="example.com")}
+        self.assertEqual(urls, {"https://example.com", "https://example.com/blog"})
+
+
+class TestReportEndpoints(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.app_module = load_app_module()
+        self.app_module._REPORT_STORE = store = ReportStore(str(Path(tmp.name) / "reports.sqlite3"))
+        self.old = store.save("https://example.com", "m", "v1\n", {"seo": "a\n"}, created_at=1000)
+        self.new = store.save("https://example.com", "m", "v2\n", {"seo": "b\n"}, created_at=2000)
+        self.client = self.app_module.app.test_client()
+
+    def test_list_fetch_and_diff(self):
+        runs = self.client.get("/api/reports?domain=example.com&since=1500").get_json()["runs"]
+        self.assertEqual([run["id"] for run in runs], [self.new])
+        self.assertEqual(self.client.get(f"/api/reports/{self.old}").get_json()["results"], {"seo": "a\n"})
+        diff = self.client.get(f"/api/reports/{self.old}/diff/{self.new}").get_json()
+        self.assertIn("+v2", diff["report"])
+        self.assertEqual(self.client.get("/api/reports/999").status_code, 404)
+        self.assertEqual(self.client.get("/api/reports?limit=x").status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
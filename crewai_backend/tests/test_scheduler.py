@@ -0,0 +1,157 @@
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from scheduler import AuditScheduler
+from test_sse_contract import load_app_module
+
+DAY = 24 * 3600
+
+
+class TestAuditScheduler(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.db_path = str(Path(tmp.name) / "schedule.sqlite3")
+
+    def make(self, runner=lambda site: None, **options):
+        scheduler = AuditScheduler(runner, db_path=self.db_path, **options)
+        self.addCleanup(scheduler.stop)
+        return scheduler
+
+    def test_jitter_spreads_sites_and_persists(self):
+        now = 1_000_000.0
+        scheduler = self.make(clock=lambda: now, jitter=0.5)
+        for i in range(200):
+            scheduler.add_site(f"https://site{i}.example", DAY, start_at=now)
+        dues = [site["next_run"] - now for site in scheduler.list_sites(limit=500)]
+        self.assertTrue(all(0 <= due < DAY / 2 for due in dues))
+        self.assertGreater(len({int(due // 3600) for due in dues}), 10)
+
+        reloaded = self.make(clock=lambda: now, jitter=0.5)
+        self.assertEqual(reloaded.stats()["sites"], 200)
+        self.assertEqual(sorted(site["next_run"] for site in reloaded.list_sites(limit=500)), sorted(d + now for d in dues))
+
+    def test_catch_up_policies_after_downtime(self):
+        start = 1_000_000.0
+        scheduler = self.make(clock=lambda: start, jitter=0)
+        for policy in ("skip", "once", "all"):
+            scheduler.add_site(f"https://{policy}.example", DAY, catch_up=policy, start_at=start)
+
+        later = start + 10.5 * DAY
+        reloaded = self.make(clock=lambda: later, jitter=0, max_catch_up_runs=3)
+        due = {site["catch_up"]: site["next_run"] for site in reloaded.list_sites()}
+        self.assertEqual(due["skip"], start + 11 * DAY)
+        self.assertEqual(due["once"], start)
+        # 11 slots were missed; only the last three are replayed.
+        self.assertEqual(due["all"], start + 8 * DAY)
+
+        site = reloaded._sites[next(i for i, s in reloaded._sites.items() if s.catch_up == "once")]
+        self.assertEqual(reloaded._next_slot(site, later), later + DAY)
+
+    def test_runs_repeatedly_within_concurrency_caps(self):
+        lock = threading.Lock()
+        running = {"all": 0, "full": 0}
+        peaks = {"all": 0, "full": 0}
+        runs = []
+
+        def runner(site):
+            with lock:
+                running["all"] += 1
+                running[site.kind] = running.get(site.kind, 0) + 1
+                peaks["all"] = max(peaks["all"], running["all"])
+                peaks["full"] = max(peaks["full"], running.get("full", 0))
+                runs.append(site.url)
+            time.sleep(0.05)
+            with lock:
+                running["all"] -= 1
+                running[site.kind] -= 1
+            if site.url.endswith("broken.example"):
+                raise RuntimeError("boom")
+
+        scheduler = self.make(runner, max_concurrency=2, kind_limits={"full": 1}, jitter=0, min_interval_seconds=0)
+        for i in range(3):
+            scheduler.add_site(f"https://s{i}.example", 0.2)
+        scheduler.add_site("https://f1.example", 0.2, kind="full")
+        scheduler.add_site("https://broken.example", 0.2, kind="full")
+        scheduler.start()
+        time.sleep(0.9)
+        scheduler.stop()
+
+        for url in [f"https://s{i}.example" for i in range(3)] + ["https://f1.example", "https://broken.example"]:
+            self.assertGreaterEqual(runs.count(url), 2, url)
+        self.assertLessEqual(peaks["all"], 2)
+        self.assertEqual(peaks["full"], 1)
+        broken = next(s for s in self.make().list_sites() if s["url"] == "https://broken.example")
+        self.assertEqual((broken["last_status"], broken["last_error"]), ("error", "boom"))
+
+    def test_validation_and_removal(self):
+        scheduler = self.make()
+        with self.assertRaises(ValueError):
+            scheduler.add_site("ftp://example.com", DAY)
+        with self.assertRaises(ValueError):
+            scheduler.add_site("https://example.com", 5)
+        with self.assertRaises(ValueError):
+            scheduler.add_site("https://example.com", DAY, kind="weekly")
+        site = scheduler.add_site("https://example.com", DAY)
+        self.assertTrue(scheduler.remove_site(site["id"]))
+        self.assertFalse(scheduler.remove_site(site["id"]))
+        self.assertEqual(self.make().stats()["sites"], 0)
+
+    def test_one_dispatcher_per_database(self):
+        runs = {"a": [], "b": []}
+        first = self.make(runs["a"].append, jitter=0, min_interval_seconds=0, sync_seconds=0.05)
+        second = self.make(runs["b"].append, jitter=0, min_interval_seconds=0, sync_seconds=0.05)
+        first.start()
+        second.start()
+        # Added through the standby process; the leader picks it up on its next sync.
+        second.add_site("https://example.com", 0.1)
+        time.sleep(0.5)
+        self.assertEqual((first.stats()["leader"], second.stats()["leader"]), (True, False))
+        self.assertGreaterEqual(len(runs["a"]), 2)
+        self.assertEqual(runs["b"], [])
+
+        first.stop()
+        time.sleep(0.4)
+        self.assertTrue(second.stats()["leader"])
+        self.assertGreaterEqual(len(runs["b"]), 1)
+
+
+class TestScheduleEndpoints(unittest.TestCase):
+    def test_create_list_delete(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        app_module = load_app_module()
+        app_module._SCHEDULER = AuditScheduler(app_module.run_scheduled_audit, db_path=str(Path(tmp.name) / "s.db"))
+        client = app_module.app.test_client()
+
+        created = client.post("/api/schedules", json={"url": "https://example.com", "kind": "full",
+                                                      "modules": ["seo"], "interval_seconds": 3600})
+        self.assertEqual(created.status_code, 201)
+        schedule_id = created.get_json()["id"]
+        listing = client.get("/api/schedules").get_json()
+        self.assertEqual(listing["sites"], 1)
+        self.assertEqual(listing["schedules"][0]["modules"], ["seo"])
+        self.assertEqual(client.post("/api/schedules", json={"url": "nope"}).status_code, 400)
+        self.assertEqual(client.delete(f"/api/schedules/{schedule_id}").status_code, 200)
+        self.assertEqual(client.delete(f"/api/schedules/{schedule_id}").status_code, 404)
+
+    def test_startup_hook_starts_the_scheduler(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        app_module = load_app_module()
+        scheduler = AuditScheduler(app_module.run_scheduled_audit, db_path=str(Path(tmp.name) / "s.db"))
+        self.addCleanup(scheduler.stop)
+        with patch.object(app_module, "AuditScheduler", return_value=scheduler):
+            app_module.start_background_services()
+            self.assertIsNone(scheduler._dispatcher)
+            with patch.object(app_module, "SCHEDULER_ENABLED", True):
+                app_module.start_background_services()
+        self.assertIsNotNone(scheduler._dispatcher)
+
+
+if __name__ == "__main__":
+    unittest.main()
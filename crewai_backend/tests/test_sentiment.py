@@ -0,0 +1,48 @@
+import unittest
+
+from tools.sentiment import SentimentEngine
+
+
+class TestSentimentEngine(unittest.TestCase):
+    def setUp(self):
+        self.engine = SentimentEngine()
+
+    def test_weighted_whole_word_matching(self):
+        self.assertEqual(self.engine.score("An excellent, reliable shop."), 3.5)
+        self.assertEqual(self.engine.score("Is this a SCAM? Fraud warning!"), -7.5)
+        self.assertEqual(self.engine.score("Goodness, scampi for badminton"), 0.0)
+        self.assertEqual(self.engine.score(""), 0.0)
+
+    def test_phrases_replace_their_words(self):
+        self.assertEqual(self.engine.score("Not recommended."), -2.0)
+        self.assertEqual(self.engine.score("Sehr gut, aber nicht zufrieden"), 0.0)
+        self.assertEqual(self.engine.score("recommended, not recommended, recommended"), 1.0)
+
+    def test_languages_and_custom_terms(self):
+        english = SentimentEngine(languages=["en"])
+        self.assertEqual(english.score("Betrug"), 0.0)
+        self.assertEqual(self.engine.score("Betrug"), -3.0)
+
+        english.add_terms({"dark pattern": -2, "Top-Notch": 2})
+        self.assertEqual(english.score("top notch support, one dark pattern"), 0.0)
+        self.assertEqual(SentimentEngine(terms={"meh": -0.5}).score("meh. good"), -0.5)
+
+    def test_batch_matches_single_scoring(self):
+        texts = [
+            "great service",
+            "scam\nstay away",
+            None,
+            "neutral text",
+            "abzocke - unseriös",
+            "good\u00a0bad bad",
+        ]
+        batch = self.engine.score_batch(texts)
+        self.assertEqual(batch.scores, [self.engine.score(text) for text in texts])
+        self.assertEqual(batch.labels, ["positive", "negative", "neutral", "neutral", "negative", "negative"])
+        self.assertEqual(batch.counts, {"positive": 1, "negative": 3, "neutral": 2})
+        self.assertEqual(batch.label, "negative")
+        self.assertEqual(self.engine.score_batch([]).label, "neutral")
+
+
+if __name__ == "__main__":
+    unittest.main()
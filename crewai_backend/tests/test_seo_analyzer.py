@@ -0,0 +1,76 @@
+import unittest
+
+from bs4 import BeautifulSoup
+from bs4.builder import builder_registry
+
+from tools.seo import DEFAULT_PARSER, SEOAnalyzer, resolve_parser
+
+PAGE = """<!doctype html>
+<html><head>
+<title> Example Domain Home </title>
+<meta name="Description" content="wrong case is ignored">
+<meta name="description" content="A concise description of the example page that is long enough.">
+<link rel="alternate canonical" href="https://example.com/">
+<script type="application/ld+json">{"@type": "Organization"}</script>
+</head><body>
+<header><nav><a href="/about">About</a><a href="#top">Top</a><a href="javascript:void(0)">JS</a></nav></header>
+<main>
+<h1>Welcome</h1><h2>First</h2><h2>Second</h2><h2>Third</h2><h3><span>Deep</span> heading</h3>
+<section><div itemscope itemtype="https://schema.org/Thing">x</div>
+<a href="https://other.example.org/page">Out</a><a>no href</a><a href="">empty</a>
+<img src="/a.png"><img src="/b.png" alt="B"><img src="/c.png" alt="">
+</section>
+</main>
+<footer>bye</footer>
+</body></html>"""
+
+
+def analyze(parser=None):
+    analyzer = SEOAnalyzer("https://example.com/", parser=parser)
+    analyzer.page_content = PAGE
+    analyzer.soup = BeautifulSoup(PAGE, analyzer.parser)
+    return analyzer.run_all_checks()
+
+
+class TestSEOAnalyzerChecks(unittest.TestCase):
+    def test_single_pass_matches_expected_result(self):
+        result = analyze()
+
+        self.assertEqual(result["title"]["text"], "Example Domain Home")
+        self.assertEqual(result["meta_description"]["text"],
+                         "A concise description of the example page that is long enough.")
+        self.assertEqual(result["headings"]["counts"], {"h1": 1, "h2": 3, "h3": 1, "h4": 0, "h5": 0, "h6": 0})
+        self.assertEqual(result["headings"]["examples"]["h2"], ["First", "Second"])
+        self.assertEqual(result["headings"]["examples"]["h3"], ["Deepheading"])
+        self.assertEqual(result["headings"]["issues"], [])
+        self.assertEqual(result["links"]["internal_count"], 2)
+        self.assertEqual(result["links"]["external_count"], 1)
+        self.assertEqual(result["images"]["missing_alt_examples"], ["/a.png", "/c.png"])
+        self.assertEqual(result["semantic_html"]["missing"], ["article", "aside"])
+        self.assertEqual(result["schema_org"], {"ld_json": True, "microdata": True, "issue": None})
+        self.assertEqual(result["canonical"]["href"], "https://example.com/")
+
+    def test_results_are_stable_across_repeated_checks(self):
+        analyzer = SEOAnalyzer("https://example.com/")
+        analyzer.page_content = PAGE
+        analyzer.soup = BeautifulSoup(PAGE, analyzer.parser)
+        first = analyzer.run_all_checks()
+        self.assertEqual(first, analyzer.run_all_checks())
+
+    @unittest.skipUnless(builder_registry.lookup("lxml"), "lxml not installed")
+    def test_fast_backend_produces_identical_result(self):
+        self.assertEqual(resolve_parser("fast"), "lxml")
+        result, expected = analyze("fast"), analyze()
+        # Link samples come from sets, so only their membership is comparable.
+        for payload in (result, expected):
+            for key in ("internal_links", "external_links"):
+                payload["links"][key] = sorted(payload["links"][key])
+        self.assertEqual(result, expected)
+
+    def test_unknown_parser_falls_back_to_default(self):
+        self.assertEqual(resolve_parser(None), DEFAULT_PARSER)
+        self.assertEqual(resolve_parser("no-such-parser"), DEFAULT_PARSER)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from tools.cache import TTLCache
+from tools.ratelimit import TokenBucket
+from tools.serp import SERPAnalyzer, run_serp_batch
+
+
+class _SerpHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    hits = []
+    lock = threading.Lock()
+
+    def do_GET(self):
+        params = parse_qs(urlparse(self.path).query)
+        query = params["q"][0]
+        with type(self).lock:
+            type(self).hits.append((query, params["hl"][0]))
+            attempts = sum(1 for hit in type(self).hits if hit[0] == query)
+        if query == "throttled" or (query == "flaky brand" and attempts == 1):
+            body = b""
+            self.send_response(429)
+            self.send_header("Retry-After", "86400" if query == "throttled" else "0")
+        elif query == "down":
+            body = b""
+            self.send_response(503)
+        else:
+            word = "excellent" if "good" in query else "scam"
+            body = (
+                f'<div class="g"><h3>{query} result</h3><div class="VwiC3b">A {word} company</div></div>'
+                f'<div class="g"><h3>{query} second</h3><div class="VwiC3b">more</div></div>'
+            ).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestSERPAnalyzer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _SerpHandler)
+        port = cls.server.server_address[1]
+        cls.search_url = f"http://127.0.0.1:{port}/search?q={{query}}&hl={{locale}}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        _SerpHandler.hits = []
+        self.cache = TTLCache(ttl_seconds=60)
+        self.options = {
+            "search_url": self.search_url,
+            "cache": self.cache,
+            "rate_limiter": TokenBucket(rate=1000),
+            "max_retries": 2,
+        }
+
+    def test_results_parsed_and_cached_per_query_and_locale(self):
+        first = SERPAnalyzer("good & co", **self.options).run_analysis()
+        self.assertEqual(first["results"][0]["title"], "good & co result")
+        self.assertEqual(first["sentiment"], "positive")
+        self.assertFalse(first["cached"])
+
+        again = SERPAnalyzer("good & co", **self.options).run_analysis()
+        self.assertTrue(again["cached"])
+        self.assertEqual(again["results"], first["results"])
+        self.assertEqual(_SerpHandler.hits, [("good & co", "en")])
+
+        SERPAnalyzer("good & co", locale="de", **self.options).run_analysis()
+        self.assertEqual(_SerpHandler.hits[-1], ("good & co", "de"))
+
+    def test_throttled_query_is_retried(self):
+        result = SERPAnalyzer("flaky brand", **self.options).run_analysis()
+        self.assertEqual(len(result["results"]), 2)
+        self.assertEqual([hit[0] for hit in _SerpHandler.hits], ["flaky brand", "flaky brand"])
+
+    def test_long_retry_after_is_capped_by_the_batch_deadline(self):
+        started = time.monotonic()
+        [result] = run_serp_batch(["throttled"], deadline_seconds=0.5, **self.options)
+        self.assertIn("deadline exceeded", result["error"])
+        self.assertLess(time.monotonic() - started, 2)
+
+    def test_batch_keeps_order_dedupes_and_reports_errors(self):
+        queries = ["good one", "bad one", "down", "good one"]
+        results = run_serp_batch(queries, max_concurrency=4, **self.options)
+        self.assertEqual([r["query"] for r in results], queries)
+        self.assertEqual(results[0]["sentiment"], "positive")
+        self.assertEqual(results[1]["sentiment"], "negative")
+        self.assertIn("503", results[2]["error"])
+        self.assertIs(results[0], results[3])
+        self.assertEqual(sum(1 for hit in _SerpHandler.hits if hit[0] == "good one"), 1)
+        self.assertNotIn(("down", "en", 10), [key for key in self.cache._entries])
+
+    def test_batch_is_held_to_the_shared_rate(self):
+        self.options["rate_limiter"] = TokenBucket(rate=20, capacity=1)
+        started = time.monotonic()
+        run_serp_batch([f"brand {i}" for i in range(8)], max_concurrency=8, **self.options)
+        # One token up front, then 7 more at 20/s.
+        self.assertGreaterEqual(time.monotonic() - started, 0.3)
+        self.assertEqual(len(_SerpHandler.hits), 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
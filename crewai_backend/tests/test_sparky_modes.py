@@ -0,0 +1,98 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from llm_cache import LLMResponseCache
+from test_fingerprint import load_crew_module
+from test_deadline import _InlineThread
+from test_sse_contract import load_app_module
+
+COMBINED = {
+    "module": "sparky",
+    "platform": "wordpress",
+    "categories": [{"id": "security", "issues": ["xmlrpc.php is reachable"]}],
+    "greeting": "Hi there!",
+    "summary": "Your site is in decent shape; lock down xmlrpc.php.",
+    "short_summary": "Lock down xmlrpc.php.",
+}
+
+
+class _Agent:
+    def __init__(self, **kwargs):
+        self.llm = kwargs["llm"]
+
+
+class _Task:
+    def __init__(self, description, expected_output, agent):
+        self.description = description
+        self.agent = agent
+
+
+class _Crew:
+    kickoffs = []
+
+    def __init__(self, agents, tasks, process, verbose):
+        self.tasks = tasks
+
+    def kickoff(self, inputs):
+        description = self.tasks[0].description
+        _Crew.kickoffs.append(description)
+        if "Input snapshot:" in description:
+            output = "Plain text summary."
+        elif "short_summary" in description:
+            output = json.dumps(COMBINED)
+        else:
+            output = json.dumps({"platform": "generic", "categories": [{"id": "seo", "issues": []}]})
+        return type("Result", (), {"tasks_output": [output]})()
+
+
+class TestSparkyModes(unittest.TestCase):
+    def setUp(self):
+        self.crew_module = load_crew_module()
+        for name, fake in (("Agent", _Agent), ("Task", _Task), ("Crew", _Crew)):
+            patcher = patch.object(self.crew_module, name, fake)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        cache = LLMResponseCache(str(Path(tmp.name) / "cache.sqlite3"))
+        patcher = patch.object(self.crew_module, "get_llm_cache", return_value=cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        _Crew.kickoffs = []
+        self.service = self.crew_module.CrewService()
+
+    def test_single_call_returns_snapshot_and_summary(self):
+        result = self.service.run_sparky_pipeline("https://example.com", mode="single_call")
+        self.assertEqual(len(_Crew.kickoffs), 1)
+        self.assertEqual((result["platform"], result["greeting"]), ("wordpress", "Hi there!"))
+        self.assertEqual(result["short_summary"], "Lock down xmlrpc.php.")
+        self.assertEqual(result["categories"][0]["id"], "security")
+
+    def test_two_call_is_the_default(self):
+        result = self.service.run_sparky_pipeline("https://example.com")
+        self.assertEqual(len(_Crew.kickoffs), 2)
+        self.assertEqual(result["summary"], "Plain text summary.")
+        with self.assertRaisesRegex(ValueError, "Unsupported Sparky mode"):
+            self.service.run_sparky_pipeline("https://example.com", mode="three_call")
+
+
+class TestSparkyModeRequest(unittest.TestCase):
+    def test_mode_is_validated_and_passed_to_the_pipeline(self):
+        app_module = load_app_module()
+        client = app_module.app.test_client()
+        response = client.post("/api/test/start", json={"url": "https://example.com", "sparky_mode": "fast"})
+        self.assertEqual(response.status_code, 400)
+
+        with patch.object(app_module, "_simulate_progress"), patch.object(
+            app_module.CREW, "run_sparky_pipeline", wraps=app_module.CREW.run_sparky_pipeline
+        ) as pipeline, patch.object(app_module.threading, "Thread", _InlineThread):
+            response = client.post("/api/test/start?sparky_mode=single_call", json={"url": "https://example.com"})
+        self.assertEqual(response.status_code, 200)
+        pipeline.assert_called_once_with("https://example.com", mode="single_call")
+
+
+if __name__ == "__main__":
+    unittest.main()
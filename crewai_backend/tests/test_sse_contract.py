@@ -3,8 +3,11 @@ import sys
 import types
 import unittest
 from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
 from unittest.mock import patch
 
+import jobs
+
 
 class _ImmediateThread:
     def __init__(self, target=None, args=(), kwargs=None, daemon=None):
@@ -21,7 +24,7 @@ class _FakeCrewService:
     def __init__(self, model=None):
         self.model = model
 
-    def run_sparky_pipeline(self, url: str):
+    def run_sparky_pipeline(self, url: str, mode=None):
         return {
             "greeting": "Hi from test",
             "short_summary": "Analysis complete",
@@ -30,12 +33,52 @@ class _FakeCrewService:
         }
 
 
+class _StreamingCrew:
+    """Streams a snapshot in chunks and records how far the provider stream has progressed."""
+
+    CHUNKS = [
+        '```json\n{"module": "sparky", "platform": "generic", "categories": [',
+        '{"id": "seo", "issues": [], "severity": "high"},',
+        ' {"id": "security", "issues": []}',
+        ']}\n```',
+    ]
+
+    COMBINED_CHUNKS = [
+        '{"platform": "generic", "categories": [{"id": "seo", "issues": []}],',
+        ' "greeting": "Hello", "summary": "One call"}',
+    ]
+
+    def __init__(self):
+        self.chunks_sent = 0
+        self.summaries = 0
+
+    def stream_site_snapshot(self, url: str, task_key: str = "site_snapshot_task"):
+        for chunk in self.COMBINED_CHUNKS if task_key == "sparky_combined" else self.CHUNKS:
+            self.chunks_sent += 1
+            yield chunk
+
+    def sparky_summary(self, snapshot_raw: str):
+        self.summaries += 1
+        return '{"summary": "All good", "greeting": "Hi"}'
+
+    def _extract_best_json(self, text: str):
+        from json_extract import extract_best_json
+
+        return extract_best_json(text)
+
+    def _normalize_categories(self, cats):
+        return [{"id": cat["id"], "issues": cat.get("issues", []), "severity": cat.get("severity", "medium")}
+                for cat in cats if isinstance(cat, dict)]
+
+
 def load_app_module():
     module_name = "testable_crewai_app"
     app_path = Path(__file__).resolve().parents[1] / "app.py"
 
     fake_crew_module = types.ModuleType("crew")
     fake_crew_module.CrewService = _FakeCrewService
+    fake_crew_module.SPARKY_MODES = ("two_call", "single_call")
+    fake_crew_module.SPARKY_MODE = "two_call"
     sys.modules["crew"] = fake_crew_module
 
     spec = importlib.util.spec_from_file_location(module_name, app_path)
@@ -88,16 +131,16 @@ class TestSSEContract(unittest.TestCase):
         response = self.client.get(f"/api/test/events/{test_id}", buffered=True)
         body = response.get_data(as_text=True)
 
-        status_in_progress_idx = body.find('event: status\ndata: {"type": "status", "state": "in_progress"')
-        progress_idx = body.find('event: progress\ndata: {"type": "progress"')
-        summary_idx = body.find('event: summary\ndata: {"type": "summary"')
-        status_completed_idx = body.rfind('event: status\ndata: {"type": "status", "state": "completed"')
+        status_in_progress_idx = body.find('event: status\ndata: {"type":"status","state":"in_progress"')
+        progress_idx = body.find('event: progress\ndata: {"type":"progress"')
+        summary_idx = body.find('event: summary\ndata: {"type":"summary"')
+        status_completed_idx = body.rfind('event: status\ndata: {"type":"status","state":"completed"')
 
         self.assertGreaterEqual(status_in_progress_idx, 0)
         self.assertGreaterEqual(progress_idx, 0)
         self.assertGreater(summary_idx, progress_idx)
         self.assertGreater(status_completed_idx, summary_idx)
-        self.assertIn('"message": "Analysis complete"', body)
+        self.assertIn('"message":"Analysis complete"', body)
 
     def test_late_subscriber_gets_history_then_stream_closes(self):
         test_id = self._start_job()
@@ -105,7 +148,7 @@ class TestSSEContract(unittest.TestCase):
         response = self.client.get(f"/api/test/events/{test_id}", buffered=True)
         body = response.get_data(as_text=True)
 
-        self.assertIn('"state": "completed"', body)
+        self.assertIn('"state":"completed"', body)
         self.assertNotIn(': keepalive', body)
 
         with self.app_module.JOBS_LOCK:
@@ -149,9 +192,73 @@ class TestSSEContract(unittest.TestCase):
         response = self.client.get(f"/api/test/events/{test_id}", buffered=True)
         body = response.get_data(as_text=True)
 
-        for expected in ['"progress": 10', '"progress": 30']:
+        for expected in ['"progress":10', '"progress":30']:
             self.assertIn(expected, body)
 
+    def test_stream_resumes_from_last_event_id(self):
+        test_id = self._start_job()
+
+        body = self.client.get(f"/api/test/events/{test_id}", buffered=True).get_data(as_text=True)
+        self.assertTrue(body.startswith("id: 1\nevent: status\n"))
+
+        resumed = self.client.get(
+            f"/api/test/events/{test_id}", headers={"Last-Event-ID": "4"}, buffered=True
+        ).get_data(as_text=True)
+        self.assertTrue(resumed.startswith("id: 5\nevent: status\n"))
+        self.assertNotIn("event: summary", resumed)
+
+    def test_lagging_reader_is_disconnected_with_its_cursor(self):
+        self.app_module.save_job(self.app_module.TestJob(id="lagging", url="https://example.com"))
+        self.app_module.emit_event("lagging", "status", state="in_progress", message="started")
+        stats = jobs.StreamStats()
+
+        def disconnect_policy(backlog):
+            return jobs.apply_backpressure(backlog, "disconnect", max_lag=3, stats=stats)
+
+        with patch.object(self.app_module, "apply_backpressure", disconnect_policy), \
+                self.app_module.app.test_request_context("/api/test/events/lagging"):
+            frames = iter(self.app_module.stream_events("lagging").response)
+            self.assertTrue(next(frames).startswith(b"id: 1\nevent: status"))
+            for _ in range(5):
+                self.app_module.emit_event("lagging", "status", state="in_progress", message="heartbeat")
+            reconnect = next(frames)
+            self.assertEqual(list(frames), [])
+        self.assertTrue(reconnect.startswith(b"id: 1\nevent: reconnect\n"))
+        self.assertIn(b'"cursor":1', reconnect)
+        self.assertEqual(stats.snapshot()["evicted_readers"], 1)
+
+    def test_direct_stream_emits_categories_before_snapshot_finishes(self):
+        crew = _StreamingCrew()
+        with patch.object(self.app_module, "CREW", crew):
+            frames = []
+            for frame in self.app_module.stream_sparky_analysis("https://example.com"):
+                frames.append((frame, crew.chunks_sent))
+
+        category_frames = [(frame, sent) for frame, sent in frames if frame.startswith(b"event: category")]
+        self.assertEqual(len(category_frames), 2)
+        self.assertIn(b'"category":"seo"', category_frames[0][0])
+        self.assertLess(category_frames[0][1], len(_StreamingCrew.CHUNKS))
+        self.assertTrue(frames[1][0].startswith(b'event: platform\ndata: {"platform":"generic"}'))
+        self.assertTrue(frames[-1][0].startswith(b"event: summary"))
+        self.assertEqual(crew.summaries, 1)
+
+    def test_direct_stream_single_call_mode(self):
+        crew = _StreamingCrew()
+        with patch.object(self.app_module, "CREW", crew):
+            frames = list(self.app_module.stream_sparky_analysis("https://example.com", "single_call"))
+            bad_mode = self.client.get("/agent/stream?url=https://example.com&sparky_mode=three_call")
+            target = "https://example.com/?a=1&sparky_mode=two_call#top"
+            start = self.client.post("/agent/start", json={"url": target, "sparky_mode": "single_call"})
+
+        self.assertEqual(crew.summaries, 0)
+        self.assertEqual(sum(frame.startswith(b"event: category") for frame in frames), 1)
+        self.assertIn(b'"summary":"One call"', frames[-1])
+        self.assertIn(b'"greeting":"Hello"', frames[-1])
+        self.assertEqual(bad_mode.status_code, 400)
+        stream = urlsplit(start.get_json()["stream"])
+        self.assertEqual(stream.path, "/agent/stream")
+        self.assertEqual(parse_qs(stream.query), {"url": [target], "sparky_mode": ["single_call"]})
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,151 @@
+"""
+bulk_seo.py
+BulkSEOAnalyzer: concurrent on-page SEO checks for large URL lists.
+"""
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ThreadPoolExecutor, wait
+from typing import Any, Deque, Dict, Iterable, Iterator, Optional
+from urllib.parse import urlparse
+
+from .fetch import fetch
+from .seo import SEOAnalyzer
+
+_END = object()
+
+
+def analyze_html(url: str, html: str, parser: Optional[str] = None, truncated: bool = False) -> Dict[str, Any]:
+    """Module-level so it can also run in a ProcessPoolExecutor."""
+    return SEOAnalyzer.from_html(url, html, parser=parser, truncated=truncated).run_all_checks()
+
+
+class BulkSEOAnalyzer:
+    """
+    Runs ``SEOAnalyzer.run_all_checks`` over an iterable of URLs.
+
+    Fetches run on a thread pool capped at ``max_concurrency`` overall and ``per_host``
+    per hostname; a URL whose host is saturated waits in a per-host queue instead of
+    occupying a fetch slot. Parsing is handed to a separate executor (threads by
+    default, or any ``Executor`` such as a ``ProcessPoolExecutor``) so slow pages never
+    hold up network I/O. URLs are pulled lazily, at most ``max_buffered`` are held
+    waiting at once, and results are yielded in completion order.
+
+    No new fetch starts while ``max_pending_parses`` pages (default: twice the parse
+    workers) are queued or being parsed, so when parsing is the bottleneck fetched
+    bodies do not pile up in the parse executor's queue.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 32,
+        per_host: int = 4,
+        timeout: float = 10,
+        parser: Optional[str] = None,
+        parse_executor: Optional[Executor] = None,
+        max_buffered: Optional[int] = None,
+        max_pending_parses: Optional[int] = None,
+    ):
+        if max_concurrency < 1 or per_host < 1:
+            raise ValueError("max_concurrency and per_host must be positive")
+        self.max_concurrency = max_concurrency
+        self.per_host = min(per_host, max_concurrency)
+        self.timeout = timeout
+        self.parser = parser
+        self.parse_executor = parse_executor
+        self.max_buffered = max_buffered or max_concurrency * 8
+        self.max_pending_parses = max_pending_parses
+
+    @staticmethod
+    def _parse_workers(executor: Executor) -> int:
+        # Both ThreadPoolExecutor and ProcessPoolExecutor record their size here.
+        return getattr(executor, "_max_workers", None) or os.cpu_count() or 1
+
+    def _fetch(self, url: str):
+        started = time.perf_counter()
+        page = fetch(url, timeout=self.timeout)
+        page.raise_for_status()
+        return page.text, page.truncated, started
+
+    def analyze(self, urls: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        source = iter(urls)
+        exhausted = False
+        waiting: Dict[str, Deque[str]] = {}
+        waiting_count = 0
+        active: Dict[str, int] = {}
+        fetches: Dict[Future, tuple] = {}
+        parses: Dict[Future, tuple] = {}
+
+        fetch_pool = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="bulk-seo-fetch")
+        parse_pool = self.parse_executor or ThreadPoolExecutor(thread_name_prefix="bulk-seo-parse")
+        max_pending_parses = self.max_pending_parses or 2 * self._parse_workers(parse_pool)
+
+        def submit(url: str, host: str) -> None:
+            active[host] = active.get(host, 0) + 1
+            fetches[fetch_pool.submit(self._fetch, url)] = (url, host)
+
+        try:
+            while True:
+                # Fill free fetch slots: hosts that have queued URLs and spare capacity first.
+                parse_capacity = len(parses) < max_pending_parses
+                for host in [h for h, queued in waiting.items() if parse_capacity and active.get(h, 0) < self.per_host]:
+                    queued = waiting[host]
+                    while queued and active.get(host, 0) < self.per_host and len(fetches) < self.max_concurrency:
+                        submit(queued.popleft(), host)
+                        waiting_count -= 1
+                    if not queued:
+                        del waiting[host]
+
+                while (
+                    parse_capacity and not exhausted
+                    and len(fetches) < self.max_concurrency and waiting_count < self.max_buffered
+                ):
+                    url = next(source, _END)
+                    if url is _END:
+                        exhausted = True
+                        break
+                    parsed = urlparse(url) if isinstance(url, str) else None
+                    if parsed is None or parsed.scheme not in {"http", "https"} or not parsed.netloc:
+                        yield {"url": url, "ok": False, "error": "url must be a valid http/https URL"}
+                        continue
+                    host = parsed.netloc.lower()
+                    if active.get(host, 0) < self.per_host:
+                        submit(url, host)
+                    else:
+                        waiting.setdefault(host, deque()).append(url)
+                        waiting_count += 1
+
+                if not fetches and not parses:
+                    if exhausted and not waiting:
+                        return
+                    continue
+
+                done, _ = wait(list(fetches) + list(parses), return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future in fetches:
+                        url, host = fetches.pop(future)
+                        active[host] -= 1
+                        if not active[host]:
+                            del active[host]
+                        try:
+                            html, truncated, started = future.result()
+                        except Exception as exc:  # noqa: BLE001
+                            yield {"url": url, "ok": False, "error": str(exc)}
+                            continue
+                        parses[parse_pool.submit(analyze_html, url, html, self.parser, truncated)] = (url, started)
+                    else:
+                        url, started = parses.pop(future)
+                        elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+                        try:
+                            result = future.result()
+                        except Exception as exc:  # noqa: BLE001
+                            yield {"url": url, "ok": False, "error": str(exc), "elapsed_ms": elapsed_ms}
+                            continue
+                        yield {"url": url, "ok": True, "result": result, "elapsed_ms": elapsed_ms}
+        finally:
+            # Consumers may stop early (e.g. a disconnected NDJSON client): drop queued work.
+            for future in list(fetches) + list(parses):
+                future.cancel()
+            fetch_pool.shutdown(wait=False, cancel_futures=True)
+            if self.parse_executor is None:
+                parse_pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,240 @@
+"""
+crawler.py
+SiteCrawler: concurrent BFS over a site's internal links, streaming per-page SEO checks.
+"""
+import hashlib
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Deque, Dict, Iterator, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlencode, urljoin, urlparse, urlunparse
+from urllib.robotparser import RobotFileParser
+
+from .fetch import fetch
+from .seo import SEOAnalyzer
+
+CRAWLER_USER_AGENT = "GetSafe360Bot/1.0 (+https://getsafe360.ai)"
+DEFAULT_PORTS = {"http": 80, "https": 443}
+TRACKING_PARAM_PREFIXES = ("utm_",)
+TRACKING_PARAMS = {"gclid", "fbclid", "mc_cid", "mc_eid"}
+
+
+def normalize_url(url: str) -> Optional[str]:
+    """
+    Canonical form used for crawl dedupe, or ``None`` for non-http(s) URLs.
+
+    Lowercases scheme and host, drops default ports, fragments and tracking
+    parameters, sorts the query string and gives empty paths a trailing slash.
+    """
+    parsed = urlparse(url.strip())
+    scheme = parsed.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parsed.hostname:
+        return None
+    host = parsed.hostname.lower()
+    try:
+        port = parsed.port
+    except ValueError:
+        return None
+    netloc = host if port in (None, DEFAULT_PORTS[scheme]) else f"{host}:{port}"
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+        if key not in TRACKING_PARAMS and not key.startswith(TRACKING_PARAM_PREFIXES)
+    )
+    return urlunparse((scheme, netloc, parsed.path or "/", "", urlencode(query), ""))
+
+
+def parse_crawl_delay(lines: List[str], user_agent: str) -> float:
+    """
+    Crawl-delay in seconds for ``user_agent``.
+
+    ``RobotFileParser`` only accepts integer delays, but fractional values such as
+    ``Crawl-delay: 0.5`` are common, so the groups are scanned here directly.
+    """
+    product = user_agent.split("/")[0].lower()
+    delays: Dict[str, float] = {}
+    agents: List[str] = []
+    in_agent_lines = False
+    for raw_line in lines:
+        line = raw_line.split("#", 1)[0].strip()
+        if ":" not in line:
+            continue
+        field, value = (part.strip() for part in line.split(":", 1))
+        field = field.lower()
+        if field == "user-agent":
+            if not in_agent_lines:
+                agents = []
+            agents.append(value.lower())
+            in_agent_lines = True
+            continue
+        in_agent_lines = False
+        if field == "crawl-delay":
+            try:
+                delay = float(value)
+            except ValueError:
+                continue
+            for agent in agents:
+                delays.setdefault(agent, delay)
+    for agent, delay in delays.items():
+        if agent != "*" and agent in product:
+            return delay
+    return delays.get("*", 0.0)
+
+
+class VisitedSet:
+    """Set of 64-bit URL digests: constant size per entry regardless of URL length."""
+
+    def __init__(self) -> None:
+        self._digests: Set[int] = set()
+
+    @staticmethod
+    def _digest(url: str) -> int:
+        return int.from_bytes(hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest(), "big")
+
+    def add(self, url: str) -> bool:
+        """Record ``url``; return False if it was already present."""
+        digest = self._digest(url)
+        if digest in self._digests:
+            return False
+        self._digests.add(digest)
+        return True
+
+    def __contains__(self, url: str) -> bool:
+        return self._digest(url) in self._digests
+
+    def __len__(self) -> int:
+        return len(self._digests)
+
+
+class _HostGate:
+    """Spaces request starts by the robots.txt crawl-delay."""
+
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    def wait(self) -> None:
+        if self.delay <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.delay
+        if start > now:
+            time.sleep(start - now)
+
+
+class SiteCrawler:
+    """
+    Crawls one site breadth-first from ``seed_url`` and yields ``run_all_checks`` per page.
+
+    Internal links come from ``SEOAnalyzer.discover_links``. A URL is marked visited when
+    it is enqueued, and nothing is enqueued once ``max_pages`` URLs have been admitted.
+    The frontier therefore never holds more than ``max_pages`` entries. Page results are
+    streamed rather than kept, so memory stays bounded on very large sites. robots.txt
+    rules and crawl-delay apply to every request.
+    """
+
+    def __init__(
+        self,
+        seed_url: str,
+        max_pages: int = 500,
+        max_depth: int = 5,
+        concurrency: int = 8,
+        timeout: float = 10,
+        parser: Optional[str] = None,
+        user_agent: str = CRAWLER_USER_AGENT,
+        respect_robots: bool = True,
+    ):
+        seed = normalize_url(seed_url)
+        if seed is None:
+            raise ValueError(f"Invalid URL: {seed_url}")
+        self.seed_url = seed
+        self.domain = urlparse(seed).netloc
+        self.max_pages = max_pages
+        self.max_depth = max_depth
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.parser = parser
+        self.user_agent = user_agent
+        self.respect_robots = respect_robots
+        self.robots: Optional[RobotFileParser] = None
+        self.visited = VisitedSet()
+
+    def _load_robots(self) -> Tuple[Optional[RobotFileParser], float]:
+        if not self.respect_robots:
+            return None, 0.0
+        robots = RobotFileParser(urljoin(self.seed_url, "/robots.txt"))
+        try:
+            page = fetch(robots.url, headers={"User-Agent": self.user_agent}, timeout=self.timeout)
+        except Exception:  # noqa: BLE001
+            return None, 0.0
+        if page.status_code >= 400:
+            # Same convention as RobotFileParser.read(): 401/403 disallow everything, other errors allow all.
+            if page.status_code in (401, 403):
+                robots.disallow_all = True
+                return robots, 0.0
+            return None, 0.0
+        lines = page.text.splitlines()
+        robots.parse(lines)
+        return robots, parse_crawl_delay(lines, self.user_agent)
+
+    def _allowed(self, url: str) -> bool:
+        return self.robots is None or self.robots.can_fetch(self.user_agent, url)
+
+    def _visit(self, url: str, gate: _HostGate) -> Tuple[Dict[str, Any], List[str]]:
+        gate.wait()
+        # Uncached: every page of a large crawl would otherwise be written to the shared disk cache.
+        page = fetch(url, headers={"User-Agent": self.user_agent}, timeout=self.timeout, cache=None)
+        page.raise_for_status()
+        content_type = page.headers.get("Content-Type", "text/html")
+        if "html" not in content_type:
+            return {"skipped": f"non-HTML content ({content_type})"}, []
+        analyzer = SEOAnalyzer.from_html(url, page.text, parser=self.parser, truncated=page.truncated)
+        internal, _ = analyzer.discover_links()
+        return analyzer.run_all_checks(), list(internal)
+
+    def crawl(self) -> Iterator[Dict[str, Any]]:
+        self.robots, delay = self._load_robots()
+        gate = _HostGate(delay)
+        frontier: Deque[Tuple[str, int]] = deque()
+        in_flight: Dict[Future, Tuple[str, int]] = {}
+
+        def admit(url: str, depth: int) -> None:
+            if len(self.visited) >= self.max_pages or not self.visited.add(url):
+                return
+            frontier.append((url, depth))
+
+        admit(self.seed_url, 0)
+        pool = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="site-crawler")
+        try:
+            while frontier or in_flight:
+                while frontier and len(in_flight) < self.concurrency:
+                    url, depth = frontier.popleft()
+                    if not self._allowed(url):
+                        yield {"url": url, "depth": depth, "ok": False, "error": "disallowed by robots.txt"}
+                        continue
+                    in_flight[pool.submit(self._visit, url, gate)] = (url, depth)
+                if not in_flight:
+                    continue
+
+                done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+                for future in done:
+                    url, depth = in_flight.pop(future)
+                    try:
+                        result, links = future.result()
+                    except Exception as exc:  # noqa: BLE001
+                        yield {"url": url, "depth": depth, "ok": False, "error": str(exc)}
+                        continue
+                    if depth < self.max_depth:
+                        for link in links:
+                            normalized = normalize_url(link)
+                            if normalized and urlparse(normalized).netloc == self.domain:
+                                admit(normalized, depth + 1)
+                    yield {"url": url, "depth": depth, "ok": True, "result": result}
+        finally:
+            for future in in_flight:
+                future.cancel()
+            pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,409 @@
+"""
+fetch.py
+Shared HTTP fetch layer: pooled keep-alive session plus an on-disk conditional-GET cache.
+"""
+import codecs
+import hashlib
+import heapq
+import itertools
+import json
+import os
+import re
+import socket
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import DEFAULT_ACCEPT_ENCODING
+
+DEFAULT_TIMEOUT = 10
+POOL_CONNECTIONS = int(os.environ.get("HTTP_POOL_HOSTS", "64"))
+POOL_MAXSIZE = int(os.environ.get("HTTP_POOL_PER_HOST", "8"))
+CACHE_DIR = os.environ.get("HTTP_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "getsafe360-http-cache")
+CACHE_MAX_BODY_BYTES = int(os.environ.get("HTTP_CACHE_MAX_BODY_BYTES", str(5 * 1024 * 1024)))
+CACHE_MAX_BYTES = int(os.environ.get("HTTP_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+CACHE_MAX_ENTRIES = int(os.environ.get("HTTP_CACHE_MAX_ENTRIES", "20000"))
+# Eviction trims down to this share of the limits so it does not run on every write.
+CACHE_EVICT_TO_FRACTION = 0.9
+KEPT_HEADERS = (
+    "Content-Type", "ETag", "Last-Modified", "Retry-After",
+    # Read by audits (and their input fingerprints) without keeping every response header.
+    "Cache-Control", "Content-Encoding", "Server", "X-Powered-By", "Strict-Transport-Security",
+    "Content-Security-Policy", "X-Frame-Options", "X-Content-Type-Options", "Referrer-Policy",
+    "Permissions-Policy",
+)
+# Caps apply to decoded (decompressed) bytes, so a gzip bomb is cut off like any large body.
+MAX_BODY_BYTES = int(os.environ.get("HTTP_MAX_BODY_BYTES", str(5 * 1024 * 1024)))
+MAX_FETCH_SECONDS = float(os.environ.get("HTTP_MAX_FETCH_SECONDS", "30"))
+READ_CHUNK_BYTES = 64 * 1024
+SNIFF_BYTES = 1024
+DEFAULT_ENCODING = "utf-8"
+
+_HEADER_CHARSET = re.compile(r"charset\s*=\s*[\"']?([\w.:+-]+)", re.I)
+_META_CHARSET = re.compile(rb"<meta[^>]{0,512}?charset\s*=\s*[\"']?\s*([\w.:+-]+)", re.I)
+_BOMS = ((codecs.BOM_UTF8, "utf-8"), (codecs.BOM_UTF16_LE, "utf-16"), (codecs.BOM_UTF16_BE, "utf-16"))
+
+_SESSION: Optional[requests.Session] = None
+_SESSION_LOCK = threading.Lock()
+
+
+@dataclass
+class FetchedPage:
+    """Response data shared by live and revalidated-from-cache fetches; header lookups ignore case."""
+    url: str
+    status_code: int
+    content: bytes
+    encoding: Optional[str]
+    headers: CaseInsensitiveDict = field(default_factory=CaseInsensitiveDict)
+    from_cache: bool = False
+    truncated: bool = False
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}")
+
+
+class ConditionalCache:
+    """
+    Stores validated bodies on disk keyed by URL, with their ETag/Last-Modified.
+
+    Only responses carrying a validator are kept; everything else would need a full
+    download to revalidate anyway. Writes go through a temp file and ``os.replace`` so
+    concurrent workers never read a half-written entry.
+
+    The directory is bounded by ``max_bytes`` and ``max_entries``: once either is
+    exceeded, least recently used entries (a hit touches the body's mtime) are deleted.
+    Usage is counted per process and recounted from the directory on every eviction,
+    so processes sharing a directory correct each other's estimates.
+    """
+
+    def __init__(
+        self,
+        directory: str = CACHE_DIR,
+        max_body_bytes: int = CACHE_MAX_BODY_BYTES,
+        max_bytes: int = CACHE_MAX_BYTES,
+        max_entries: int = CACHE_MAX_ENTRIES,
+    ):
+        self.directory = Path(directory)
+        self.max_body_bytes = max_body_bytes
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._usage: Optional[Tuple[int, int]] = None  # (entries, bytes), counted on first write
+
+    def _paths(self, url: str):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.directory / f"{key}.json", self.directory / f"{key}.body"
+
+    def load(self, url: str) -> Optional[FetchedPage]:
+        meta_path, body_path = self._paths(url)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            content = body_path.read_bytes()
+        except (OSError, ValueError):
+            return None
+        if meta.get("url") != url:
+            return None
+        try:
+            os.utime(body_path)
+        except OSError:
+            pass
+        return FetchedPage(
+            url=url,
+            status_code=meta.get("status_code", 200),
+            content=content,
+            encoding=meta.get("encoding"),
+            headers=CaseInsensitiveDict(meta.get("headers", {})),
+            from_cache=True,
+        )
+
+    def store(self, page: FetchedPage) -> None:
+        if page.status_code != 200 or page.truncated or len(page.content) > self.max_body_bytes:
+            return
+        if not (page.headers.get("ETag") or page.headers.get("Last-Modified")):
+            return
+        meta_path, body_path = self._paths(page.url)
+        meta = json.dumps({
+            "url": page.url,
+            "status_code": page.status_code,
+            "encoding": page.encoding,
+            "headers": dict(page.headers),
+        }).encode("utf-8")
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            previous = _entry_size(body_path, meta_path)
+            _atomic_write(body_path, page.content)
+            _atomic_write(meta_path, meta)
+        except OSError:
+            return
+        with self._lock:
+            if self._usage is None:
+                self._usage = self._scan()
+            else:
+                entries, size = self._usage
+                self._usage = (entries + (previous is None), size + len(page.content) + len(meta) - (previous or 0))
+            if self._usage[0] > self.max_entries or self._usage[1] > self.max_bytes:
+                self._evict()
+
+    def _entries(self) -> List[Tuple[float, int, Path]]:
+        """``(last used, bytes, body path)`` of every entry in the directory."""
+        entries = []
+        for body_path in self.directory.glob("*.body"):
+            meta_path = body_path.with_suffix(".json")
+            try:
+                stat = body_path.stat()
+                size = stat.st_size + meta_path.stat().st_size
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, size, body_path))
+        return entries
+
+    def _scan(self) -> Tuple[int, int]:
+        entries = self._entries()
+        return len(entries), sum(size for _, size, _ in entries)
+
+    def _evict(self) -> None:
+        entries = sorted(self._entries())
+        count, total = len(entries), sum(size for _, size, _ in entries)
+        target_entries = int(self.max_entries * CACHE_EVICT_TO_FRACTION)
+        target_bytes = int(self.max_bytes * CACHE_EVICT_TO_FRACTION)
+        for _, size, body_path in entries:
+            if count <= target_entries and total <= target_bytes:
+                break
+            for path in (body_path.with_suffix(".json"), body_path):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+            count, total = count - 1, total - size
+        self._usage = (count, total)
+
+    @staticmethod
+    def validators(cached: FetchedPage) -> Dict[str, str]:
+        headers = {}
+        if cached.headers.get("ETag"):
+            headers["If-None-Match"] = cached.headers["ETag"]
+        if cached.headers.get("Last-Modified"):
+            headers["If-Modified-Since"] = cached.headers["Last-Modified"]
+        return headers
+
+
+def _entry_size(body_path: Path, meta_path: Path) -> Optional[int]:
+    try:
+        return body_path.stat().st_size + meta_path.stat().st_size
+    except OSError:
+        return None
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def sniff_encoding(content_type: Optional[str], head: bytes) -> str:
+    """
+    Pick a charset without scanning the whole body.
+
+    Order: Content-Type charset, byte-order mark, ``<meta charset>`` within the first
+    ``SNIFF_BYTES`` bytes, then UTF-8. Unknown codec names fall through to the next step.
+    """
+    candidates = []
+    match = _HEADER_CHARSET.search(content_type or "")
+    if match:
+        candidates.append(match.group(1))
+    candidates.extend(name for bom, name in _BOMS if head.startswith(bom))
+    match = _META_CHARSET.search(head[:SNIFF_BYTES])
+    if match:
+        candidates.append(match.group(1).decode("ascii", errors="ignore"))
+    for candidate in candidates:
+        try:
+            return codecs.lookup(candidate).name
+        except LookupError:
+            continue
+    return DEFAULT_ENCODING
+
+
+class _Watchdog:
+    """Runs callbacks at monotonic deadlines on one daemon thread, instead of a Timer thread per fetch."""
+
+    def __init__(self) -> None:
+        self._cond = threading.Condition()
+        self._heap: List[List[Any]] = []
+        self._order = itertools.count()
+        self._thread: Optional[threading.Thread] = None
+
+    def schedule(self, when: float, callback: Callable[[], None]) -> List[Any]:
+        entry = [when, next(self._order), callback]
+        with self._cond:
+            heapq.heappush(self._heap, entry)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="fetch-watchdog", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return entry
+
+    @staticmethod
+    def cancel(entry: List[Any]) -> None:
+        entry[2] = None
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._heap or self._heap[0][0] > time.monotonic():
+                    self._cond.wait(self._heap[0][0] - time.monotonic() if self._heap else None)
+                callback = heapq.heappop(self._heap)[2]
+            if callback is not None:
+                try:
+                    callback()
+                except Exception:  # noqa: BLE001
+                    pass
+
+
+_WATCHDOG = _Watchdog()
+
+
+def _response_socket(response: requests.Response) -> Optional[socket.socket]:
+    # urllib3 keeps the connection on the raw response while the body is being read.
+    return getattr(getattr(response.raw, "_connection", None), "sock", None)
+
+
+def _read_capped(response: requests.Response, max_bytes: int, max_seconds: float):
+    """
+    Read at most ``max_bytes`` decoded bytes within ``max_seconds``; return (body, truncated).
+
+    The time cap is enforced on the socket: at the deadline it is shut down, which ends
+    a read stalled mid-chunk at once instead of after the socket read timeout. The
+    connection is kept out of the pool until the alarm is disarmed, so a late alarm
+    never shuts down a socket another request has picked up; after an expiry it is
+    closed instead of reused.
+    """
+    deadline = time.monotonic() + max_seconds
+    expired = threading.Event()
+    lock = threading.Lock()
+    finished = exhausted = False
+    sock = _response_socket(response)
+    raw = response.raw
+
+    def expire() -> None:
+        with lock:
+            if finished:
+                return
+            expired.set()
+            sock.shutdown(socket.SHUT_RDWR)
+
+    alarm = None
+    if sock is not None:
+        # urllib3 hands the connection back inside the read that exhausts the body.
+        pool, raw._pool = raw._pool, None
+        alarm = _WATCHDOG.schedule(deadline, expire)
+    body = bytearray()
+    try:
+        for chunk in response.iter_content(chunk_size=READ_CHUNK_BYTES):
+            remaining = max_bytes - len(body)
+            if len(chunk) > remaining:
+                body += chunk[:remaining]
+                return bytes(body), True
+            body += chunk
+            if time.monotonic() > deadline:
+                return bytes(body), True
+        exhausted = True
+    except (requests.RequestException, urllib3.exceptions.HTTPError, OSError):
+        if not expired.is_set():
+            raise
+    finally:
+        if alarm is not None:
+            with lock:
+                finished = True
+            _WATCHDOG.cancel(alarm)
+            raw._pool = pool
+            if exhausted and not expired.is_set():
+                raw.release_conn()
+            else:
+                response.close()
+    # A shut-down socket can also read as a clean end of body.
+    return bytes(body), expired.is_set()
+
+
+def get_session() -> requests.Session:
+    """Process-wide session: keep-alive connection pools per host and gzip/deflate(/br) negotiation."""
+    global _SESSION
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.headers["Accept-Encoding"] = DEFAULT_ACCEPT_ENCODING
+                _SESSION = session
+    return _SESSION
+
+
+DEFAULT_CACHE = ConditionalCache()
+
+
+def fetch(
+    url: str,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: float = DEFAULT_TIMEOUT,
+    cache: Optional[ConditionalCache] = DEFAULT_CACHE,
+    max_bytes: int = MAX_BODY_BYTES,
+    max_seconds: float = MAX_FETCH_SECONDS,
+) -> FetchedPage:
+    """
+    GET ``url`` through the shared session, revalidating any cached copy.
+
+    A ``304 Not Modified`` answer returns the cached body with ``from_cache=True``, so a
+    repeat audit of an unchanged page transfers only headers. Pass ``cache=None`` to
+    skip the cache entirely.
+
+    The body is streamed and cut off after ``max_bytes`` decoded bytes or
+    ``max_seconds`` of reading, enforced on the socket (``timeout`` only bounds each
+    socket read, so a slow endless response would otherwise never end); cut-off pages
+    have ``truncated=True`` and are never cached.
+    """
+    request_headers = dict(headers or {})
+    cached = cache.load(url) if cache is not None else None
+    if cached is not None:
+        request_headers.update(ConditionalCache.validators(cached))
+
+    response = get_session().get(url, headers=request_headers, timeout=timeout, stream=True)
+    try:
+        if cached is not None and response.status_code == 304:
+            # Drain the empty body so the connection goes back to the pool instead of closing.
+            response.content
+            return cached
+        content, truncated = _read_capped(response, max_bytes, max_seconds)
+    finally:
+        response.close()
+
+    page = FetchedPage(
+        url=url,
+        status_code=response.status_code,
+        content=content,
+        # Resolve the charset once so cached copies decode the same way.
+        encoding=sniff_encoding(response.headers.get("Content-Type"), content[:SNIFF_BYTES]),
+        headers=CaseInsensitiveDict({name: response.headers[name] for name in KEPT_HEADERS if name in response.headers}),
+        truncated=truncated,
+    )
+    if cache is not None:
+        cache.store(page)
+    return page
@@ -0,0 +1,123 @@
+"""
+fingerprint.py
+Per-region digests of a page, so audits can skip modules whose inputs did not change.
+"""
+import hashlib
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+from bs4 import BeautifulSoup, Comment, NavigableString, Tag
+
+import json_codec
+
+from .fetch import FetchedPage, fetch
+from .seo import SEMANTIC_ELEMENTS, HEADING_TAGS, resolve_parser
+
+# Bump when region extraction changes so stored fingerprints stop matching.
+FINGERPRINT_VERSION = 1
+INPUT_REGIONS = (
+    "head", "headings", "text", "links", "images", "scripts", "styles", "forms", "landmarks", "headers",
+)
+# Response headers the audit modules reason about; volatile ones (Date, Age, ...) are left out.
+FINGERPRINT_HEADERS = (
+    "Content-Type", "Content-Encoding", "Cache-Control", "Server", "X-Powered-By",
+    "Strict-Transport-Security", "Content-Security-Policy", "X-Frame-Options",
+    "X-Content-Type-Options", "Referrer-Policy", "Permissions-Policy",
+)
+_SKIPPED_TEXT_PARENTS = {"script", "style", "noscript", "template", "head", "title"}
+_FORM_FIELDS = {"input", "select", "textarea", "button", "label"}
+
+
+def _digest(value: Any) -> str:
+    return hashlib.sha256(json_codec.dumps_bytes(value, sort_keys=True)).hexdigest()
+
+
+def _short(text: str) -> str:
+    """Inline scripts/styles contribute a digest, not their (possibly huge) source."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def extract_regions(html: str, headers: Optional[Mapping[str, str]] = None, parser: Optional[str] = None) -> Dict[str, Any]:
+    """Normalized content of every region in ``INPUT_REGIONS``, gathered in one tree walk."""
+    soup = BeautifulSoup(html, resolve_parser(parser))
+    regions: Dict[str, Any] = {name: [] for name in INPUT_REGIONS}
+    text_parts: List[str] = []
+    for node in soup.descendants:
+        if isinstance(node, NavigableString):
+            if isinstance(node, Comment) or node.parent is None or node.parent.name in _SKIPPED_TEXT_PARENTS:
+                continue
+            stripped = " ".join(node.split())
+            if stripped:
+                text_parts.append(stripped)
+            continue
+        if not isinstance(node, Tag):
+            continue
+        name, attrs = node.name, node.attrs
+        if name == "html":
+            regions["head"].append(["lang", attrs.get("lang")])
+        elif name == "title":
+            regions["head"].append(["title", node.get_text(" ", strip=True)])
+        elif name == "meta":
+            key = attrs.get("name") or attrs.get("property") or attrs.get("http-equiv") or attrs.get("charset")
+            regions["head"].append(["meta", key, attrs.get("content")])
+        elif name == "link":
+            rel = " ".join(attrs.get("rel") or [])
+            if "stylesheet" in rel:
+                regions["styles"].append(["link", attrs.get("href"), attrs.get("media")])
+            else:
+                regions["head"].append(["link", rel, attrs.get("href"), attrs.get("hreflang")])
+        elif name in HEADING_TAGS:
+            regions["headings"].append([name, node.get_text(" ", strip=True)])
+        elif name == "a":
+            if attrs.get("href") is not None:
+                regions["links"].append([attrs.get("href"), " ".join(attrs.get("rel") or [])])
+        elif name in ("img", "source", "picture", "video", "iframe"):
+            regions["images"].append([
+                name, attrs.get("src"), attrs.get("srcset"), attrs.get("alt"),
+                attrs.get("width"), attrs.get("height"), attrs.get("loading"),
+            ])
+        elif name == "script":
+            source = attrs.get("src")
+            regions["scripts"].append([source, attrs.get("type"), "async" in attrs, "defer" in attrs,
+                                       None if source else _short(node.string or "")])
+        elif name == "style":
+            regions["styles"].append(["inline", _short(node.string or "")])
+        elif name == "form":
+            regions["forms"].append(["form", attrs.get("action"), attrs.get("method")])
+        elif name in _FORM_FIELDS:
+            regions["forms"].append([name, attrs.get("type"), attrs.get("name"), attrs.get("id"),
+                                     attrs.get("for"), attrs.get("aria-label"), attrs.get("autocomplete")])
+        if name in SEMANTIC_ELEMENTS or attrs.get("role"):
+            regions["landmarks"].append([name, attrs.get("role"), attrs.get("aria-label")])
+    regions["text"] = " ".join(text_parts)
+    wanted = {header.lower() for header in FINGERPRINT_HEADERS}
+    regions["headers"] = sorted(
+        [name.lower(), " ".join(str(value).split())]
+        for name, value in (headers or {}).items()
+        if name.lower() in wanted
+    )
+    return regions
+
+
+def region_digests(html: str, headers: Optional[Mapping[str, str]] = None, parser: Optional[str] = None) -> Dict[str, str]:
+    return {name: _digest(value) for name, value in extract_regions(html, headers, parser).items()}
+
+
+def fetch_region_digests(url: str, timeout: float = 10, parser: Optional[str] = None) -> Dict[str, str]:
+    """Fetch ``url`` (bypassing the conditional cache so headers are live) and digest its regions."""
+    page: FetchedPage = fetch(url, timeout=timeout, cache=None)
+    page.raise_for_status()
+    return region_digests(page.text, page.headers, parser)
+
+
+def module_fingerprint(regions: Mapping[str, str], inputs: Iterable[str], salt: Any = None) -> Optional[str]:
+    """
+    Combine the digests of the regions a module reads, plus ``salt`` (e.g. its prompt).
+
+    Returns ``None`` when any declared region is missing, so the module always reruns.
+    """
+    parts = []
+    for name in inputs:
+        if name not in regions:
+            return None
+        parts.append([name, regions[name]])
+    return _digest([FINGERPRINT_VERSION, parts, salt])
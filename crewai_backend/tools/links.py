@@ -0,0 +1,189 @@
+"""
+links.py
+LinkChecker: concurrent broken-link validation with a shared TTL status cache.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urljoin, urlparse
+
+from .cache import TTLCache
+from .fetch import get_session
+
+MAX_REDIRECTS = 5
+# Servers that reject or mishandle HEAD; the link is re-checked with a streamed GET.
+HEAD_FALLBACK_STATUSES = {403, 405, 501}
+LINK_CHECK_USER_AGENT = "GetSafe360LinkChecker/1.0"
+
+
+class LinkStatusCache(TTLCache):
+    """
+    Link check results keyed by URL.
+
+    Shared process-wide so links that appear across many audited sites (CDNs,
+    social profiles) are validated once per window.
+    """
+
+
+LINK_STATUS_CACHE = LinkStatusCache(
+    ttl_seconds=float(os.environ.get("LINK_CHECK_CACHE_TTL_SECONDS", "3600")),
+    max_entries=int(os.environ.get("LINK_CHECK_CACHE_MAX_ENTRIES", "100000")),
+)
+
+
+class LinkChecker:
+    """
+    Validates links concurrently: HEAD first, GET fallback, redirects followed by hand.
+
+    Each result records the final status code and the redirect chain. At most
+    ``per_host`` requests run against one host at a time and ``max_concurrency``
+    overall. Anything not finished within ``deadline_seconds`` is reported as
+    unchecked rather than holding up the audit. Only real HTTP answers are cached;
+    network errors are retried on the next run.
+
+    Per-host caps hold across every ``check`` on the same instance, so analyses share
+    the process-wide one from ``get_link_checker`` unless they need other limits. A
+    host's semaphore is dropped once no check is using it.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 16,
+        per_host: int = 2,
+        timeout: float = 5,
+        deadline_seconds: float = 20,
+        cache: Optional[LinkStatusCache] = LINK_STATUS_CACHE,
+    ):
+        self.max_concurrency = max_concurrency
+        self.per_host = per_host
+        self.timeout = timeout
+        self.deadline_seconds = deadline_seconds
+        self.cache = cache
+        # host -> [semaphore, checks holding or waiting for it]
+        self._host_slots: Dict[str, List[Any]] = {}
+        self._host_slots_lock = threading.Lock()
+
+    def _slot(self, host: str) -> threading.BoundedSemaphore:
+        with self._host_slots_lock:
+            entry = self._host_slots.get(host)
+            if entry is None:
+                entry = self._host_slots[host] = [threading.BoundedSemaphore(self.per_host), 0]
+            entry[1] += 1
+            return entry[0]
+
+    def _unslot(self, host: str) -> None:
+        with self._host_slots_lock:
+            entry = self._host_slots[host]
+            entry[1] -= 1
+            if not entry[1]:
+                del self._host_slots[host]
+
+    def _request(self, method: str, url: str, timeout: float):
+        response = get_session().request(
+            method,
+            url,
+            allow_redirects=False,
+            stream=method == "GET",
+            timeout=timeout,
+            headers={"User-Agent": LINK_CHECK_USER_AGENT},
+        )
+        response.close()
+        return response
+
+    def _probe(self, url: str, deadline: float) -> Dict[str, Any]:
+        redirects: List[Dict[str, Any]] = []
+        current = url
+        for _ in range(MAX_REDIRECTS + 1):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError("deadline exceeded")
+            timeout = min(self.timeout, remaining)
+            method = "HEAD"
+            response = self._request(method, current, timeout)
+            if response.status_code in HEAD_FALLBACK_STATUSES:
+                method = "GET"
+                response = self._request(method, current, timeout)
+            location = response.headers.get("Location")
+            if response.is_redirect and location:
+                redirects.append({"url": current, "status": response.status_code})
+                current = urljoin(current, location)
+                continue
+            return {
+                "url": url,
+                "status": response.status_code,
+                "ok": response.status_code < 400,
+                "method": method,
+                "final_url": current,
+                "redirects": redirects,
+            }
+        return {
+            "url": url,
+            "status": None,
+            "ok": False,
+            "final_url": current,
+            "redirects": redirects,
+            "error": f"more than {MAX_REDIRECTS} redirects",
+        }
+
+    def check_one(self, url: str, deadline: float) -> Dict[str, Any]:
+        if self.cache is not None:
+            cached = self.cache.get(url)
+            if cached is not None:
+                return {**cached, "cached": True}
+
+        host = urlparse(url).netloc.lower()
+        slot = self._slot(host)
+        try:
+            if not slot.acquire(timeout=max(0.0, deadline - time.monotonic())):
+                return {"url": url, "status": None, "ok": False, "error": "deadline exceeded", "unchecked": True}
+            try:
+                result = self._probe(url, deadline)
+            except TimeoutError:
+                return {"url": url, "status": None, "ok": False, "error": "deadline exceeded", "unchecked": True}
+            except Exception as exc:  # noqa: BLE001
+                return {"url": url, "status": None, "ok": False, "error": str(exc)}
+            finally:
+                slot.release()
+        finally:
+            self._unslot(host)
+
+        if self.cache is not None and result["status"] is not None:
+            self.cache.put(url, result)
+        return {**result, "cached": False}
+
+    def check(self, urls: Iterable[str]) -> List[Dict[str, Any]]:
+        """Check every distinct http(s) URL and return results in input order."""
+        unique = [u for u in dict.fromkeys(urls) if urlparse(u).scheme in {"http", "https"}]
+        if not unique:
+            return []
+        deadline = time.monotonic() + self.deadline_seconds
+        pool = ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(unique)), thread_name_prefix="link-check")
+        try:
+            futures = {url: pool.submit(self.check_one, url, deadline) for url in unique}
+            wait(list(futures.values()), timeout=max(0.0, deadline - time.monotonic()) + self.timeout)
+            results = []
+            for url, future in futures.items():
+                if future.done() and not future.cancelled():
+                    results.append(future.result())
+                else:
+                    future.cancel()
+                    results.append({"url": url, "status": None, "ok": False, "error": "deadline exceeded",
+                                    "unchecked": True})
+            return results
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+_LINK_CHECKER: Optional[LinkChecker] = None
+_LINK_CHECKER_LOCK = threading.Lock()
+
+
+def get_link_checker() -> LinkChecker:
+    """Process-wide checker, so per-host caps apply across analyses, crawls and bulk runs."""
+    global _LINK_CHECKER
+    with _LINK_CHECKER_LOCK:
+        if _LINK_CHECKER is None:
+            _LINK_CHECKER = LinkChecker()
+        return _LINK_CHECKER
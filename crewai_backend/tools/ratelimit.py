@@ -0,0 +1,80 @@
+"""
+ratelimit.py
+Token-bucket rate limiting and jittered exponential backoff shared by outbound clients.
+"""
+import random
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: ``rate`` tokens per second, bursting up to ``capacity``.
+
+    ``acquire`` blocks until enough tokens are available (or ``timeout`` expires) so
+    every caller sharing the bucket is held to the same global rate.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def peek(self, tokens: float = 1.0) -> float:
+        """Seconds until ``tokens`` would be available (0 if they are now), without taking them."""
+        with self._lock:
+            self._refill(time.monotonic())
+            return max(0.0, (min(tokens, self.capacity) - self._tokens) / self.rate)
+
+    def consume(self, tokens: float) -> None:
+        """Take ``tokens`` unconditionally; the balance may go negative (debt is repaid by refill)."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= tokens
+
+    def set_rate(self, rate: float) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = rate
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """Take ``tokens`` if available and return 0, else return the seconds until they will be."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+    def acquire(self, tokens: float = 1.0, timeout: Optional[float] = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait_seconds = self.try_acquire(tokens)
+            if wait_seconds == 0:
+                return True
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait_seconds = min(wait_seconds, remaining)
+            time.sleep(wait_seconds)
+
+
+BACKOFF_CAP_SECONDS = 30.0
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = BACKOFF_CAP_SECONDS) -> float:
+    """Full-jitter exponential backoff: uniform in [0, min(cap, base * 2**attempt)]."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
@@ -0,0 +1,155 @@
+"""
+sentiment.py
+SentimentEngine: weighted, multilingual lexicon scoring for batches of short texts.
+"""
+import string
+from dataclasses import dataclass, field
+from itertools import repeat
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+# Weights are relative: roughly 1 for mild, 2 for strong and 3 for damning terms.
+DEFAULT_LEXICON: Dict[str, Dict[str, float]] = {
+    "en": {
+        "good": 1, "great": 2, "excellent": 2, "best": 1.5, "recommended": 1.5,
+        "positive": 1, "reliable": 1.5, "trusted": 1.5, "satisfied": 1.5, "love": 1.5,
+        "bad": -1, "poor": -1.5, "problem": -1, "complaint": -1.5, "negative": -1,
+        "scam": -3, "fraud": -3, "fake": -2, "warning": -1.5, "lawsuit": -2,
+        "not recommended": -2, "stay away": -2.5, "rip off": -2.5,
+    },
+    "de": {
+        "gut": 1, "sehr gut": 2, "empfehlung": 1.5, "empfehlenswert": 1.5, "zufrieden": 1.5,
+        "zuverlässig": 1.5, "seriös": 1.5,
+        "schlecht": -1, "kritik": -1, "warnung": -1.5, "beschwerde": -1.5, "betrug": -3,
+        "abzocke": -3, "unseriös": -2.5, "nicht empfehlenswert": -2, "nicht zufrieden": -2,
+    },
+}
+
+# Texts and lexicon terms share one normalization: lowercase, punctuation as whitespace,
+# UTF-8 bytes. Working on bytes keeps translate/split on their fast C paths even when
+# the text holds umlauts or other non-ASCII letters.
+_TYPOGRAPHIC_PUNCTUATION = "„“”‘’«»–—…\u00a0"
+_ASCII_SEPARATORS = (string.punctuation + "\n\r\t").encode("ascii")
+_NORMALIZE = bytes.maketrans(_ASCII_SEPARATORS, b" " * len(_ASCII_SEPARATORS))
+
+
+def _normalize(text: str) -> bytes:
+    text = text.lower()
+    for char in _TYPOGRAPHIC_PUNCTUATION:
+        if char in text:
+            text = text.replace(char, " ")
+    return text.encode("utf-8", errors="replace").translate(_NORMALIZE)
+
+
+@dataclass
+class BatchSentiment:
+    """Per-text scores and labels plus the batch aggregate."""
+    scores: List[float]
+    labels: List[str]
+    counts: Dict[str, int] = field(default_factory=dict)
+    mean_score: float = 0.0
+    label: str = "neutral"
+
+
+def label_for(score: float) -> str:
+    if score > 0:
+        return "positive"
+    if score < 0:
+        return "negative"
+    return "neutral"
+
+
+class SentimentEngine:
+    """
+    Scores texts against a weighted term list, compiled once into hash lookups.
+
+    Texts and terms share one normalization (lowercase, punctuation as whitespace),
+    so matching is whole-word. Single-word terms are summed with a C-level
+    ``map``/``sum`` over the tokens; multi-word phrases are counted only in texts
+    containing their first word, and replace the weights of the words they contain
+    ("not recommended" scores -2, not -2 + 1.5). Texts without any lexicon word are
+    rejected by one ``set.isdisjoint`` call, which is the common case for SERP
+    snippets.
+    """
+
+    def __init__(
+        self,
+        terms: Optional[Mapping[str, float]] = None,
+        languages: Optional[Iterable[str]] = None,
+    ):
+        self._terms: Dict[str, float] = {}
+        if terms is None:
+            for language in languages or DEFAULT_LEXICON:
+                self._terms.update(DEFAULT_LEXICON[language])
+        else:
+            self._terms.update(terms)
+        self._compile()
+
+    def add_terms(self, terms: Mapping[str, float]) -> None:
+        """Add or reweight terms; takes effect for texts scored afterwards."""
+        self._terms.update(terms)
+        self._compile()
+
+    @property
+    def terms(self) -> Dict[str, float]:
+        return dict(self._terms)
+
+    def _compile(self) -> None:
+        words: Dict[bytes, float] = {}
+        phrases: Dict[bytes, List[Tuple[bytes, float]]] = {}
+        for term, weight in self._terms.items():
+            tokens = _normalize(term).split()
+            if len(tokens) == 1:
+                words[tokens[0]] = float(weight)
+        for term, weight in self._terms.items():
+            tokens = _normalize(term).split()
+            if len(tokens) > 1:
+                adjustment = float(weight) - sum(words.get(token, 0.0) for token in tokens)
+                phrases.setdefault(tokens[0], []).append((b" " + b" ".join(tokens) + b" ", adjustment))
+        # Swapped in together so concurrent scorers never see a half-built lexicon.
+        self._compiled = (words, phrases, frozenset(words) | frozenset(phrases))
+
+    def _score_tokens(self, tokens: List[bytes], compiled) -> float:
+        words, phrases, vocabulary = compiled
+        if vocabulary.isdisjoint(tokens):
+            return 0.0
+        score = sum(map(words.get, tokens, repeat(0.0)))
+        if phrases:
+            heads = phrases.keys() & tokens
+            if heads:
+                padded = b" " + b" ".join(tokens) + b" "
+                for head in heads:
+                    for needle, adjustment in phrases[head]:
+                        score += padded.count(needle) * adjustment
+        return score
+
+    def score(self, text: str) -> float:
+        return self._score_tokens(_normalize(text or "").split(), self._compiled)
+
+    def score_batch(self, texts: Sequence[str]) -> BatchSentiment:
+        """Score many texts against one lexicon snapshot and aggregate the labels."""
+        if not texts:
+            return BatchSentiment(scores=[], labels=[], counts={"positive": 0, "negative": 0, "neutral": 0})
+        compiled = self._compiled
+        score_tokens = self._score_tokens
+        scores = [score_tokens(_normalize(text or "").split(), compiled) for text in texts]
+        labels = [label_for(score) for score in scores]
+        counts = {name: labels.count(name) for name in ("positive", "negative", "neutral")}
+        return BatchSentiment(
+            scores=scores,
+            labels=labels,
+            counts=counts,
+            mean_score=sum(scores) / len(scores),
+            label=aggregate_label(counts),
+        )
+
+
+def aggregate_label(counts: Mapping[str, int]) -> str:
+    """Overall verdict: negative if negatives outnumber positives, else positive if any."""
+    if counts.get("negative", 0) > counts.get("positive", 0):
+        return "negative"
+    if counts.get("positive", 0) > 0:
+        return "positive"
+    return "neutral"
+
+
+DEFAULT_ENGINE = SentimentEngine()
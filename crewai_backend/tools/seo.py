@@ -2,35 +2,159 @@
 seo.py
 Expanded SEOAnalyzer for GetSafe AI-Agent Optimization Suite.
 """
-import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, Tag
+from bs4.builder import builder_registry
+from dataclasses import dataclass, field
 from urllib.parse import urljoin, urlparse
-from typing import Dict, Any, List, Optional, Set
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+from .fetch import fetch
+from .links import LinkChecker, get_link_checker
+
+SEMANTIC_ELEMENTS = ('header', 'nav', 'main', 'section', 'article', 'aside', 'footer')
+HEADING_TAGS = tuple(f'h{i}' for i in range(1, 7))
+DEFAULT_PARSER = 'html.parser'
+# Preference order when the caller asks for the fastest installed tree builder.
+FAST_PARSERS = ('lxml', 'html.parser')
+
+
+def resolve_parser(parser: Optional[str] = None) -> str:
+    """
+    Map a parser name to an installed BeautifulSoup tree builder.
+
+    ``None`` keeps the pure-Python default, ``"fast"`` picks the first installed entry of
+    ``FAST_PARSERS``, and any other name (``"lxml"``, ``"html5lib"``, ...) is used as-is
+    when installed, falling back to the default otherwise.
+    """
+    if parser is None:
+        return DEFAULT_PARSER
+    candidates = FAST_PARSERS if parser == 'fast' else (parser,)
+    for candidate in candidates:
+        if builder_registry.lookup(candidate) is not None:
+            return candidate
+    return DEFAULT_PARSER
+
+
+@dataclass
+class PageElements:
+    """Every element the on-page checks look at, gathered in one document-order walk."""
+    title: Optional[Tag] = None
+    meta_description: Optional[Tag] = None
+    headings: Dict[str, List[Tag]] = field(default_factory=lambda: {name: [] for name in HEADING_TAGS})
+    links: List[Tag] = field(default_factory=list)
+    images: List[Tag] = field(default_factory=list)
+    semantic: Set[str] = field(default_factory=set)
+    ld_json: Optional[Tag] = None
+    microdata: Optional[Tag] = None
+    canonical: Optional[Tag] = None
+
+    @classmethod
+    def collect(cls, soup: BeautifulSoup) -> "PageElements":
+        # Mirrors the matching rules of the find/find_all calls the checks used to make
+        # (exact, case-sensitive attribute values; "rel" matches on any token).
+        elements = cls()
+        headings = elements.headings
+        semantic = elements.semantic
+        for tag in soup.descendants:
+            if not isinstance(tag, Tag):
+                continue
+            name = tag.name
+            attrs = tag.attrs
+            if name in headings:
+                headings[name].append(tag)
+            elif name == 'a':
+                if attrs.get('href') is not None:
+                    elements.links.append(tag)
+            elif name == 'img':
+                elements.images.append(tag)
+            elif name in SEMANTIC_ELEMENTS:
+                semantic.add(name)
+            elif name == 'title':
+                if elements.title is None:
+                    elements.title = tag
+            elif name == 'meta':
+                if elements.meta_description is None and attrs.get('name') == 'description':
+                    elements.meta_description = tag
+            elif name == 'script':
+                if elements.ld_json is None and attrs.get('type') == 'application/ld+json':
+                    elements.ld_json = tag
+            elif name == 'link':
+                if elements.canonical is None and _has_token(attrs.get('rel'), 'canonical'):
+                    elements.canonical = tag
+            if elements.microdata is None and attrs.get('itemscope') is not None:
+                elements.microdata = tag
+        return elements
+
+
+def _has_token(value: Any, token: str) -> bool:
+    if isinstance(value, list):
+        return token in value or ' '.join(value) == token
+    return value == token
+
 
 class SEOAnalyzer:
     """
     Performs comprehensive on-page SEO checks for a given URL.
+
+    ``parser`` selects the BeautifulSoup tree builder (see ``resolve_parser``); pass
+    ``"fast"`` to use lxml when it is installed. All checks read from a single
+    ``PageElements`` walk of the parsed tree. With ``check_broken_links`` enabled,
+    ``check_links`` also validates every discovered link through ``link_checker``
+    (default: the process-wide ``get_link_checker()``).
     """
 
-    def __init__(self, url: str):
+    def __init__(
+        self,
+        url: str,
+        parser: Optional[str] = None,
+        check_broken_links: bool = False,
+        link_checker: Optional[LinkChecker] = None,
+    ):
         self.url = url
+        self.parser = resolve_parser(parser)
+        self.check_broken_links = check_broken_links
+        self.link_checker = link_checker
         self.page_content = None
         self.soup = None
+        self.truncated = False
         self.domain = urlparse(url).netloc
+        self._elements: Optional[PageElements] = None
+        self._elements_soup = None
+
+    @classmethod
+    def from_html(
+        cls, url: str, html: str, parser: Optional[str] = None, truncated: bool = False, **options: Any
+    ) -> "SEOAnalyzer":
+        """Build an analyzer over already-fetched markup (no page fetch)."""
+        analyzer = cls(url, parser=parser, **options)
+        analyzer.truncated = truncated
+        analyzer.page_content = html
+        analyzer.soup = BeautifulSoup(html, analyzer.parser)
+        return analyzer
+
+    @property
+    def elements(self) -> PageElements:
+        if self._elements is None or self._elements_soup is not self.soup:
+            self._elements = PageElements.collect(self.soup)
+            self._elements_soup = self.soup
+        return self._elements
 
     def fetch_page(self) -> bool:
         try:
-            response = requests.get(self.url, timeout=10)
+            response = fetch(self.url, timeout=10)
             response.raise_for_status()
+            # Bodies over the fetch byte cap are analyzed up to the cap and flagged.
+            self.truncated = response.truncated
             self.page_content = response.text
-            self.soup = BeautifulSoup(self.page_content, 'html.parser')
+            self.soup = BeautifulSoup(self.page_content, self.parser)
             return True
         except Exception as e:
             print(f"[ERROR] Could not fetch page: {e}")
             return False
 
     def check_title(self) -> Dict[str, Any]:
-        title = self.soup.title.string.strip() if self.soup.title else None
+        title_tag = self.elements.title
+        title = title_tag.string.strip() if title_tag else None
         return {
             "present": bool(title),
             "text": title,
@@ -39,7 +163,7 @@ class SEOAnalyzer:
         }
 
     def check_meta_description(self) -> Dict[str, Any]:
-        desc_tag = self.soup.find('meta', attrs={'name': 'description'})
+        desc_tag = self.elements.meta_description
         desc = desc_tag['content'].strip() if desc_tag and desc_tag.get('content') else None
         return {
             "present": bool(desc),
@@ -49,10 +173,10 @@ class SEOAnalyzer:
         }
 
     def check_headings(self) -> Dict[str, Any]:
-        headings = {f'h{i}': [] for i in range(1, 7)}
-        for i in range(1, 7):
-            tags = self.soup.find_all(f'h{i}')
-            headings[f'h{i}'] = [t.get_text(strip=True) for t in tags]
+        headings = {
+            name: [t.get_text(strip=True) for t in tags]
+            for name, tags in self.elements.headings.items()
+        }
         return {
             "counts": {k: len(v) for k, v in headings.items()},
             "examples": {k: v[:2] for k, v in headings.items()},  # first 2 examples for each
@@ -69,9 +193,10 @@ class SEOAnalyzer:
             issues.append("No headings found at all.")
         return issues
 
-    def check_links(self) -> Dict[str, Any]:
-        internal, external, broken = set(), set(), set()
-        for a in self.soup.find_all('a', href=True):
+    def discover_links(self) -> Tuple[Set[str], Set[str]]:
+        """Return absolute (internal, external) link targets, skipping fragments and javascript: URLs."""
+        internal, external = set(), set()
+        for a in self.elements.links:
             href = a['href']
             if href.startswith('#') or href.lower().startswith('javascript:'):
                 continue
@@ -80,18 +205,39 @@ class SEOAnalyzer:
                 internal.add(full_url)
             else:
                 external.add(full_url)
-        # Optionally, you can check for broken links (requests.head)
-        # For MVP, skip or check a few only (avoid slowdowns)
-        return {
+        return internal, external
+
+    def check_links(self) -> Dict[str, Any]:
+        internal, external = self.discover_links()
+        result = {
             "internal_links": list(internal)[:5],
             "external_links": list(external)[:5],
             "internal_count": len(internal),
             "external_count": len(external),
             "issue": None if internal or external else "No links found"
         }
+        if self.check_broken_links:
+            checker = self.link_checker or get_link_checker()
+            checked = checker.check(sorted(internal) + sorted(external))
+            broken = [r for r in checked if not r["ok"] and not r.get("unchecked")]
+            result.update({
+                "checked_count": sum(1 for r in checked if not r.get("unchecked")),
+                "unchecked_count": sum(1 for r in checked if r.get("unchecked")),
+                "broken_count": len(broken),
+                "broken_links": [
+                    {"url": r["url"], "status": r["status"], "error": r.get("error")} for r in broken
+                ],
+                "redirect_chains": [
+                    {"url": r["url"], "final_url": r["final_url"], "status": r["status"], "chain": r["redirects"]}
+                    for r in checked if r.get("redirects")
+                ],
+            })
+            if broken:
+                result["issue"] = f"{len(broken)} broken links"
+        return result
 
     def check_images(self) -> Dict[str, Any]:
-        images = self.soup.find_all('img')
+        images = self.elements.images
         missing_alt = [img.get('src') for img in images if not img.get('alt')]
         return {
             "total_images": len(images),
@@ -101,8 +247,7 @@ class SEOAnalyzer:
         }
 
     def check_semantic_html(self) -> Dict[str, Any]:
-        elements = ['header', 'nav', 'main', 'section', 'article', 'aside', 'footer']
-        found = {el: bool(self.soup.find(el)) for el in elements}
+        found = {el: el in self.elements.semantic for el in SEMANTIC_ELEMENTS}
         missing = [el for el, present in found.items() if not present]
         return {
             "found": [el for el, present in found.items() if present],
@@ -111,8 +256,8 @@ class SEOAnalyzer:
         }
 
     def check_schema_org(self) -> Dict[str, Any]:
-        ld_json = self.soup.find('script', type='application/ld+json')
-        microdata = self.soup.find(attrs={'itemscope': True})
+        ld_json = self.elements.ld_json
+        microdata = self.elements.microdata
         return {
             "ld_json": bool(ld_json),
             "microdata": bool(microdata),
@@ -120,7 +265,7 @@ class SEOAnalyzer:
         }
 
     def check_canonical(self) -> Dict[str, Any]:
-        canonical = self.soup.find('link', rel='canonical')
+        canonical = self.elements.canonical
         return {
             "present": bool(canonical),
             "href": canonical['href'] if canonical and canonical.get('href') else None,
@@ -139,5 +284,6 @@ class SEOAnalyzer:
             "images": self.check_images(),
             "semantic_html": self.check_semantic_html(),
             "schema_org": self.check_schema_org(),
-            "canonical": self.check_canonical()
+            "canonical": self.check_canonical(),
+            "truncated": self.truncated
         }
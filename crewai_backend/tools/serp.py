@@ -2,26 +2,118 @@
 serp.py
 SERPAnalyzer: Checks SERP results and reputation/sentiment for a given brand or domain.
 """
-import requests
+import os
+import time
 from bs4 import BeautifulSoup
-from typing import List, Dict
-import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import quote_plus
+
+import requests
+
+from .cache import TTLCache
+from .fetch import FetchedPage, fetch
+from .ratelimit import BACKOFF_CAP_SECONDS, TokenBucket, backoff_delay
+from .sentiment import DEFAULT_ENGINE, BatchSentiment, SentimentEngine, label_for
+
+GOOGLE_SEARCH_URL = "https://www.google.com/search?q={query}&hl={locale}"
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+SERP_MAX_RETRIES = int(os.environ.get("SERP_MAX_RETRIES", "3"))
+SERP_BATCH_DEADLINE_SECONDS = float(os.environ.get("SERP_BATCH_DEADLINE_SECONDS", "300"))
+
+# Shared by every analyzer in the process: results per (query, locale, max_results) and
+# one global request budget, so portfolio runs neither re-hit nor hammer the endpoint.
+SERP_CACHE = TTLCache(
+    ttl_seconds=float(os.environ.get("SERP_CACHE_TTL_SECONDS", str(6 * 3600))),
+    max_entries=int(os.environ.get("SERP_CACHE_MAX_ENTRIES", "10000")),
+)
+SERP_RATE_LIMITER = TokenBucket(
+    rate=float(os.environ.get("SERP_REQUESTS_PER_SECOND", "1")),
+    capacity=float(os.environ.get("SERP_BURST", "3")),
+)
 
-GOOGLE_SEARCH_URL = "https://www.google.com/search?q={query}&hl=en"
 
 class SERPAnalyzer:
-    def __init__(self, brand_or_domain: str, max_results: int = 10):
+    def __init__(
+        self,
+        brand_or_domain: str,
+        max_results: int = 10,
+        locale: str = "en",
+        search_url: str = GOOGLE_SEARCH_URL,
+        cache: Optional[TTLCache] = SERP_CACHE,
+        rate_limiter: Optional[TokenBucket] = SERP_RATE_LIMITER,
+        max_retries: int = SERP_MAX_RETRIES,
+        sentiment_engine: SentimentEngine = DEFAULT_ENGINE,
+        deadline: Optional[float] = None,
+    ):
         self.query = brand_or_domain
         self.max_results = max_results
+        self.locale = locale
+        self.search_url = search_url
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.sentiment_engine = sentiment_engine
+        # time.monotonic() by which every request and retry pause must be done.
+        self.deadline = deadline
+        self.sentiment: Optional[BatchSentiment] = None
         self.results = []
+        self.from_cache = False
+
+    def _remaining(self) -> Optional[float]:
+        if self.deadline is None:
+            return None
+        remaining = self.deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError(f"SERP deadline exceeded for {self.query!r}")
+        return remaining
+
+    def _pause(self, seconds: float) -> None:
+        remaining = self._remaining()
+        if remaining is not None and seconds >= remaining:
+            raise TimeoutError(f"SERP deadline exceeded for {self.query!r}")
+        time.sleep(seconds)
+
+    def _request(self, url: str, headers: Dict[str, str]) -> FetchedPage:
+        """
+        GET under the shared rate limit, retrying throttling/5xx answers with jittered backoff.
+
+        A numeric ``Retry-After`` is honored up to the backoff cap. Waits count against
+        ``deadline``: one that would overrun it raises ``TimeoutError`` instead.
+        """
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter is not None and not self.rate_limiter.acquire(timeout=self._remaining()):
+                raise TimeoutError(f"SERP deadline exceeded for {self.query!r}")
+            remaining = self._remaining()
+            try:
+                response = fetch(url, headers=headers, timeout=min(10, remaining or 10), cache=None)
+            except requests.RequestException:
+                if attempt == self.max_retries:
+                    raise
+                self._pause(backoff_delay(attempt))
+                continue
+            if response.status_code not in RETRYABLE_STATUSES or attempt == self.max_retries:
+                return response
+            retry_after = response.headers.get("Retry-After", "")
+            delay = float(retry_after) if retry_after.isdigit() else backoff_delay(attempt)
+            self._pause(min(delay, BACKOFF_CAP_SECONDS))
+        raise RuntimeError("unreachable")
 
     def fetch_serp(self):
+        cache_key = (self.query, self.locale, self.max_results)
+        cached = self.cache.get(cache_key) if self.cache is not None else None
+        if cached is not None:
+            self.results = [dict(result) for result in cached]
+            self.from_cache = True
+            return
+
         # For a production tool, use the official Google API or SERP APIs!
         headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
         }
-        url = GOOGLE_SEARCH_URL.format(query=self.query)
-        response = requests.get(url, headers=headers, timeout=10)
+        url = self.search_url.format(query=quote_plus(self.query), locale=quote_plus(self.locale))
+        response = self._request(url, headers)
+        response.raise_for_status()
         soup = BeautifulSoup(response.text, 'html.parser')
         entries = soup.find_all('div', class_='tF2Cxc') or soup.find_all('div', class_='g')
         self.results = []
@@ -32,34 +124,59 @@ class SERPAnalyzer:
                 "title": title.text if title else "",
                 "snippet": snippet.text if snippet else "",
             })
+        self.from_cache = False
+        if self.cache is not None:
+            self.cache.put(cache_key, [dict(result) for result in self.results])
 
     def simple_sentiment(self, text: str) -> str:
-        # Primitive MVP sentiment check: search for negative/positive words
-        neg_words = re.compile(r"\b(bad|problem|complaint|scam|fraud|negative|poor|kritik|schlecht|warnung)\b", re.I)
-        pos_words = re.compile(r"\b(good|excellent|recommended|positive|best|great|empfehlung|zufrieden)\b", re.I)
-        if neg_words.search(text):
-            return "negative"
-        elif pos_words.search(text):
-            return "positive"
-        else:
-            return "neutral"
-
-    def analyze_sentiment(self):
-        sentiments = []
-        for result in self.results:
-            full_text = (result["title"] or "") + " " + (result["snippet"] or "")
-            sentiments.append(self.simple_sentiment(full_text))
-        if sentiments.count("negative") > sentiments.count("positive"):
-            return "negative"
-        elif sentiments.count("positive") > 0:
-            return "positive"
-        return "neutral"
+        return label_for(self.sentiment_engine.score(text))
+
+    def analyze_sentiment(self) -> str:
+        texts = [(result["title"] or "") + " " + (result["snippet"] or "") for result in self.results]
+        self.sentiment = self.sentiment_engine.score_batch(texts)
+        return self.sentiment.label
 
     def run_analysis(self) -> Dict[str, any]:
         self.fetch_serp()
         overall_sentiment = self.analyze_sentiment()
         return {
             "query": self.query,
+            "locale": self.locale,
             "results": self.results,
-            "sentiment": overall_sentiment
+            "sentiment": overall_sentiment,
+            "sentiment_score": round(self.sentiment.mean_score, 3),
+            "sentiment_counts": self.sentiment.counts,
+            "cached": self.from_cache,
         }
+
+
+def run_serp_batch(
+    queries: Iterable[str],
+    max_concurrency: int = 4,
+    deadline_seconds: float = SERP_BATCH_DEADLINE_SECONDS,
+    **options: Any,
+) -> List[Dict[str, Any]]:
+    """
+    Run ``SERPAnalyzer.run_analysis`` for many brands concurrently.
+
+    Every analyzer shares the process-wide cache and rate limiter (unless overridden in
+    ``options``), so concurrency never exceeds the global request budget. Duplicate
+    queries are fetched once. Rate-limit waits, requests and retry pauses of the whole
+    batch share ``deadline_seconds``. Results come back in input order; a query that
+    still fails after retries or runs out of time yields ``{"query": ..., "error": ...}``.
+    """
+    ordered = list(queries)
+    unique = list(dict.fromkeys(ordered))
+    if not unique:
+        return []
+    options.setdefault("deadline", time.monotonic() + deadline_seconds)
+
+    def analyze(query: str) -> Dict[str, Any]:
+        try:
+            return SERPAnalyzer(query, **options).run_analysis()
+        except Exception as exc:  # noqa: BLE001
+            return {"query": query, "error": str(exc)}
+
+    with ThreadPoolExecutor(max_workers=min(max_concurrency, len(unique)), thread_name_prefix="serp-batch") as pool:
+        by_query = dict(zip(unique, pool.map(analyze, unique)))
+    return [by_query[query] for query in ordered]